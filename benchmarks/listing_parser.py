@@ -0,0 +1,33 @@
+# Compares both listings parsers on fixture pages from the test suite.
+# Run it from the repository root: python -m benchmarks.listing_parser
+import json
+import timeit
+from pathlib import Path
+
+from steampy.utils import get_market_listings_from_html, get_market_sell_listings_from_api
+
+FIXTURES_DIRECTORY = Path(__file__).resolve().parent.parent / 'test' / 'fixtures'
+
+
+def main(number: int = 20) -> None:
+    market_page = (FIXTURES_DIRECTORY / 'market_page.html').read_text(encoding='utf-8')
+    mylistings = json.loads((FIXTURES_DIRECTORY / 'mylistings_render.json').read_text(encoding='utf-8'))
+    benchmarks = {
+        '/market page': lambda parser: get_market_listings_from_html(market_page, parser),
+        'mylistings/render page': lambda parser: get_market_sell_listings_from_api(mylistings['results_html'], parser),
+    }
+
+    for name, parse in benchmarks.items():
+        assert parse('bs4') == parse('regex'), f'Parsers returned different listings for {name}'
+        timings = {
+            parser: min(timeit.repeat(lambda: parse(parser), number=number, repeat=3)) / number
+            for parser in ('bs4', 'regex')
+        }
+        print(
+            f'{name}: bs4 {timings["bs4"] * 1000:.2f} ms, regex {timings["regex"] * 1000:.2f} ms, '
+            f'{timings["bs4"] / timings["regex"]:.1f}x faster',
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,5 @@
-import time
-
 from steampy.client import SteamClient, TradeOfferState
+from steampy.offer_poller import OfferPoller
 
 # Set API key
 api_key = ''
@@ -24,15 +23,14 @@ def main() -> None:
     client.login(username, password, steamguard_path)
     print('Bot logged in successfully, fetching offers every 60 seconds')
 
-    while True:
-        offers = client.get_trade_offers()['response']['trade_offers_received']
-        for offer in offers:
-            if is_donation(offer):
-                offer_id = offer['tradeofferid']
-                num_accepted_items = len(offer['items_to_receive'])
-                client.accept_trade_offer(offer_id)
-                print(f'Accepted trade offer {offer_id}. Got {num_accepted_items} items')
-        time.sleep(60)
+    # Only new or changed offers are returned, idle polls do not download offers at all
+    poller = OfferPoller(client, get_sent_offers=False)
+    for offer in poller.iter_offers(interval=60):
+        if is_donation(offer):
+            offer_id = offer['tradeofferid']
+            num_accepted_items = len(offer['items_to_receive'])
+            client.accept_trade_offer(offer_id)
+            print(f'Accepted trade offer {offer_id}. Got {num_accepted_items} items')
 
 
 def are_credentials_filled() -> bool:
@@ -24,4 +24,7 @@ setup(
         "beautifulsoup4",
         "rsa",
     ],
+    extras_require={
+        "async": ["aiohttp"],
+    },
 )
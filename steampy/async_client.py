@@ -0,0 +1,533 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+import urllib.parse as urlparse
+from decimal import Decimal
+from http import HTTPStatus
+from typing import TYPE_CHECKING
+
+import requests
+
+try:
+    import aiohttp
+    from yarl import URL
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+from steampy import guard
+from steampy.async_market import AsyncSteamMarket
+from steampy.client import SteamClient
+from steampy.cache import ResponseCache
+from steampy.confirmation import AsyncConfirmationExecutor
+from steampy.exceptions import ApiException, SevenDaysHoldException, TooManyRequests
+from steampy.login import InvalidCredentials, LoginExecutor
+from steampy.models import Asset, GameOptions, SteamUrl
+from steampy.rate_limit import RateLimiter
+from steampy.utils import (
+    account_id_to_steam_id,
+    get_description_key,
+    get_key_value_from_url,
+    login_required,
+    merge_items_with_descriptions_from_inventory,
+    merge_items_with_descriptions_from_offer,
+    merge_items_with_descriptions_from_offers,
+    steam_id_to_account_id,
+    text_between,
+    texts_between,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+
+class AsyncSteamClient:
+    def __init__(
+        self,
+        api_key: str,
+        username: str | None = None,
+        password: str | None = None,
+        steam_guard: str | None = None,
+        login_cookies: dict | None = None,
+        proxy: str | None = None,
+        rate_limiter: RateLimiter | None = None,
+        cache: ResponseCache | None = None,
+    ) -> None:
+        if aiohttp is None:
+            raise ImportError('AsyncSteamClient requires aiohttp, install it with "pip install steampy[async]"')
+
+        self._api_key = api_key
+        self._session: aiohttp.ClientSession | None = None
+        self._proxy = proxy
+        self._rate_limiter = rate_limiter
+        self._login_cookies = login_cookies
+
+        self.steam_guard_string = steam_guard
+        if self.steam_guard_string is not None:
+            self.steam_guard = guard.load_steam_guard(self.steam_guard_string)
+        else:
+            self.steam_guard = None
+
+        self.was_login_executed = False
+        self.username = username
+        self._password = password
+        self.market = AsyncSteamMarket(self._request, cache)
+        self._access_token = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # aiohttp sessions have to be created inside a running event loop
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        return self._session
+
+    async def _request(self, method: str, url: str, **kwargs) -> aiohttp.ClientResponse:
+        if self._rate_limiter is None:
+            return await self._send_request(method, url, **kwargs)
+
+        attempt = 0
+        while True:
+            await self._rate_limiter.acquire_async(url)
+            response = await self._send_request(method, url, **kwargs)
+            if (
+                response.status != HTTPStatus.TOO_MANY_REQUESTS
+                or attempt >= self._rate_limiter.max_retries
+                or self._rate_limiter.get_bucket(url) is None
+            ):
+                return response
+            self._rate_limiter.penalize(url, attempt)
+            attempt += 1
+
+    async def _send_request(self, method: str, url: str, **kwargs) -> aiohttp.ClientResponse:
+        async with self._get_session().request(method, url, proxy=self._proxy, **kwargs) as response:
+            await response.read()
+        return response
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+
+    async def set_login_cookies(self, cookies: dict) -> None:
+        self._get_session().cookie_jar.update_cookies(cookies, URL(SteamUrl.COMMUNITY_URL))
+        self.was_login_executed = True
+        if self.steam_guard is None:
+            self.steam_guard = {'steamid': str(await self.get_steam_id())}
+        self.market._set_login_executed(self.steam_guard, self._get_session_id())
+
+    @login_required
+    async def get_steam_id(self) -> int:
+        response = await self._request('GET', SteamUrl.COMMUNITY_URL)
+        if steam_id := re.search(r'g_steamID = "(\d+)";', await response.text()):
+            return int(steam_id.group(1))
+        raise ValueError(f'Invalid steam_id: {steam_id}')
+
+    async def login(
+        self, username: str | None = None, password: str | None = None, steam_guard: str | None = None,
+    ) -> None:
+        invalid_client_credentials_is_present = None in {self.username, self._password, self.steam_guard_string}
+        invalid_login_credentials_is_present = None in {username, password, steam_guard}
+
+        if invalid_client_credentials_is_present and invalid_login_credentials_is_present:
+            raise InvalidCredentials(
+                'You have to pass username, password and steam_guard parameters when using "login" method',
+            )
+
+        if invalid_client_credentials_is_present:
+            self.steam_guard_string = steam_guard
+            self.steam_guard = guard.load_steam_guard(self.steam_guard_string)
+            self.username = username
+            self._password = password
+
+        if self.was_login_executed and await self.is_session_alive():
+            return  # Session is alive, no need to login again
+
+        # The login flow is a short, strictly sequential handshake, so it runs on a worker thread
+        # with the blocking executor and the resulting cookies are moved into the aiohttp jar
+        login_session = await asyncio.to_thread(self._login_with_requests)
+        cookie_jar = self._get_session().cookie_jar
+        for cookie in login_session.cookies:
+            cookie_jar.update_cookies({cookie.name: cookie.value}, URL(f'https://{cookie.domain.lstrip(".")}/'))
+
+        self.was_login_executed = True
+        self.market._set_login_executed(self.steam_guard, self._get_session_id())
+        self._access_token = self._set_access_token()
+
+    def _login_with_requests(self) -> requests.Session:
+        session = requests.Session()
+        if self._proxy:
+            session.proxies.update({'http': self._proxy, 'https': self._proxy})
+        session.cookies.set('steamRememberLogin', 'true')
+        return LoginExecutor(self.username, self._password, self.steam_guard['shared_secret'], session).login()
+
+    def _get_cookie(self, name: str, url: str = SteamUrl.COMMUNITY_URL) -> str | None:
+        cookie = self._get_session().cookie_jar.filter_cookies(URL(url)).get(name)
+        return cookie.value if cookie is not None else None
+
+    def _set_access_token(self) -> str:
+        decoded_cookie_value = urlparse.unquote(self._get_cookie('steamLoginSecure') or '')
+        access_token_parts = decoded_cookie_value.split('||')
+        if len(access_token_parts) < 2:
+            raise ValueError('Access token not found in steamLoginSecure cookie')
+        return access_token_parts[1]
+
+    @login_required
+    async def logout(self) -> None:
+        url = f'{SteamUrl.COMMUNITY_URL}/login/logout/'
+        data = {'sessionid': self._get_session_id()}
+        await self._request('POST', url, data=data)
+
+        if await self.is_session_alive():
+            raise Exception('Logout unsuccessful')
+
+        self.was_login_executed = False
+
+    async def __aenter__(self):
+        if self._login_cookies:
+            await self.set_login_cookies(self._login_cookies)
+        else:
+            await self.login(self.username, self._password, self.steam_guard_string)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        try:
+            await self.logout()
+        finally:
+            await self.close()
+
+    @login_required
+    async def is_session_alive(self) -> bool:
+        response = await self._request('GET', f'{SteamUrl.COMMUNITY_URL}/chat/clientjstoken')
+        try:
+            return bool((await response.json(content_type=None)).get('logged_in'))
+        except ValueError:
+            return False
+
+    async def api_call(
+        self, method: str, interface: str, api_method: str, version: str, params: dict | None = None,
+    ) -> aiohttp.ClientResponse:
+        url = f'{SteamUrl.API_URL}/{interface}/{api_method}/{version}'
+        params = {key: value for key, value in (params or {}).items() if value is not None}
+        if method == 'GET':
+            response = await self._request('GET', url, params=params)
+        else:
+            response = await self._request('POST', url, data=params)
+
+        if self.is_invalid_api_key(await response.text()):
+            raise InvalidCredentials('Invalid API key')
+
+        return response
+
+    @staticmethod
+    def is_invalid_api_key(response_text: str) -> bool:
+        msg = 'Access is denied. Retrying will not help. Please verify your <pre>key=</pre> parameter'
+        return msg in response_text
+
+    @login_required
+    async def get_my_inventory(self, game: GameOptions, merge: bool = True, count: int = 5000) -> dict:
+        steam_id = self.steam_guard['steamid']
+        return await self.get_partner_inventory(steam_id, game, merge, count)
+
+    @login_required
+    async def get_partner_inventory(
+        self, partner_steam_id: str, game: GameOptions, merge: bool = True, count: int = 5000,
+    ) -> dict:
+        url = f'{SteamUrl.COMMUNITY_URL}/inventory/{partner_steam_id}/{game.app_id}/{game.context_id}'
+        params = {'l': 'english', 'count': count}
+
+        full_response = await self._request('GET', url, params=params)
+        if full_response.status == HTTPStatus.TOO_MANY_REQUESTS:
+            raise TooManyRequests('Too many requests, try again later.')
+
+        response_dict = await full_response.json(content_type=None)
+        if response_dict is None or response_dict.get('success') != 1:
+            raise ApiException('Success value should be 1.')
+
+        return merge_items_with_descriptions_from_inventory(response_dict, game) if merge else response_dict
+
+    def _get_session_id(self) -> str:
+        return self._get_cookie('sessionid')
+
+    async def get_trade_offers_summary(self, time_last_visit: int | None = None) -> dict:
+        params = {'key': self._api_key}
+        if time_last_visit is not None:
+            params['time_last_visit'] = time_last_visit
+        response = await self.api_call('GET', 'IEconService', 'GetTradeOffersSummary', 'v1', params)
+        return await response.json(content_type=None)
+
+    async def get_trade_offers(
+        self,
+        merge: bool = True,
+        get_sent_offers: bool = True,
+        get_received_offers: bool = True,
+        use_webtoken: bool = False,
+        max_retry: int = 5,
+        time_historical_cutoff: int | None = None,
+        get_descriptions: bool = True,
+    ) -> dict:
+        params = {
+            'key' if not use_webtoken else 'access_token': self._api_key if not use_webtoken else self._access_token,
+            'get_sent_offers': int(get_sent_offers),
+            'get_received_offers': int(get_received_offers),
+            'get_descriptions': int(get_descriptions),
+            'language': 'english',
+            'active_only': 1,
+            'historical_only': 0,
+            'time_historical_cutoff': time_historical_cutoff if time_historical_cutoff is not None else '',
+        }
+
+        response = await self._try_to_get_trade_offers(params, max_retry)
+        if response is None:
+            raise ApiException('Cannot get proper json from get_trade_offers method')
+        response_with_active_offers = SteamClient._filter_non_active_offers(response, time_historical_cutoff)
+        if merge and get_descriptions:
+            return merge_items_with_descriptions_from_offers(response_with_active_offers)
+        return response_with_active_offers
+
+    async def _try_to_get_trade_offers(self, params: dict, max_retry: int) -> dict | None:
+        for _ in range(max_retry):
+            try:
+                response = await self.api_call('GET', 'IEconService', 'GetTradeOffers', 'v1', params)
+                return await response.json(content_type=None)
+            except json.decoder.JSONDecodeError:
+                await asyncio.sleep(2)
+        return None
+
+    async def get_trade_offer(self, trade_offer_id: str, merge: bool = True, use_webtoken: bool = False) -> dict:
+        params = {'tradeofferid': trade_offer_id, 'language': 'english'}
+        if use_webtoken:
+            params['access_token'] = self._access_token
+        else:
+            params['key'] = self._api_key
+
+        response = await self.api_call('GET', 'IEconService', 'GetTradeOffer', 'v1', params)
+        response = await response.json(content_type=None)
+
+        if merge and 'descriptions' in response['response']:
+            descriptions = {get_description_key(offer): offer for offer in response['response']['descriptions']}
+            offer = response['response']['offer']
+            response['response']['offer'] = merge_items_with_descriptions_from_offer(offer, descriptions)
+
+        return response
+
+    async def get_trade_history(
+        self,
+        max_trades: int = 100,
+        start_after_time=None,
+        start_after_tradeid=None,
+        get_descriptions: bool = True,
+        navigating_back: bool = True,
+        include_failed: bool = True,
+        include_total: bool = True,
+    ) -> dict:
+        params = {
+            'key': self._api_key,
+            'max_trades': max_trades,
+            'start_after_time': start_after_time,
+            'start_after_tradeid': start_after_tradeid,
+            'get_descriptions': int(get_descriptions),
+            'navigating_back': int(navigating_back),
+            'include_failed': int(include_failed),
+            'include_total': int(include_total),
+        }
+        response = await self.api_call('GET', 'IEconService', 'GetTradeHistory', 'v1', params)
+        return await response.json(content_type=None)
+
+    async def iter_trade_history(
+        self,
+        since: int | None = None,
+        page_size: int = 100,
+        get_descriptions: bool = True,
+        include_failed: bool = True,
+    ) -> AsyncIterator[dict]:
+        start_after_time = start_after_tradeid = None
+        while True:
+            response = await self.get_trade_history(
+                page_size,
+                start_after_time,
+                start_after_tradeid,
+                get_descriptions=get_descriptions,
+                navigating_back=False,
+                include_failed=include_failed,
+                include_total=False,
+            )
+            trades = SteamClient._get_trades_from_history_page(response, get_descriptions)
+            for trade in trades:
+                if since is not None and trade['time_init'] < since:
+                    return
+                yield trade
+
+            if not trades or not response['response'].get('more'):
+                return
+            start_after_time, start_after_tradeid = trades[-1]['time_init'], trades[-1]['tradeid']
+
+    @login_required
+    async def get_trade_receipt(self, trade_id: str) -> list:
+        response = await self._request('GET', f'https://steamcommunity.com/trade/{trade_id}/receipt')
+        html = await response.text()
+        return [json.loads(item) for item in texts_between(html, 'oItem = ', ';\r\n\toItem')]
+
+    @login_required
+    async def accept_trade_offer(self, trade_offer: str | dict, check_trade_hold: bool = False) -> dict:
+        if isinstance(trade_offer, dict):
+            offer = trade_offer
+        else:
+            offer = (await self.get_trade_offer(trade_offer, merge=False, use_webtoken=True))['response']['offer']
+        trade_offer_id = offer['tradeofferid']
+        SteamClient._check_trade_offer_state(offer)
+
+        if check_trade_hold or 'accountid_other' not in offer:
+            partner = await self._fetch_trade_partner_id(trade_offer_id)
+        else:
+            partner = account_id_to_steam_id(offer['accountid_other'])
+        session_id = self._get_session_id()
+        accept_url = f'{SteamUrl.COMMUNITY_URL}/tradeoffer/{trade_offer_id}/accept'
+        params = {
+            'sessionid': session_id,
+            'tradeofferid': trade_offer_id,
+            'serverid': '1',
+            'partner': partner,
+            'captcha': '',
+        }
+        headers = {'Referer': SteamClient._get_trade_offer_url(trade_offer_id)}
+
+        response = await self._request('POST', accept_url, data=params, headers=headers)
+        response = await response.json(content_type=None)
+        if response.get('needs_mobile_confirmation', False):
+            return await self._confirm_transaction(trade_offer_id)
+
+        return response
+
+    async def _fetch_trade_partner_id(self, trade_offer_id: str) -> str:
+        response = await self._request('GET', SteamClient._get_trade_offer_url(trade_offer_id))
+        offer_response_text = await response.text()
+
+        if 'You have logged in from a new device. In order to protect the items' in offer_response_text:
+            raise SevenDaysHoldException("Account has logged in a new device and can't trade for 7 days")
+
+        return text_between(offer_response_text, "var g_ulTradePartnerSteamID = '", "';")
+
+    async def _confirm_transaction(self, trade_offer_id: str) -> dict:
+        return await self.get_confirmation_executor().send_trade_allow_request(trade_offer_id)
+
+    @login_required
+    def get_confirmation_executor(self) -> AsyncConfirmationExecutor:
+        return self.market._get_confirmation_executor()
+
+    async def decline_trade_offer(self, trade_offer_id: str) -> dict:
+        url = f'https://steamcommunity.com/tradeoffer/{trade_offer_id}/decline'
+        response = await self._request('POST', url, data={'sessionid': self._get_session_id()})
+        return await response.json(content_type=None)
+
+    async def cancel_trade_offer(self, trade_offer_id: str) -> dict:
+        url = f'https://steamcommunity.com/tradeoffer/{trade_offer_id}/cancel'
+        response = await self._request('POST', url, data={'sessionid': self._get_session_id()})
+        return await response.json(content_type=None)
+
+    @login_required
+    async def make_offer(
+        self,
+        items_from_me: list[Asset],
+        items_from_them: list[Asset],
+        partner_steam_id: str,
+        message: str = '',
+        confirm_trade: bool = True,
+    ) -> dict:
+        offer = SteamClient._create_offer_dict(items_from_me, items_from_them)
+        url = f'{SteamUrl.COMMUNITY_URL}/tradeoffer/new/send'
+        params = {
+            'sessionid': self._get_session_id(),
+            'serverid': 1,
+            'partner': partner_steam_id,
+            'tradeoffermessage': message,
+            'json_tradeoffer': json.dumps(offer),
+            'captcha': '',
+            'trade_offer_create_params': '{}',
+        }
+        partner_account_id = steam_id_to_account_id(partner_steam_id)
+        headers = {
+            'Referer': f'{SteamUrl.COMMUNITY_URL}/tradeoffer/new/?partner={partner_account_id}',
+            'Origin': SteamUrl.COMMUNITY_URL,
+        }
+
+        response = await (await self._request('POST', url, data=params, headers=headers)).json(content_type=None)
+        if confirm_trade and response.get('needs_mobile_confirmation'):
+            response.update(await self._confirm_transaction(response['tradeofferid']))
+
+        return response
+
+    async def get_profile(self, steam_id: str) -> dict:
+        params = {'steamids': steam_id, 'key': self._api_key}
+        response = await self.api_call('GET', 'ISteamUser', 'GetPlayerSummaries', 'v0002', params)
+        data = await response.json(content_type=None)
+        return data['response']['players'][0]
+
+    async def get_friend_list(self, steam_id: str, relationship_filter: str = 'all') -> dict:
+        params = {'key': self._api_key, 'steamid': steam_id, 'relationship': relationship_filter}
+        response = await self.api_call('GET', 'ISteamUser', 'GetFriendList', 'v1', params)
+        data = await response.json(content_type=None)
+        return data['friendslist']['friends']
+
+    @login_required
+    async def get_escrow_duration(self, trade_offer_url: str) -> int:
+        headers = {
+            'Referer': f'{SteamUrl.COMMUNITY_URL}{urlparse.urlparse(trade_offer_url).path}',
+            'Origin': SteamUrl.COMMUNITY_URL,
+        }
+        response = await (await self._request('GET', trade_offer_url, headers=headers)).text()
+
+        my_escrow_duration = int(text_between(response, 'var g_daysMyEscrow = ', ';'))
+        their_escrow_duration = int(text_between(response, 'var g_daysTheirEscrow = ', ';'))
+
+        return max(my_escrow_duration, their_escrow_duration)
+
+    @login_required
+    async def make_offer_with_url(
+        self,
+        items_from_me: list[Asset],
+        items_from_them: list[Asset],
+        trade_offer_url: str,
+        message: str = '',
+        case_sensitive: bool = True,
+        confirm_trade: bool = True,
+    ) -> dict:
+        token = get_key_value_from_url(trade_offer_url, 'token', case_sensitive)
+        partner_account_id = get_key_value_from_url(trade_offer_url, 'partner', case_sensitive)
+        partner_steam_id = account_id_to_steam_id(partner_account_id)
+        offer = SteamClient._create_offer_dict(items_from_me, items_from_them)
+        url = f'{SteamUrl.COMMUNITY_URL}/tradeoffer/new/send'
+        trade_offer_create_params = {'trade_offer_access_token': token}
+        params = {
+            'sessionid': self._get_session_id(),
+            'serverid': 1,
+            'partner': partner_steam_id,
+            'tradeoffermessage': message,
+            'json_tradeoffer': json.dumps(offer),
+            'captcha': '',
+            'trade_offer_create_params': json.dumps(trade_offer_create_params),
+        }
+
+        headers = {
+            'Referer': f'{SteamUrl.COMMUNITY_URL}{urlparse.urlparse(trade_offer_url).path}',
+            'Origin': SteamUrl.COMMUNITY_URL,
+        }
+
+        response = await (await self._request('POST', url, data=params, headers=headers)).json(content_type=None)
+        if confirm_trade and response.get('needs_mobile_confirmation'):
+            response.update(await self._confirm_transaction(response['tradeofferid']))
+
+        return response
+
+    @login_required
+    # If convert_to_decimal = False, the price will be returned WITHOUT a decimal point.
+    async def get_wallet_balance(self, convert_to_decimal: bool = True, on_hold: bool = False) -> str | Decimal:
+        response = await self._request('GET', f'{SteamUrl.COMMUNITY_URL}/market')
+        wallet_info_match = re.search(r'var g_rgWalletInfo = (.*?);', await response.text())
+        if wallet_info_match:
+            balance_dict_str = wallet_info_match.group(1)
+            balance_dict = json.loads(balance_dict_str)
+        else:
+            raise Exception('Unable to get wallet balance string match')
+        balance_dict_key = 'wallet_delayed_balance' if on_hold else 'wallet_balance'
+        if convert_to_decimal:
+            return Decimal(balance_dict[balance_dict_key]) / 100
+        return balance_dict[balance_dict_key]
@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import urllib.parse
+from decimal import Decimal
+from http import HTTPStatus
+from typing import TYPE_CHECKING
+
+from steampy.confirmation import AsyncConfirmationExecutor
+from steampy.exceptions import ApiException, TooManyRequests
+from steampy.market import SteamMarket
+from steampy.models import Currency, GameOptions, SteamUrl
+from steampy.utils import (
+    get_listing_id_to_assets_address_from_html,
+    get_market_listings_from_html,
+    get_market_sell_listings_from_api,
+    login_required,
+    merge_items_with_descriptions_from_listing,
+    text_between,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Awaitable, Callable
+
+    import aiohttp
+
+    from steampy.cache import ResponseCache
+
+
+class AsyncSteamMarket:
+    def __init__(
+        self, request: Callable[..., Awaitable[aiohttp.ClientResponse]], cache: ResponseCache | None = None,
+    ) -> None:
+        self._request = request
+        self._cache = cache
+        self._steam_guard = None
+        self._session_id = None
+        self._confirmation_executor = None
+        self.was_login_executed = False
+        self.last_listings_request_count = 0
+
+    def _set_login_executed(self, steamguard: dict, session_id: str) -> None:
+        if steamguard != self._steam_guard:
+            self._confirmation_executor = None
+        self._steam_guard = steamguard
+        self._session_id = session_id
+        self.was_login_executed = True
+
+    async def fetch_price(
+        self, item_hash_name: str, game: GameOptions, currency: Currency = Currency.USD, country='PL',
+    ) -> dict:
+        url = f'{SteamUrl.COMMUNITY_URL}/market/priceoverview/'
+        params = {
+            'country': country,
+            'currency': currency.value,
+            'appid': game.app_id,
+            'market_hash_name': item_hash_name,
+        }
+        cache_key = (game.app_id, item_hash_name, currency.value, country)
+        if self._cache is not None and (cached_response := self._cache.get('priceoverview', cache_key)):
+            return cached_response
+
+        response = await self._request('GET', url, params=params)
+        if response.status == HTTPStatus.TOO_MANY_REQUESTS:
+            raise TooManyRequests('You can fetch maximum 20 prices in 60s period')
+
+        response_dict = await response.json(content_type=None)
+        if self._cache is not None and response_dict.get('success'):
+            self._cache.set('priceoverview', cache_key, response_dict)
+        return response_dict
+
+    @login_required
+    async def fetch_price_history(self, item_hash_name: str, game: GameOptions) -> dict:
+        url = f'{SteamUrl.COMMUNITY_URL}/market/pricehistory/'
+        params = {'country': 'PL', 'appid': game.app_id, 'market_hash_name': item_hash_name}
+        cache_key = (game.app_id, item_hash_name, None, 'PL')
+        if self._cache is not None and (cached_response := self._cache.get('pricehistory', cache_key)):
+            return cached_response
+
+        response = await self._request('GET', url, params=params)
+        if response.status == HTTPStatus.TOO_MANY_REQUESTS:
+            raise TooManyRequests('You can fetch maximum 20 prices in 60s period')
+
+        response_dict = await response.json(content_type=None)
+        if self._cache is not None and response_dict.get('success'):
+            self._cache.set('pricehistory', cache_key, response_dict)
+        return response_dict
+
+    @login_required
+    async def get_my_market_listings(self, parser: str = 'bs4', max_concurrency: int = 4) -> dict:
+        listings = {'buy_orders': {}, 'sell_listings': {}}
+        async for page in self.iter_my_market_listings(parser, max_concurrency):
+            listings['buy_orders'].update(page.get('buy_orders', {}))
+            listings['sell_listings'].update(page['sell_listings'])
+        return listings
+
+    @login_required
+    async def iter_my_market_listings(self, parser: str = 'bs4', max_concurrency: int = 4) -> AsyncIterator[dict]:
+        response = await self._request('GET', f'{SteamUrl.COMMUNITY_URL}/market')
+        self.last_listings_request_count = 1
+        if response.status != HTTPStatus.OK:
+            raise ApiException(f'There was a problem getting the listings. HTTP code: {response.status}')
+
+        html = await response.text()
+        assets_descriptions = json.loads(text_between(html, 'var g_rgAssets = ', ';\n'))
+        listing_id_to_assets_address = get_listing_id_to_assets_address_from_html(html)
+        listings = get_market_listings_from_html(html, parser)
+        seen_listing_ids = set(listings['sell_listings'])
+        yield merge_items_with_descriptions_from_listing(listings, listing_id_to_assets_address, assets_descriptions)
+
+        if '<span id="tabContentsMyActiveMarketListings_end">' not in html:
+            return
+
+        n_showing = int(text_between(html, '<span id="tabContentsMyActiveMarketListings_end">', '</span>'))
+        n_total = int(
+            text_between(html, '<span id="tabContentsMyActiveMarketListings_total">', '</span>').replace(',', ''),
+        )
+        if n_showing < n_total < 1000:
+            url = f'{SteamUrl.COMMUNITY_URL}/market/mylistings/render/?query=&start={n_showing}&count={-1}'
+            page, _ = await self._fetch_listings_page(url, parser)
+            self.last_listings_request_count += 1
+            yield SteamMarket._drop_seen_listings(page, seen_listing_ids)
+            return
+
+        # Pages are downloaded concurrently, but yielded in order, see SteamMarket.iter_my_market_listings
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def fetch_page(start: int) -> tuple[dict, int | None]:
+            async with semaphore:
+                return await self._fetch_listings_page(SteamMarket._get_listings_page_url(start), parser)
+
+        tasks = []
+        try:
+            next_start = n_showing
+            reached_end = False
+            while next_start < n_total and not reached_end:
+                starts = range(next_start, n_total, SteamMarket.LISTINGS_PAGE_SIZE)
+                tasks = [asyncio.ensure_future(fetch_page(start)) for start in starts]
+                next_start = starts[-1] + SteamMarket.LISTINGS_PAGE_SIZE
+                for task in tasks:
+                    page, total_count = await task
+                    self.last_listings_request_count += 1
+                    if total_count is not None:
+                        n_total = total_count
+                    reached_end = reached_end or not page['sell_listings']
+                    yield SteamMarket._drop_seen_listings(page, seen_listing_ids)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _fetch_listings_page(self, url: str, parser: str) -> tuple[dict, int | None]:
+        response = await self._request('GET', url)
+        if response.status != HTTPStatus.OK:
+            raise ApiException(f'There was a problem getting the listings. HTTP code: {response.status}')
+
+        jresp = await response.json(content_type=None)
+        listing_id_to_assets_address = get_listing_id_to_assets_address_from_html(jresp.get('hovers'))
+        listings = get_market_sell_listings_from_api(jresp.get('results_html'), parser)
+        listings = merge_items_with_descriptions_from_listing(
+            listings, listing_id_to_assets_address, jresp.get('assets'),
+        )
+        return listings, jresp.get('total_count')
+
+    @login_required
+    async def create_sell_order(
+        self, assetid: str, game: GameOptions, money_to_receive: str, confirm_listing: bool = True,
+    ) -> dict:
+        data = {
+            'assetid': assetid,
+            'sessionid': self._session_id,
+            'contextid': game.context_id,
+            'appid': game.app_id,
+            'amount': 1,
+            'price': money_to_receive,
+        }
+        headers = {'Referer': f'{SteamUrl.COMMUNITY_URL}/profiles/{self._steam_guard["steamid"]}/inventory'}
+
+        response = await self._request('POST', f'{SteamUrl.COMMUNITY_URL}/market/sellitem/', data=data, headers=headers)
+        response = await response.json(content_type=None)
+        has_pending_confirmation = 'pending confirmation' in response.get('message', '')
+        needs_confirmation = response.get('needs_mobile_confirmation') or (
+            not response.get('success') and has_pending_confirmation
+        )
+        if confirm_listing and needs_confirmation:
+            return await self._confirm_sell_listing(assetid)
+
+        return response
+
+    @login_required
+    async def create_buy_order(
+        self,
+        market_name: str,
+        price_single_item: str,
+        quantity: int,
+        game: GameOptions,
+        currency: Currency = Currency.USD,
+    ) -> dict:
+        data = {
+            'sessionid': self._session_id,
+            'currency': currency.value,
+            'appid': game.app_id,
+            'market_hash_name': market_name,
+            'price_total': str(Decimal(price_single_item) * Decimal(quantity)),
+            'quantity': quantity,
+        }
+        headers = {
+            'Referer': f'{SteamUrl.COMMUNITY_URL}/market/listings/{game.app_id}/{urllib.parse.quote(market_name)}',
+        }
+
+        url = f'{SteamUrl.COMMUNITY_URL}/market/createbuyorder/'
+        response = await (await self._request('POST', url, data=data, headers=headers)).json(content_type=None)
+
+        if (success := response.get('success')) != 1:
+            raise ApiException(
+                f'There was a problem creating the order. Are you using the right currency? success: {success}',
+            )
+
+        return response
+
+    @login_required
+    async def buy_item(
+        self,
+        market_name: str,
+        market_id: str,
+        price: int,
+        fee: int,
+        game: GameOptions,
+        currency: Currency = Currency.USD,
+    ) -> dict:
+        data = {
+            'sessionid': self._session_id,
+            'currency': currency.value,
+            'subtotal': price - fee,
+            'fee': fee,
+            'total': price,
+            'quantity': '1',
+        }
+        headers = {
+            'Referer': f'{SteamUrl.COMMUNITY_URL}/market/listings/{game.app_id}/{urllib.parse.quote(market_name)}',
+        }
+        url = f'{SteamUrl.COMMUNITY_URL}/market/buylisting/{market_id}'
+        response = await (await self._request('POST', url, data=data, headers=headers)).json(content_type=None)
+
+        try:
+            if (success := response['wallet_info']['success']) != 1:
+                raise ApiException(
+                    f'There was a problem buying this item. Are you using the right currency? success: {success}',
+                )
+        except Exception:
+            raise ApiException(f'There was a problem buying this item. Message: {response.get("message")}')
+
+        return response
+
+    @login_required
+    async def cancel_sell_order(self, sell_listing_id: str) -> None:
+        data = {'sessionid': self._session_id}
+        headers = {'Referer': f'{SteamUrl.COMMUNITY_URL}/market/'}
+        url = f'{SteamUrl.COMMUNITY_URL}/market/removelisting/{sell_listing_id}'
+
+        response = await self._request('POST', url, data=data, headers=headers)
+        if response.status != HTTPStatus.OK:
+            raise ApiException(f'There was a problem removing the listing. HTTP code: {response.status}')
+
+    @login_required
+    async def cancel_buy_order(self, buy_order_id) -> dict:
+        data = {'sessionid': self._session_id, 'buy_orderid': buy_order_id}
+        headers = {'Referer': f'{SteamUrl.COMMUNITY_URL}/market'}
+        url = f'{SteamUrl.COMMUNITY_URL}/market/cancelbuyorder/'
+        response = await (await self._request('POST', url, data=data, headers=headers)).json(content_type=None)
+
+        if (success := response.get('success')) != 1:
+            raise ApiException(f'There was a problem canceling the order. success: {success}')
+
+        return response
+
+    async def _confirm_sell_listing(self, asset_id: str) -> dict:
+        return await self._get_confirmation_executor().confirm_sell_listing(asset_id)
+
+    def _get_confirmation_executor(self) -> AsyncConfirmationExecutor:
+        # One executor per account keeps its confirmation index between calls
+        if self._confirmation_executor is None:
+            self._confirmation_executor = AsyncConfirmationExecutor(
+                self._steam_guard['identity_secret'], self._steam_guard['steamid'], self._request,
+            )
+        return self._confirmation_executor
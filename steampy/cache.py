@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import copy
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+DEFAULT_TTLS = {
+    'priceoverview': 60,
+    'pricehistory': 3600,
+    'escrow': 600,
+}
+
+
+class ResponseCache(ABC):
+    def __init__(self, max_size: int = 1024, ttls: dict[str, float] | None = None) -> None:
+        self.max_size = max_size
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, endpoint: str, key: tuple) -> dict | None:
+        with self._lock:
+            value = self._get(self._make_key(endpoint, key), time.time())
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def set(self, endpoint: str, key: tuple, value: dict) -> None:
+        ttl = self.ttls.get(endpoint)
+        if not ttl:
+            return
+        with self._lock:
+            self._set(self._make_key(endpoint, key), value, time.time() + ttl)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clear()
+
+    @staticmethod
+    def _make_key(endpoint: str, key: tuple) -> str:
+        return json.dumps([endpoint, *key])
+
+    @abstractmethod
+    def _get(self, key: str, now: float) -> dict | None:
+        pass
+
+    @abstractmethod
+    def _set(self, key: str, value: dict, expires_at: float) -> None:
+        pass
+
+    @abstractmethod
+    def _clear(self) -> None:
+        pass
+
+
+class MemoryCache(ResponseCache):
+    def __init__(self, max_size: int = 1024, ttls: dict[str, float] | None = None) -> None:
+        super().__init__(max_size, ttls)
+        self._entries: OrderedDict[str, tuple[dict, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _get(self, key: str, now: float) -> dict | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= now:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        # Callers get their own copy, so changing a response does not change the cached one
+        return copy.deepcopy(value)
+
+    def _set(self, key: str, value: dict, expires_at: float) -> None:
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _clear(self) -> None:
+        self._entries.clear()
+
+
+class SqliteCache(ResponseCache):
+    def __init__(self, path: str, max_size: int = 100_000, ttls: dict[str, float] | None = None) -> None:
+        super().__init__(max_size, ttls)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS cache '
+            '(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)',
+        )
+        self._connection.execute('CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)')
+        self._connection.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def _get(self, key: str, now: float) -> dict | None:
+        row = self._connection.execute('SELECT value, expires_at FROM cache WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at <= now:
+            self._connection.execute('DELETE FROM cache WHERE key = ?', (key,))
+            self._connection.commit()
+            return None
+        self._connection.execute('UPDATE cache SET accessed_at = ? WHERE key = ?', (now, key))
+        self._connection.commit()
+        return json.loads(value)
+
+    def _set(self, key: str, value: dict, expires_at: float) -> None:
+        self._connection.execute(
+            'INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)',
+            (key, json.dumps(value), expires_at, time.time()),
+        )
+        self._connection.execute(
+            'DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)',
+            (self.max_size,),
+        )
+        self._connection.commit()
+
+    def _clear(self) -> None:
+        self._connection.execute('DELETE FROM cache')
+        self._connection.commit()
@@ -4,30 +4,43 @@ import json
 import re
 import urllib.parse as urlparse
 from decimal import Decimal
+from http import HTTPStatus
+from typing import TYPE_CHECKING
 
 import requests
 import time
 
 from steampy import guard
+from steampy.cache import MemoryCache, ResponseCache
 from steampy.confirmation import ConfirmationExecutor
 from steampy.exceptions import ApiException, SevenDaysHoldException, TooManyRequests
 from steampy.login import InvalidCredentials, LoginExecutor
 from steampy.market import SteamMarket
 from steampy.models import Asset, GameOptions, SteamUrl, TradeOfferState
+from steampy.rate_limit import RateLimitedSession, RateLimiter
+from steampy.session_store import SessionStore
 from steampy.utils import (
+    SessionState,
+    VersionedCookieJar,
     account_id_to_steam_id,
+    decode_jwt_payload,
     get_description_key,
     get_key_value_from_url,
     login_required,
+    merge_items,
     merge_items_with_descriptions_from_inventory,
     merge_items_with_descriptions_from_offer,
     merge_items_with_descriptions_from_offers,
     ping_proxy,
+    run_bulk,
     steam_id_to_account_id,
     text_between,
     texts_between,
 )
 
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
 
 class SteamClient:
     def __init__(
@@ -38,9 +51,15 @@ class SteamClient:
         steam_guard: str | None = None,
         login_cookies: dict | None = None,
         proxies: dict | None = None,
+        rate_limiter: RateLimiter | None = None,
+        cache: ResponseCache | None = None,
+        session_store: SessionStore | None = None,
+        session_check_interval: float = 30,
     ) -> None:
         self._api_key = api_key
-        self._session = requests.Session()
+        self._session = RateLimitedSession(rate_limiter) if rate_limiter is not None else requests.Session()
+        self._session.cookies = VersionedCookieJar()
+        self._session_state = SessionState()
 
         if proxies:
             self.set_proxies(proxies)
@@ -54,8 +73,14 @@ class SteamClient:
         self.was_login_executed = False
         self.username = username
         self._password = password
-        self.market = SteamMarket(self._session)
+        self.market = SteamMarket(self._session, cache)
+        self._escrow_cache = cache if cache is not None else MemoryCache()
         self._access_token = None
+        self._refresh_token = None
+        self._session_store = session_store
+        self.session_check_interval = session_check_interval
+        self._session_alive = False
+        self._session_alive_checked_at = None
 
         if login_cookies:
             self.set_login_cookies(login_cookies)
@@ -75,16 +100,24 @@ class SteamClient:
     def set_login_cookies(self, cookies: dict) -> None:
         self._session.cookies.update(cookies)
         self.was_login_executed = True
+        self._session_alive_checked_at = None
+        self._session_state.invalidate()
+        if 'steamLoginSecure' in cookies:
+            self._access_token = self._set_access_token()
         if self.steam_guard is None:
             self.steam_guard = {'steamid': str(self.get_steam_id())}
         self.market._set_login_executed(self.steam_guard, self._get_session_id())
 
     @login_required
     def get_steam_id(self) -> int:
+        if self._session_state.steam_id is not None:
+            return self._session_state.steam_id
+
         url = SteamUrl.COMMUNITY_URL
         response = self._session.get(url)
         if steam_id := re.search(r'g_steamID = "(\d+)";', response.text):
-            return int(steam_id.group(1))
+            self._session_state.steam_id = int(steam_id.group(1))
+            return self._session_state.steam_id
         raise ValueError(f'Invalid steam_id: {steam_id}')
 
     def login(self, username: str | None = None, password: str | None = None, steam_guard: str | None = None) -> None:
@@ -105,11 +138,58 @@ class SteamClient:
         if self.was_login_executed and self.is_session_alive():
             return  # Session is alive, no need to login again
 
+        if self._session_store is not None and self._restore_session():
+            return  # Stored session is alive, no need to login again
+
+        self._session_state.invalidate()
         self._session.cookies.set('steamRememberLogin', 'true')
-        LoginExecutor(self.username, self._password, self.steam_guard['shared_secret'], self._session).login()
+        login_executor = LoginExecutor(self.username, self._password, self.steam_guard['shared_secret'], self._session)
+        login_executor.login()
+        self._refresh_token = login_executor.refresh_token
         self.was_login_executed = True
+        self._set_session_alive(True)
         self.market._set_login_executed(self.steam_guard, self._get_session_id())
         self._access_token = self._set_access_token()
+        if self._session_store is not None:
+            self._session_store.save(self.username, self.export_session())
+
+    def export_session(self) -> dict:
+        cookies = [
+            {
+                'name': cookie.name,
+                'value': cookie.value,
+                'domain': cookie.domain,
+                'path': cookie.path,
+                'secure': cookie.secure,
+                'expires': cookie.expires,
+            }
+            for cookie in self._session.cookies
+        ]
+        return {'cookies': cookies, 'refresh_token': self._refresh_token, 'access_token': self._access_token}
+
+    def import_session(self, session_data: dict) -> None:
+        for cookie in session_data['cookies']:
+            self._session.cookies.set(**cookie)
+        self._refresh_token = session_data.get('refresh_token')
+        self._access_token = session_data.get('access_token')
+        self._session_alive_checked_at = None
+        self._session_state.invalidate()
+
+    def _restore_session(self) -> bool:
+        session_data = self._session_store.load(self.username)
+        if session_data is None:
+            return False
+
+        self.import_session(session_data)
+        self.was_login_executed = True
+        if not self.is_session_alive():
+            self.was_login_executed = False
+            self._session.cookies.clear()
+            self._session_store.delete(self.username)
+            return False
+
+        self.market._set_login_executed(self.steam_guard, self._get_session_id())
+        return True
 
     def _set_access_token(self) ->str :
         steam_login_secure_cookies = [cookie for cookie in self._session.cookies if cookie.name == 'steamLoginSecure']
@@ -122,16 +202,61 @@ class SteamClient:
         access_token = access_token_parts[1]
         return access_token
 
+    def _get_access_token(self) -> str | None:
+        if self._access_token is not None and self._is_access_token_expiring() and self._get_refresh_token():
+            self.refresh_access_token()
+        return self._access_token
+
+    def _is_access_token_expiring(self, margin: int = 60) -> bool:
+        try:
+            expires_at = decode_jwt_payload(self._access_token)['exp']
+        except (ValueError, KeyError, IndexError):
+            return False  # Not a JWT, let Steam decide if it is still valid
+        return expires_at - margin <= time.time()
+
+    def _get_refresh_token(self) -> str | None:
+        if self._refresh_token:
+            return self._refresh_token
+        # Sessions created from browser cookies carry the refresh token in the steamRefresh_steam cookie
+        for cookie in self._session.cookies:
+            if cookie.name == 'steamRefresh_steam':
+                return urlparse.unquote(cookie.value).split('||')[-1]
+        return None
+
+    def refresh_access_token(self) -> str:
+        refresh_token = self._get_refresh_token()
+        if not refresh_token:
+            raise InvalidCredentials('Refresh token not available, use login method first')
+
+        steam_id = self.steam_guard['steamid']
+        params = {'refresh_token': refresh_token, 'steamid': steam_id}
+        response = self.api_call('POST', 'IAuthenticationService', 'GenerateAccessTokenForApp', 'v1', params).json()
+        access_token = response.get('response', {}).get('access_token')
+        if not access_token:
+            raise ApiException('Cannot refresh access token')
+
+        self._access_token = access_token
+        steam_login_secure = urlparse.quote(f'{steam_id}||{access_token}')
+        for domain in (SteamUrl.COMMUNITY_URL[8:], SteamUrl.STORE_URL[8:]):
+            self._session.cookies.set('steamLoginSecure', steam_login_secure, domain=domain, path='/', secure=True)
+        if self._session_store is not None:
+            self._session_store.save(self.username, self.export_session())
+        return access_token
+
     @login_required
     def logout(self) -> None:
         url = f'{SteamUrl.COMMUNITY_URL}/login/logout/'
         data = {'sessionid': self._get_session_id()}
         self._session.post(url, data=data)
 
+        self._session_alive_checked_at = None
         if self.is_session_alive():
             raise Exception('Logout unsuccessful')
 
         self.was_login_executed = False
+        self._session_state.invalidate()
+        if self._session_store is not None:
+            self._session_store.delete(self.username)
 
     def __enter__(self):
         self.login(self.username, self._password, self.steam_guard_string)
@@ -142,9 +267,33 @@ class SteamClient:
 
     @login_required
     def is_session_alive(self) -> bool:
-        steam_login = self.username
-        main_page_response = self._session.get(SteamUrl.COMMUNITY_URL)
-        return steam_login.lower() in main_page_response.text.lower()
+        checked_at = self._session_alive_checked_at
+        if checked_at is not None and time.monotonic() - checked_at < self.session_check_interval:
+            return self._session_alive
+
+        try:
+            # Renews an expiring access token, a session without valid token and refresh token is dead
+            if self._access_token is not None and self._is_access_token_expiring(margin=0):
+                self._get_access_token()
+            if self._access_token is not None and self._is_access_token_expiring(margin=0):
+                return self._set_session_alive(False)
+        except (ApiException, InvalidCredentials):
+            return self._set_session_alive(False)
+
+        # A few hundred bytes of json instead of the whole community page
+        response = self._session.get(f'{SteamUrl.COMMUNITY_URL}/chat/clientjstoken')
+        try:
+            response_dict = response.json()
+        except ValueError:
+            return self._set_session_alive(False)
+        if response_dict.get('logged_in') and response_dict.get('steamid'):
+            self._session_state.steam_id = int(response_dict['steamid'])
+        return self._set_session_alive(bool(response_dict.get('logged_in')))
+
+    def _set_session_alive(self, alive: bool) -> bool:
+        self._session_alive = alive
+        self._session_alive_checked_at = time.monotonic()
+        return alive
 
     def api_call(
         self, method: str, interface: str, api_method: str, version: str, params: dict | None = None,
@@ -174,38 +323,78 @@ class SteamClient:
         url = f'{SteamUrl.COMMUNITY_URL}/inventory/{partner_steam_id}/{game.app_id}/{game.context_id}'
         params = {'l': 'english', 'count': count}
 
+        response_dict = self._fetch_inventory_page(url, params)
+        return merge_items_with_descriptions_from_inventory(response_dict, game) if merge else response_dict
+
+    @login_required
+    def iter_inventory(
+        self, steam_id: str, game: GameOptions, page_size: int = 2000, merge: bool = True,
+    ) -> Iterator[dict]:
+        url = f'{SteamUrl.COMMUNITY_URL}/inventory/{steam_id}/{game.app_id}/{game.context_id}'
+        params = {'l': 'english', 'count': page_size}
+
+        while True:
+            response_dict = self._fetch_inventory_page(url, params)
+            yield merge_items_with_descriptions_from_inventory(response_dict, game) if merge else response_dict
+            if not response_dict.get('more_items') or not response_dict.get('last_assetid'):
+                return
+            params = {**params, 'start_assetid': response_dict['last_assetid']}
+
+    @login_required
+    def get_full_inventory(self, steam_id: str, game: GameOptions, page_size: int = 2000) -> dict:
+        inventory = {}
+        for page in self.iter_inventory(steam_id, game, page_size):
+            inventory.update(page)
+        return inventory
+
+    def _fetch_inventory_page(self, url: str, params: dict) -> dict:
         full_response = self._session.get(url, params=params)
-        response_dict = full_response.json()
-        if full_response.status_code == 429:
+        if full_response.status_code == HTTPStatus.TOO_MANY_REQUESTS:
             raise TooManyRequests('Too many requests, try again later.')
 
+        response_dict = full_response.json()
         if response_dict is None or response_dict.get('success') != 1:
             raise ApiException('Success value should be 1.')
 
-        return merge_items_with_descriptions_from_inventory(response_dict, game) if merge else response_dict
+        return response_dict
 
     def _get_session_id(self) -> str:
-        return self._session.cookies.get_dict(domain="steamcommunity.com", path="/").get('sessionid')
+        cookies = self._session.cookies
+        if self._session_state.session_id is None or self._session_state.cookies_version != cookies.version:
+            self._session_state.session_id = cookies.get_dict(domain='steamcommunity.com', path='/').get('sessionid')
+            self._session_state.cookies_version = cookies.version
+        return self._session_state.session_id
 
-    def get_trade_offers_summary(self) -> dict:
+    def get_trade_offers_summary(self, time_last_visit: int | None = None) -> dict:
         params = {'key': self._api_key}
+        if time_last_visit is not None:
+            params['time_last_visit'] = time_last_visit
         return self.api_call('GET', 'IEconService', 'GetTradeOffersSummary', 'v1', params).json()
 
-    def get_trade_offers(self, merge: bool = True, get_sent_offers: bool = True, get_received_offers: bool = True, use_webtoken: bool =False, max_retry:int = 5) -> dict:
-        params = {'key' if not use_webtoken else 'access_token': self._api_key if not use_webtoken else self._access_token,
+    def get_trade_offers(
+        self,
+        merge: bool = True,
+        get_sent_offers: bool = True,
+        get_received_offers: bool = True,
+        use_webtoken: bool = False,
+        max_retry: int = 5,
+        time_historical_cutoff: int | None = None,
+        get_descriptions: bool = True,
+    ) -> dict:
+        params = {'key' if not use_webtoken else 'access_token': self._api_key if not use_webtoken else self._get_access_token(),
                   'get_sent_offers': int(get_sent_offers),
                   'get_received_offers': int(get_received_offers),
-                  'get_descriptions': 1,
+                  'get_descriptions': int(get_descriptions),
                   'language': 'english',
                   'active_only': 1,
                   'historical_only': 0,
-                  'time_historical_cutoff': ''}
+                  'time_historical_cutoff': time_historical_cutoff if time_historical_cutoff is not None else ''}
 
         response = self._try_to_get_trade_offers(params ,max_retry)
         if response is None:
             raise ApiException('Cannot get proper json from get_trade_offers method')
-        response_with_active_offers = self._filter_non_active_offers(response)
-        if merge:
+        response_with_active_offers = self._filter_non_active_offers(response, time_historical_cutoff)
+        if merge and get_descriptions:
             return merge_items_with_descriptions_from_offers(response_with_active_offers)
         else:
             return response_with_active_offers
@@ -222,16 +411,18 @@ class SteamClient:
         return response
 
     @staticmethod
-    def _filter_non_active_offers(offers_response):
+    def _filter_non_active_offers(offers_response, time_historical_cutoff: int | None = None):
         offers_received = offers_response['response'].get('trade_offers_received', [])
         offers_sent = offers_response['response'].get('trade_offers_sent', [])
 
-        offers_response['response']['trade_offers_received'] = list(
-            filter(lambda offer: offer['trade_offer_state'] == TradeOfferState.Active, offers_received),
-        )
-        offers_response['response']['trade_offers_sent'] = list(
-            filter(lambda offer: offer['trade_offer_state'] == TradeOfferState.Active, offers_sent),
-        )
+        def is_active_or_updated(offer: dict) -> bool:
+            if offer['trade_offer_state'] == TradeOfferState.Active:
+                return True
+            # Offers changed after the cutoff are returned by steam on purpose, e.g. to see accepted offers
+            return time_historical_cutoff is not None and offer.get('time_updated', 0) >= time_historical_cutoff
+
+        offers_response['response']['trade_offers_received'] = list(filter(is_active_or_updated, offers_received))
+        offers_response['response']['trade_offers_sent'] = list(filter(is_active_or_updated, offers_sent))
 
         return offers_response
 
@@ -240,7 +431,7 @@ class SteamClient:
             'tradeofferid': trade_offer_id,
             'language': 'english'}
         if use_webtoken:
-            params['access_token'] = self._access_token
+            params['access_token'] = self._get_access_token()
         else:
             params['key'] = self._api_key
 
@@ -268,42 +459,156 @@ class SteamClient:
             'max_trades': max_trades,
             'start_after_time': start_after_time,
             'start_after_tradeid': start_after_tradeid,
-            'get_descriptions': get_descriptions,
-            'navigating_back': navigating_back,
-            'include_failed': include_failed,
-            'include_total': include_total,
+            'get_descriptions': int(get_descriptions),
+            'navigating_back': int(navigating_back),
+            'include_failed': int(include_failed),
+            'include_total': int(include_total),
         }
         return self.api_call('GET', 'IEconService', 'GetTradeHistory', 'v1', params).json()
 
+    def iter_trade_history(
+        self,
+        since: int | None = None,
+        page_size: int = 100,
+        get_descriptions: bool = True,
+        include_failed: bool = True,
+    ) -> Iterator[dict]:
+        # Trades come newest first, every page starts after the last trade of the previous one
+        start_after_time = start_after_tradeid = None
+        while True:
+            response = self.get_trade_history(
+                page_size,
+                start_after_time,
+                start_after_tradeid,
+                get_descriptions=get_descriptions,
+                navigating_back=False,
+                include_failed=include_failed,
+                include_total=False,
+            )
+            trades = self._get_trades_from_history_page(response, get_descriptions)
+            for trade in trades:
+                if since is not None and trade['time_init'] < since:
+                    return
+                yield trade
+
+            if not trades or not response['response'].get('more'):
+                return
+            start_after_time, start_after_tradeid = trades[-1]['time_init'], trades[-1]['tradeid']
+
+    @staticmethod
+    def _get_trades_from_history_page(response: dict, merge: bool) -> list[dict]:
+        trades = response['response'].get('trades', [])
+        if not merge:
+            return trades
+
+        descriptions = {get_description_key(item): item for item in response['response'].get('descriptions', [])}
+        for trade in trades:
+            for key in ('assets_received', 'assets_given'):
+                merged_assets = {}
+                for asset in trade.get(key, []):
+                    if get_description_key(asset) not in descriptions:
+                        # Steam omits descriptions of some items, e.g. deleted ones, they are kept unmerged
+                        merged_assets[asset['assetid']] = {**asset, 'id': asset['assetid']}
+                        continue
+                    merged_assets.update(merge_items([asset], descriptions))
+                    # Ids of the items after the trade are not part of descriptions
+                    if 'new_assetid' in asset:
+                        merged_assets[asset['assetid']].update(
+                            new_assetid=asset['new_assetid'], new_contextid=asset.get('new_contextid'),
+                        )
+                trade[key] = merged_assets
+        return trades
+
     @login_required
     def get_trade_receipt(self, trade_id: str):
         html = self._session.get(f'https://steamcommunity.com/trade/{trade_id}/receipt').content.decode()
         return [json.loads(item) for item in texts_between(html, 'oItem = ', ';\r\n\toItem')]
 
     @login_required
-    def accept_trade_offer(self, trade_offer_id: str) -> dict:
-        trade = self.get_trade_offer(trade_offer_id, use_webtoken=True)
-        trade_offer_state = TradeOfferState(trade['response']['offer']['trade_offer_state'])
+    def accept_trade_offer(self, trade_offer: str | dict, check_trade_hold: bool = False) -> dict:
+        if isinstance(trade_offer, dict):
+            offer = trade_offer
+        else:
+            offer = self.get_trade_offer(trade_offer, merge=False, use_webtoken=True)['response']['offer']
+        trade_offer_id = offer['tradeofferid']
+        self._check_trade_offer_state(offer)
+
+        # The offer page is only needed to detect a trade hold or when the partner is unknown
+        if check_trade_hold or 'accountid_other' not in offer:
+            partner = self._fetch_trade_partner_id(trade_offer_id)
+        else:
+            partner = account_id_to_steam_id(offer['accountid_other'])
+        response = self._send_accept_request(trade_offer_id, partner)
+        if response.get('needs_mobile_confirmation', False):
+            return self._confirm_transaction(trade_offer_id)
+
+        return response
+
+    @login_required
+    def accept_trade_offers(
+        self, offers: Iterable[str | dict], max_workers: int = 4, confirm_trades: bool = True,
+    ) -> dict[str, dict]:
+        offers_by_id = {offer['tradeofferid'] if isinstance(offer, dict) else str(offer): offer for offer in offers}
+        if any(not isinstance(offer, dict) for offer in offers_by_id.values()):
+            # One GetTradeOffers call replaces a GetTradeOffer call and an offer page download per offer
+            response = self.get_trade_offers(merge=False, get_sent_offers=False, get_descriptions=False)
+            received_offers = {offer['tradeofferid']: offer for offer in response['response']['trade_offers_received']}
+            offers_by_id = {
+                offer_id: offer if isinstance(offer, dict) else received_offers.get(offer_id)
+                for offer_id, offer in offers_by_id.items()
+            }
+
+        results = {}
+        calls = {}
+        for offer_id, offer in offers_by_id.items():
+            if offer is None:
+                results[offer_id] = {'success': False, 'error': 'Trade offer is not an active received offer'}
+            else:
+                try:
+                    self._check_trade_offer_state(offer)
+                except ApiException as exception:
+                    results[offer_id] = {'success': False, 'error': str(exception)}
+                else:
+                    calls[offer_id] = (offer_id, account_id_to_steam_id(offer['accountid_other']))
+
+        results.update(run_bulk(self._send_accept_request, calls, max_workers))
+        for offer_id in calls:
+            result = results[offer_id]
+            result['needs_confirmation'] = bool(result.get('needs_mobile_confirmation'))
+            result['confirmed'] = False
+            # Steam replies with only `strError` when it refuses to accept the offer
+            self._set_trade_result(result, 'tradeid' in result or result['needs_confirmation'])
+
+        pending_offer_ids = [offer_id for offer_id in calls if results[offer_id]['needs_confirmation']]
+        if confirm_trades and pending_offer_ids:
+            try:
+                confirmed = self.get_confirmation_executor().confirm_trade_offers(pending_offer_ids)
+            except Exception as exception:
+                confirmed = {}
+                for offer_id in pending_offer_ids:
+                    results[offer_id]['confirmation_error'] = str(exception)
+            for offer_id in pending_offer_ids:
+                results[offer_id]['confirmed'] = confirmed.get(offer_id, False)
+
+        return {offer_id: results[offer_id] for offer_id in offers_by_id}
+
+    @staticmethod
+    def _check_trade_offer_state(offer: dict) -> None:
+        trade_offer_state = TradeOfferState(offer['trade_offer_state'])
         if trade_offer_state is not TradeOfferState.Active:
             raise ApiException(f'Invalid trade offer state: {trade_offer_state.name} ({trade_offer_state.value})')
 
-        partner = self._fetch_trade_partner_id(trade_offer_id)
-        session_id = self._get_session_id()
+    def _send_accept_request(self, trade_offer_id: str, partner: str) -> dict:
         accept_url = f'{SteamUrl.COMMUNITY_URL}/tradeoffer/{trade_offer_id}/accept'
         params = {
-            'sessionid': session_id,
+            'sessionid': self._get_session_id(),
             'tradeofferid': trade_offer_id,
             'serverid': '1',
             'partner': partner,
             'captcha': '',
         }
         headers = {'Referer': self._get_trade_offer_url(trade_offer_id)}
-
-        response = self._session.post(accept_url, data=params, headers=headers).json()
-        if response.get('needs_mobile_confirmation', False):
-            return self._confirm_transaction(trade_offer_id)
-
-        return response
+        return self._session.post(accept_url, data=params, headers=headers).json()
 
     def _fetch_trade_partner_id(self, trade_offer_id: str) -> str:
         url = self._get_trade_offer_url(trade_offer_id)
@@ -315,10 +620,11 @@ class SteamClient:
         return text_between(offer_response_text, "var g_ulTradePartnerSteamID = '", "';")
 
     def _confirm_transaction(self, trade_offer_id: str) -> dict:
-        confirmation_executor = ConfirmationExecutor(
-            self.steam_guard['identity_secret'], self.steam_guard['steamid'], self._session,
-        )
-        return confirmation_executor.send_trade_allow_request(trade_offer_id)
+        return self.get_confirmation_executor().send_trade_allow_request(trade_offer_id)
+
+    @login_required
+    def get_confirmation_executor(self) -> ConfirmationExecutor:
+        return self.market._get_confirmation_executor()
 
     def decline_trade_offer(self, trade_offer_id: str) -> dict:
         url = f'https://steamcommunity.com/tradeoffer/{trade_offer_id}/decline'
@@ -330,7 +636,12 @@ class SteamClient:
 
     @login_required
     def make_offer(
-        self, items_from_me: list[Asset], items_from_them: list[Asset], partner_steam_id: str, message: str = '',
+        self,
+        items_from_me: list[Asset],
+        items_from_them: list[Asset],
+        partner_steam_id: str,
+        message: str = '',
+        confirm_trade: bool = True,
     ) -> dict:
         offer = self._create_offer_dict(items_from_me, items_from_them)
         session_id = self._get_session_id()
@@ -352,7 +663,7 @@ class SteamClient:
         }
 
         response = self._session.post(url, data=params, headers=headers).json()
-        if response.get('needs_mobile_confirmation'):
+        if confirm_trade and response.get('needs_mobile_confirmation'):
             response.update(self._confirm_transaction(response['tradeofferid']))
 
         return response
@@ -379,17 +690,34 @@ class SteamClient:
         }
 
     @login_required
-    def get_escrow_duration(self, trade_offer_url: str) -> int:
+    def get_escrow_duration(self, trade_offer_url: str, use_cache: bool = False) -> int:
+        cache_key = self._get_escrow_cache_key(trade_offer_url)
+        if use_cache and cache_key and (cached_response := self._escrow_cache.get('escrow', cache_key)):
+            return cached_response['escrow_duration']
+
         headers = {
             'Referer': f'{SteamUrl.COMMUNITY_URL}{urlparse.urlparse(trade_offer_url).path}',
             'Origin': SteamUrl.COMMUNITY_URL,
         }
         response = self._session.get(trade_offer_url, headers=headers).text
+        if 'You have logged in from a new device. In order to protect the items' in response:
+            raise SevenDaysHoldException("Account has logged in a new device and can't trade for 7 days")
 
         my_escrow_duration = int(text_between(response, 'var g_daysMyEscrow = ', ';'))
         their_escrow_duration = int(text_between(response, 'var g_daysTheirEscrow = ', ';'))
 
-        return max(my_escrow_duration, their_escrow_duration)
+        escrow_duration = max(my_escrow_duration, their_escrow_duration)
+        if cache_key:
+            self._escrow_cache.set('escrow', cache_key, {'escrow_duration': escrow_duration})
+        return escrow_duration
+
+    @staticmethod
+    def _get_escrow_cache_key(trade_offer_url: str) -> tuple[str, str | None] | None:
+        # Without a partner the url does not identify whose escrow it is, so it is never cached
+        query = urlparse.parse_qs(urlparse.urlparse(trade_offer_url).query)
+        if 'partner' not in query:
+            return None
+        return query['partner'][0], query.get('token', [None])[0]
 
     @login_required
     def make_offer_with_url(
@@ -430,6 +758,71 @@ class SteamClient:
 
         return response
 
+    @login_required
+    def send_offers(
+        self,
+        offers: Iterable[tuple],
+        max_workers: int = 4,
+        max_escrow_duration: int | None = None,
+        confirm_trades: bool = True,
+    ) -> list[dict]:
+        offers = [tuple(offer) for offer in offers]
+        results = {}
+        calls = dict(enumerate(offers))
+        if max_escrow_duration is not None:
+            # Escrow is checked once per partner and token, and cached between calls
+            escrow_keys = [self._get_escrow_cache_key(offer[2]) or offer[2] for offer in offers]
+            trade_offer_urls = {key: (offer[2], True) for key, offer in zip(escrow_keys, offers)}
+            escrow_durations = run_bulk(
+                lambda url, use_cache: {'escrow_duration': self.get_escrow_duration(url, use_cache)},
+                trade_offer_urls,
+                max_workers,
+            )
+            for index in range(len(offers)):
+                escrow_check = escrow_durations[escrow_keys[index]]
+                if 'escrow_duration' not in escrow_check:
+                    results[index] = {'success': False, 'error': escrow_check['error']}
+                elif (escrow_duration := escrow_check['escrow_duration']) > max_escrow_duration:
+                    error = f'Escrow duration of {escrow_duration} days'
+                    results[index] = {'success': False, 'error': error, 'escrow_duration': escrow_duration}
+            calls = {index: offer for index, offer in calls.items() if index not in results}
+
+        sent = run_bulk(
+            lambda items_from_me, items_from_them, trade_offer_url, message='': self.make_offer_with_url(
+                items_from_me, items_from_them, trade_offer_url, message, confirm_trade=False,
+            ),
+            calls,
+            max_workers,
+        )
+        results.update(sent)
+        for index, result in sent.items():
+            result['needs_confirmation'] = bool(result.get('needs_mobile_confirmation'))
+            result['confirmed'] = False
+            self._set_trade_result(result, 'tradeofferid' in result)
+            if max_escrow_duration is not None:
+                result['escrow_duration'] = escrow_durations[escrow_keys[index]]['escrow_duration']
+
+        pending_offer_ids = {
+            result['tradeofferid']: index for index, result in sent.items() if result['needs_confirmation']
+        }
+        if confirm_trades and pending_offer_ids:
+            try:
+                confirmed = self.get_confirmation_executor().confirm_trade_offers(list(pending_offer_ids))
+            except Exception as exception:
+                confirmed = {}
+                for index in pending_offer_ids.values():
+                    results[index]['confirmation_error'] = str(exception)
+            for offer_id, index in pending_offer_ids.items():
+                results[index]['confirmed'] = confirmed.get(offer_id, False)
+
+        return [results[index] for index in range(len(offers))]
+
+    @staticmethod
+    def _set_trade_result(result: dict, success: bool) -> None:
+        result.setdefault('success', success)
+        if 'strError' in result:
+            result.setdefault('error', result['strError'])
+
     @staticmethod
     def _get_trade_offer_url(trade_offer_id: str) -> str:
         return f'{SteamUrl.COMMUNITY_URL}/tradeoffer/{trade_offer_id}'
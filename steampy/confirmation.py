@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import asyncio
 import enum
 import json
+import threading
 import time
 from http import HTTPStatus
 from typing import TYPE_CHECKING
@@ -9,17 +11,28 @@ from typing import TYPE_CHECKING
 from bs4 import BeautifulSoup
 
 from steampy import guard
-from steampy.exceptions import ConfirmationExpected
+from steampy.exceptions import ApiException, ConfirmationExpected
 from steampy.login import InvalidCredentials
 
 if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Iterable
+
+    import aiohttp
     import requests
 
 
 class Confirmation:
-    def __init__(self, data_confid, nonce) -> None:
+    def __init__(self, data_confid, nonce, conf_type=None, creator_id=None) -> None:
         self.data_confid = data_confid
         self.nonce = nonce
+        self.type = conf_type
+        self.creator_id = creator_id
+
+
+class ConfirmationType(enum.IntEnum):
+    GENERIC = 1
+    TRADE = 2
+    MARKET_LISTING = 3
 
 
 class Tag(enum.Enum):
@@ -30,23 +43,102 @@ class Tag(enum.Enum):
 
 
 class ConfirmationExecutor:
+    """Confirms mobile confirmations of one account.
+
+    Confirmations downloaded from `getlist` are kept in an index for `index_ttl` seconds together with
+    trade offer ids and asset ids already read from them, so lookups repeated within that window neither
+    download the list again nor parse details pages. A lookup missing from the index refreshes it once,
+    and a refresh keeps ids resolved for confirmations that are still pending.
+    """
+
     CONF_URL = 'https://steamcommunity.com/mobileconf'
 
-    def __init__(self, identity_secret: str, my_steam_id: str, session: requests.Session) -> None:
+    def __init__(
+        self, identity_secret: str, my_steam_id: str, session: requests.Session, index_ttl: float = 30,
+    ) -> None:
         self._my_steam_id = my_steam_id
         self._identity_secret = identity_secret
         self._session = session
+        self.index_ttl = index_ttl
+        self._index: dict[str, Confirmation] = {}
+        self._index_updated_at = None
+        self._trade_offer_ids: dict[str, str | None] = {}
+        self._asset_ids: dict[str, str | None] = {}
+        self._index_lock = threading.Lock()
 
     def send_trade_allow_request(self, trade_offer_id: str) -> dict:
-        confirmations = self._get_confirmations()
-        confirmation = self._select_trade_offer_confirmation(confirmations, trade_offer_id)
+        index_was_fresh = self._is_index_fresh()
+        try:
+            confirmation = self._select_trade_offer_confirmation(self._get_confirmations(), trade_offer_id)
+        except ConfirmationExpected:
+            if not index_was_fresh:
+                raise
+            confirmation = self._select_trade_offer_confirmation(self._get_confirmations(refresh=True), trade_offer_id)
         return self._send_confirmation(confirmation)
 
     def confirm_sell_listing(self, asset_id: str) -> dict:
-        confirmations = self._get_confirmations()
-        confirmation = self._select_sell_listing_confirmation(confirmations, asset_id)
+        index_was_fresh = self._is_index_fresh()
+        try:
+            confirmation = self._select_sell_listing_confirmation(self._get_confirmations(), asset_id)
+        except ConfirmationExpected:
+            if not index_was_fresh:
+                raise
+            confirmation = self._select_sell_listing_confirmation(self._get_confirmations(refresh=True), asset_id)
         return self._send_confirmation(confirmation)
 
+    def confirm_trade_offers(self, trade_offer_ids: Iterable[str]) -> dict[str, bool]:
+        return self._confirm_many(trade_offer_ids, self._get_trade_offer_id)
+
+    def confirm_sell_listings(self, asset_ids: Iterable[str]) -> dict[str, bool]:
+        return self._confirm_many(asset_ids, self._get_sell_listing_asset_id)
+
+    def confirm_all(
+        self, confirmation_filter: Callable[[Confirmation], bool] | None = None,
+    ) -> list[Confirmation]:
+        confirmations = self._get_confirmations(refresh=True)
+        if confirmation_filter is not None:
+            confirmations = [confirmation for confirmation in confirmations if confirmation_filter(confirmation)]
+        self._send_confirmations(confirmations)
+        return confirmations
+
+    def clear_index(self) -> None:
+        with self._index_lock:
+            self._index = {}
+            self._trade_offer_ids = {}
+            self._asset_ids = {}
+            self._index_updated_at = None
+
+    def _confirm_many(
+        self, target_ids: Iterable[str], get_target_id: Callable[[Confirmation], str | None],
+    ) -> dict[str, bool]:
+        pending_ids = {str(target_id) for target_id in target_ids}
+        if not pending_ids:
+            return {}
+
+        # Look up the index first and refresh it once for ids that are not there yet
+        index_was_fresh = self._is_index_fresh()
+        selected = self._select_confirmations(self._get_confirmations(), pending_ids, get_target_id)
+        if pending_ids and index_was_fresh:
+            confirmations = self._get_confirmations(refresh=True)
+            selected.update(self._select_confirmations(confirmations, pending_ids, get_target_id))
+
+        self._send_confirmations(list(selected.values()))
+        return {**dict.fromkeys(pending_ids, False), **dict.fromkeys(selected, True)}
+
+    @staticmethod
+    def _select_confirmations(
+        confirmations: list[Confirmation], pending_ids: set[str], get_target_id: Callable[[Confirmation], str | None],
+    ) -> dict[str, Confirmation]:
+        selected = {}
+        for confirmation in confirmations:
+            if not pending_ids:
+                break
+            target_id = get_target_id(confirmation)
+            if target_id in pending_ids:
+                selected[target_id] = confirmation
+                pending_ids.remove(target_id)
+        return selected
+
     def _send_confirmation(self, confirmation: Confirmation) -> dict:
         tag = Tag.ALLOW
         params = self._create_confirmation_params(tag.value)
@@ -54,20 +146,64 @@ class ConfirmationExecutor:
         params['cid'] = confirmation.data_confid
         params['ck'] = confirmation.nonce
         headers = {'X-Requested-With': 'XMLHttpRequest'}
-        return self._session.get(f'{self.CONF_URL}/ajaxop', params=params, headers=headers).json()
+        response = self._session.get(f'{self.CONF_URL}/ajaxop', params=params, headers=headers).json()
+        self._remove_from_index([confirmation])
+        return response
+
+    def _send_confirmations(self, confirmations: list[Confirmation]) -> dict | None:
+        if not confirmations:
+            return None
+
+        tag = Tag.ALLOW
+        data = self._create_confirmation_params(tag.value)
+        data['op'] = tag.value
+        data['cid[]'] = [confirmation.data_confid for confirmation in confirmations]
+        data['ck[]'] = [confirmation.nonce for confirmation in confirmations]
+        headers = {'X-Requested-With': 'XMLHttpRequest'}
+        response = self._session.post(f'{self.CONF_URL}/multiajaxop', data=data, headers=headers).json()
+        self._remove_from_index(confirmations)
+        if not response.get('success'):
+            raise ApiException(f'There was a problem sending confirmations. Response: {response}')
+        return response
+
+    def _get_confirmations(self, refresh: bool = False) -> list[Confirmation]:
+        if not refresh and self._is_index_fresh():
+            return list(self._index.values())
 
-    def _get_confirmations(self) -> list[Confirmation]:
-        confirmations = []
         confirmations_page = self._fetch_confirmations_page()
         if confirmations_page.status_code == HTTPStatus.OK:
-            confirmations_json = json.loads(confirmations_page.text)
-            for conf in confirmations_json['conf']:
-                data_confid = conf['id']
-                nonce = conf['nonce']
-                confirmations.append(Confirmation(data_confid, nonce))
-            return confirmations
+            return self._update_index(self._parse_confirmations(json.loads(confirmations_page.text)))
         raise ConfirmationExpected
 
+    def _is_index_fresh(self) -> bool:
+        return self._index_updated_at is not None and time.monotonic() - self._index_updated_at < self.index_ttl
+
+    def _update_index(self, confirmations: list[Confirmation]) -> list[Confirmation]:
+        with self._index_lock:
+            self._index = {str(confirmation.data_confid): confirmation for confirmation in confirmations}
+            # Ids read from details pages stay valid as long as their confirmation is pending
+            self._trade_offer_ids = {
+                confid: offer_id for confid, offer_id in self._trade_offer_ids.items() if confid in self._index
+            }
+            self._asset_ids = {confid: asset_id for confid, asset_id in self._asset_ids.items() if confid in self._index}
+            self._index_updated_at = time.monotonic()
+        return confirmations
+
+    def _remove_from_index(self, confirmations: list[Confirmation]) -> None:
+        with self._index_lock:
+            for confirmation in confirmations:
+                confid = str(confirmation.data_confid)
+                self._index.pop(confid, None)
+                self._trade_offer_ids.pop(confid, None)
+                self._asset_ids.pop(confid, None)
+
+    @staticmethod
+    def _parse_confirmations(confirmations_json: dict) -> list[Confirmation]:
+        return [
+            Confirmation(conf['id'], conf['nonce'], conf.get('type'), conf.get('creator_id'))
+            for conf in confirmations_json['conf']
+        ]
+
     def _fetch_confirmations_page(self) -> requests.Response:
         tag = Tag.CONF.value
         params = self._create_confirmation_params(tag)
@@ -98,20 +234,36 @@ class ConfirmationExecutor:
 
     def _select_trade_offer_confirmation(self, confirmations: list[Confirmation], trade_offer_id: str) -> Confirmation:
         for confirmation in confirmations:
-            confirmation_details_page = self._fetch_confirmation_details_page(confirmation)
-            confirmation_id = self._get_confirmation_trade_offer_id(confirmation_details_page)
-            if confirmation_id == trade_offer_id:
+            if self._get_trade_offer_id(confirmation) == trade_offer_id:
                 return confirmation
         raise ConfirmationExpected
 
     def _select_sell_listing_confirmation(self, confirmations: list[Confirmation], asset_id: str) -> Confirmation:
         for confirmation in confirmations:
-            confirmation_details_page = self._fetch_confirmation_details_page(confirmation)
-            confirmation_id = self._get_confirmation_sell_listing_id(confirmation_details_page)
-            if confirmation_id == asset_id:
+            if self._get_sell_listing_asset_id(confirmation) == asset_id:
                 return confirmation
         raise ConfirmationExpected
 
+    def _get_trade_offer_id(self, confirmation: Confirmation) -> str | None:
+        # For trade confirmations the list payload already holds the trade offer id, no details page needed
+        if confirmation.type is not None:
+            return str(confirmation.creator_id) if confirmation.type == ConfirmationType.TRADE else None
+        confid = str(confirmation.data_confid)
+        if confid not in self._trade_offer_ids:
+            confirmation_details_page = self._fetch_confirmation_details_page(confirmation)
+            self._trade_offer_ids[confid] = self._get_confirmation_trade_offer_id(confirmation_details_page)
+        return self._trade_offer_ids[confid]
+
+    def _get_sell_listing_asset_id(self, confirmation: Confirmation) -> str | None:
+        # Listing confirmations only carry the listing id, the asset id has to be read from the details page
+        if confirmation.type is not None and confirmation.type != ConfirmationType.MARKET_LISTING:
+            return None
+        confid = str(confirmation.data_confid)
+        if confid not in self._asset_ids:
+            confirmation_details_page = self._fetch_confirmation_details_page(confirmation)
+            self._asset_ids[confid] = self._get_confirmation_sell_listing_id(confirmation_details_page)
+        return self._asset_ids[confid]
+
     @staticmethod
     def _get_confirmation_sell_listing_id(confirmation_details_page: str) -> str:
         soup = BeautifulSoup(confirmation_details_page, 'html.parser')
@@ -125,3 +277,330 @@ class ConfirmationExecutor:
         soup = BeautifulSoup(confirmation_details_page, 'html.parser')
         full_offer_id = soup.select('.tradeoffer')[0]['id']
         return full_offer_id.split('_')[1]
+
+
+class ConfirmationWatcher:
+    """Confirms pending confirmations in the background.
+
+    Every `interval` seconds the watcher downloads the confirmation list once and confirms, in batches of
+    `batch_size`, the trade offers and sell listings registered with `expect_trade_offer` and
+    `expect_sell_listing` and every confirmation accepted by `policy`. Together with `confirm_trade=False`
+    and `confirm_listing=False` this lets offers and listings be created without waiting for their confirmation.
+    Registered ids without a confirmation are forgotten after `expectation_ttl` seconds.
+    Errors raised while polling are passed to `on_error` and do not stop the watcher.
+    An `AsyncConfirmationExecutor` can only be polled with `run_async` or `poll_once_async`.
+    """
+
+    def __init__(
+        self,
+        executor: ConfirmationExecutor,
+        policy: Callable[[Confirmation], bool] | None = None,
+        interval: float = 5.0,
+        batch_size: int = 50,
+        on_error: Callable[[Exception], None] | None = None,
+        expectation_ttl: float = 600,
+    ) -> None:
+        self.executor = executor
+        self.policy = policy
+        self.interval = interval
+        self.batch_size = batch_size
+        self.on_error = on_error
+        self.expectation_ttl = expectation_ttl
+        self._expected_trade_offer_ids: dict[str, float] = {}
+        self._expected_asset_ids: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def expect_trade_offer(self, trade_offer_id: str) -> None:
+        with self._lock:
+            self._expected_trade_offer_ids[str(trade_offer_id)] = time.monotonic() + self.expectation_ttl
+
+    def expect_sell_listing(self, asset_id: str) -> None:
+        with self._lock:
+            self._expected_asset_ids[str(asset_id)] = time.monotonic() + self.expectation_ttl
+
+    @property
+    def pending_count(self) -> int:
+        with self._lock:
+            self._drop_expired_expectations()
+            return len(self._expected_trade_offer_ids) + len(self._expected_asset_ids)
+
+    def poll_once(self) -> list[Confirmation]:
+        self._check_executor_is_sync()
+        expected_trade_offer_ids, expected_asset_ids = self._get_expected_ids()
+
+        selected = []
+        for confirmation in self.executor._get_confirmations(refresh=True):
+            trade_offer_id = asset_id = None
+            if expected_trade_offer_ids:
+                trade_offer_id = self.executor._get_trade_offer_id(confirmation)
+            if expected_asset_ids and trade_offer_id not in expected_trade_offer_ids:
+                asset_id = self.executor._get_sell_listing_asset_id(confirmation)
+            if self._is_selected(confirmation, trade_offer_id, asset_id, expected_trade_offer_ids, expected_asset_ids):
+                selected.append((confirmation, trade_offer_id, asset_id))
+
+        for batch in self._get_batches(selected):
+            self.executor._send_confirmations([confirmation for confirmation, _, _ in batch])
+            self._forget_expectations(batch)
+        return [confirmation for confirmation, _, _ in selected]
+
+    async def poll_once_async(self) -> list[Confirmation]:
+        if not isinstance(self.executor, AsyncConfirmationExecutor):
+            # Polling blocks on HTTP requests, so it is moved to a worker thread to keep the event loop responsive
+            return await asyncio.to_thread(self.poll_once)
+
+        expected_trade_offer_ids, expected_asset_ids = self._get_expected_ids()
+        selected = []
+        for confirmation in await self.executor._get_confirmations(refresh=True):
+            trade_offer_id = asset_id = None
+            if expected_trade_offer_ids:
+                trade_offer_id = await self.executor._get_trade_offer_id(confirmation)
+            if expected_asset_ids and trade_offer_id not in expected_trade_offer_ids:
+                asset_id = await self.executor._get_sell_listing_asset_id(confirmation)
+            if self._is_selected(confirmation, trade_offer_id, asset_id, expected_trade_offer_ids, expected_asset_ids):
+                selected.append((confirmation, trade_offer_id, asset_id))
+
+        for batch in self._get_batches(selected):
+            await self.executor._send_confirmations([confirmation for confirmation, _, _ in batch])
+            self._forget_expectations(batch)
+        return [confirmation for confirmation, _, _ in selected]
+
+    def start(self) -> None:
+        self._check_executor_is_sync()
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='ConfirmationWatcher', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    async def run_async(self) -> None:
+        while True:
+            try:
+                await self.poll_once_async()
+            except Exception as e:
+                self._handle_error(e)
+            await asyncio.sleep(self.interval)
+
+    def __enter__(self) -> ConfirmationWatcher:
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            self._poll_safely()
+            self._stop_event.wait(self.interval)
+
+    def _poll_safely(self) -> None:
+        try:
+            self.poll_once()
+        except Exception as e:
+            self._handle_error(e)
+
+    def _handle_error(self, exception: Exception) -> None:
+        if self.on_error is not None:
+            self.on_error(exception)
+
+    def _check_executor_is_sync(self) -> None:
+        if isinstance(self.executor, AsyncConfirmationExecutor):
+            raise TypeError('AsyncConfirmationExecutor can only be polled with run_async or poll_once_async')
+
+    def _get_expected_ids(self) -> tuple[set[str], set[str]]:
+        with self._lock:
+            self._drop_expired_expectations()
+            return set(self._expected_trade_offer_ids), set(self._expected_asset_ids)
+
+    def _drop_expired_expectations(self) -> None:
+        now = time.monotonic()
+        for expected_ids in (self._expected_trade_offer_ids, self._expected_asset_ids):
+            for expired_id in [target_id for target_id, expires_at in expected_ids.items() if expires_at <= now]:
+                del expected_ids[expired_id]
+
+    def _is_selected(
+        self,
+        confirmation: Confirmation,
+        trade_offer_id: str | None,
+        asset_id: str | None,
+        expected_trade_offer_ids: set[str],
+        expected_asset_ids: set[str],
+    ) -> bool:
+        if trade_offer_id in expected_trade_offer_ids or asset_id in expected_asset_ids:
+            return True
+        return self.policy is not None and self.policy(confirmation)
+
+    def _get_batches(self, selected: list[tuple]) -> list[list[tuple]]:
+        return [selected[start:start + self.batch_size] for start in range(0, len(selected), self.batch_size)]
+
+    def _forget_expectations(self, batch: list[tuple[Confirmation, str | None, str | None]]) -> None:
+        with self._lock:
+            for _, trade_offer_id, asset_id in batch:
+                self._expected_trade_offer_ids.pop(trade_offer_id, None)
+                self._expected_asset_ids.pop(asset_id, None)
+
+
+class AsyncConfirmationExecutor(ConfirmationExecutor):
+    def __init__(
+        self, identity_secret: str, my_steam_id: str, request: Callable[..., Awaitable[aiohttp.ClientResponse]],
+    ) -> None:
+        super().__init__(identity_secret, my_steam_id, None)
+        self._request = request
+
+    async def send_trade_allow_request(self, trade_offer_id: str) -> dict:
+        index_was_fresh = self._is_index_fresh()
+        try:
+            confirmation = await self._select_trade_offer_confirmation(await self._get_confirmations(), trade_offer_id)
+        except ConfirmationExpected:
+            if not index_was_fresh:
+                raise
+            confirmations = await self._get_confirmations(refresh=True)
+            confirmation = await self._select_trade_offer_confirmation(confirmations, trade_offer_id)
+        return await self._send_confirmation(confirmation)
+
+    async def confirm_sell_listing(self, asset_id: str) -> dict:
+        index_was_fresh = self._is_index_fresh()
+        try:
+            confirmation = await self._select_sell_listing_confirmation(await self._get_confirmations(), asset_id)
+        except ConfirmationExpected:
+            if not index_was_fresh:
+                raise
+            confirmations = await self._get_confirmations(refresh=True)
+            confirmation = await self._select_sell_listing_confirmation(confirmations, asset_id)
+        return await self._send_confirmation(confirmation)
+
+    async def confirm_trade_offers(self, trade_offer_ids: Iterable[str]) -> dict[str, bool]:
+        return await self._confirm_many(trade_offer_ids, self._get_trade_offer_id)
+
+    async def confirm_sell_listings(self, asset_ids: Iterable[str]) -> dict[str, bool]:
+        return await self._confirm_many(asset_ids, self._get_sell_listing_asset_id)
+
+    async def confirm_all(
+        self, confirmation_filter: Callable[[Confirmation], bool] | None = None,
+    ) -> list[Confirmation]:
+        confirmations = await self._get_confirmations(refresh=True)
+        if confirmation_filter is not None:
+            confirmations = [confirmation for confirmation in confirmations if confirmation_filter(confirmation)]
+        await self._send_confirmations(confirmations)
+        return confirmations
+
+    async def _confirm_many(
+        self, target_ids: Iterable[str], get_target_id: Callable[[Confirmation], Awaitable[str | None]],
+    ) -> dict[str, bool]:
+        pending_ids = {str(target_id) for target_id in target_ids}
+        if not pending_ids:
+            return {}
+
+        index_was_fresh = self._is_index_fresh()
+        selected = await self._select_confirmations_async(await self._get_confirmations(), pending_ids, get_target_id)
+        if pending_ids and index_was_fresh:
+            confirmations = await self._get_confirmations(refresh=True)
+            selected.update(await self._select_confirmations_async(confirmations, pending_ids, get_target_id))
+
+        await self._send_confirmations(list(selected.values()))
+        return {**dict.fromkeys(pending_ids, False), **dict.fromkeys(selected, True)}
+
+    async def _select_confirmations_async(
+        self,
+        confirmations: list[Confirmation],
+        pending_ids: set[str],
+        get_target_id: Callable[[Confirmation], Awaitable[str | None]],
+    ) -> dict[str, Confirmation]:
+        # Target ids may need a details page, so they are resolved one by one and only until all ids are found
+        selected = {}
+        for confirmation in confirmations:
+            if not pending_ids:
+                break
+            target_id = await get_target_id(confirmation)
+            selected.update(self._select_confirmations([confirmation], pending_ids, lambda _: target_id))
+        return selected
+
+    async def _send_confirmation(self, confirmation: Confirmation) -> dict:
+        tag = Tag.ALLOW
+        params = self._create_confirmation_params(tag.value)
+        params['op'] = tag.value
+        params['cid'] = confirmation.data_confid
+        params['ck'] = confirmation.nonce
+        headers = {'X-Requested-With': 'XMLHttpRequest'}
+        response = await self._request('GET', f'{self.CONF_URL}/ajaxop', params=params, headers=headers)
+        self._remove_from_index([confirmation])
+        return await response.json(content_type=None)
+
+    async def _send_confirmations(self, confirmations: list[Confirmation]) -> dict | None:
+        if not confirmations:
+            return None
+
+        tag = Tag.ALLOW
+        data = list(self._create_confirmation_params(tag.value).items())
+        data.append(('op', tag.value))
+        data.extend(('cid[]', confirmation.data_confid) for confirmation in confirmations)
+        data.extend(('ck[]', confirmation.nonce) for confirmation in confirmations)
+        headers = {'X-Requested-With': 'XMLHttpRequest'}
+        response = await self._request('POST', f'{self.CONF_URL}/multiajaxop', data=data, headers=headers)
+        response = await response.json(content_type=None)
+        self._remove_from_index(confirmations)
+        if not response.get('success'):
+            raise ApiException(f'There was a problem sending confirmations. Response: {response}')
+        return response
+
+    async def _get_confirmations(self, refresh: bool = False) -> list[Confirmation]:
+        if not refresh and self._is_index_fresh():
+            return list(self._index.values())
+
+        tag = Tag.CONF.value
+        params = self._create_confirmation_params(tag)
+        headers = {'X-Requested-With': 'com.valvesoftware.android.steam.community'}
+        response = await self._request('GET', f'{self.CONF_URL}/getlist', params=params, headers=headers)
+        response_text = await response.text()
+        if 'Steam Guard Mobile Authenticator is providing incorrect Steam Guard codes.' in response_text:
+            raise InvalidCredentials('Invalid Steam Guard file')
+        if response.status != HTTPStatus.OK:
+            raise ConfirmationExpected
+        return self._update_index(self._parse_confirmations(json.loads(response_text)))
+
+    async def _fetch_confirmation_details_page(self, confirmation: Confirmation) -> str:
+        tag = f'details{confirmation.data_confid}'
+        params = self._create_confirmation_params(tag)
+        response = await self._request('GET', f'{self.CONF_URL}/details/{confirmation.data_confid}', params=params)
+        return (await response.json(content_type=None))['html']
+
+    async def _select_trade_offer_confirmation(
+        self, confirmations: list[Confirmation], trade_offer_id: str,
+    ) -> Confirmation:
+        for confirmation in confirmations:
+            if await self._get_trade_offer_id(confirmation) == trade_offer_id:
+                return confirmation
+        raise ConfirmationExpected
+
+    async def _select_sell_listing_confirmation(
+        self, confirmations: list[Confirmation], asset_id: str,
+    ) -> Confirmation:
+        for confirmation in confirmations:
+            if await self._get_sell_listing_asset_id(confirmation) == asset_id:
+                return confirmation
+        raise ConfirmationExpected
+
+    async def _get_trade_offer_id(self, confirmation: Confirmation) -> str | None:
+        if confirmation.type is not None:
+            return str(confirmation.creator_id) if confirmation.type == ConfirmationType.TRADE else None
+        confid = str(confirmation.data_confid)
+        if confid not in self._trade_offer_ids:
+            confirmation_details_page = await self._fetch_confirmation_details_page(confirmation)
+            self._trade_offer_ids[confid] = self._get_confirmation_trade_offer_id(confirmation_details_page)
+        return self._trade_offer_ids[confid]
+
+    async def _get_sell_listing_asset_id(self, confirmation: Confirmation) -> str | None:
+        if confirmation.type is not None and confirmation.type != ConfirmationType.MARKET_LISTING:
+            return None
+        confid = str(confirmation.data_confid)
+        if confid not in self._asset_ids:
+            confirmation_details_page = await self._fetch_confirmation_details_page(confirmation)
+            self._asset_ids[confid] = self._get_confirmation_sell_listing_id(confirmation_details_page)
+        return self._asset_ids[confid]
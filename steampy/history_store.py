@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from typing import TYPE_CHECKING
+
+from steampy.utils import account_id_to_steam_id
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from steampy.client import SteamClient
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS trades '
+    '(tradeid TEXT PRIMARY KEY, steamid_other TEXT, time_init INTEGER NOT NULL, status INTEGER, data TEXT NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS trade_assets '
+    '(tradeid TEXT NOT NULL, direction TEXT NOT NULL, assetid TEXT NOT NULL, new_assetid TEXT, appid INTEGER, '
+    'contextid TEXT, amount TEXT, market_hash_name TEXT, PRIMARY KEY (tradeid, direction, assetid))',
+    'CREATE TABLE IF NOT EXISTS offers '
+    '(tradeofferid TEXT PRIMARY KEY, tradeid TEXT, steamid_other TEXT, is_our_offer INTEGER, '
+    'trade_offer_state INTEGER, time_created INTEGER, time_updated INTEGER, data TEXT NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS sync_state (name TEXT PRIMARY KEY, value INTEGER)',
+    'CREATE INDEX IF NOT EXISTS trades_steamid_other ON trades (steamid_other)',
+    'CREATE INDEX IF NOT EXISTS trades_time_init ON trades (time_init)',
+    'CREATE INDEX IF NOT EXISTS trade_assets_assetid ON trade_assets (assetid)',
+    'CREATE INDEX IF NOT EXISTS trade_assets_new_assetid ON trade_assets (new_assetid)',
+    'CREATE INDEX IF NOT EXISTS offers_tradeid ON offers (tradeid)',
+    'CREATE INDEX IF NOT EXISTS offers_steamid_other ON offers (steamid_other)',
+    'CREATE INDEX IF NOT EXISTS offers_time_updated ON offers (time_updated)',
+)
+
+
+class TradeHistoryStore:
+    """Keeps trade history and trade offers of an account in a sqlite database.
+
+    `sync_trade_history` and `sync_trade_offers` only download what changed since the previous sync,
+    so queries like "what did this account receive last week" are answered from the local database.
+    Trades are synced again from `overlap` seconds before the newest trade of the last completed sync, which also
+    updates the status of recent trades, e.g. when their escrow ends. A sync that fails partway is repeated
+    from the same point, so no older trades are skipped.
+    """
+
+    def __init__(self, path: str, overlap: int = 0) -> None:
+        self.overlap = overlap
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        for statement in SCHEMA:
+            self._connection.execute(statement)
+        self._connection.commit()
+
+    def sync(self, client: SteamClient) -> dict[str, int]:
+        return {'trades': self.sync_trade_history(client), 'offers': self.sync_trade_offers(client)}
+
+    def sync_trade_history(self, client: SteamClient, batch_size: int = 500) -> int:
+        # Trades come newest first, so the resume point only moves once the whole walk is stored
+        synced_until = self._get_latest_time('SELECT value FROM sync_state WHERE name = ?', ('trades',))
+        since = synced_until - self.overlap if synced_until is not None else None
+        latest_time = synced_until
+        batch = []
+        count = 0
+        for trade in client.iter_trade_history(since=since):
+            batch.append(trade)
+            latest_time = max(latest_time or 0, trade['time_init'])
+            if len(batch) >= batch_size:
+                count += self.add_trades(batch)
+                batch = []
+        count += self.add_trades(batch)
+
+        if latest_time is not None:
+            with self._lock:
+                self._connection.execute(
+                    'INSERT OR REPLACE INTO sync_state (name, value) VALUES (?, ?)', ('trades', latest_time),
+                )
+                self._connection.commit()
+        return count
+
+    def sync_trade_offers(self, client: SteamClient) -> int:
+        # Active offers are always returned, finished ones when they were updated after the cutoff
+        time_historical_cutoff = self._get_latest_time('SELECT MAX(time_updated) FROM offers')
+        response = client.get_trade_offers(
+            merge=False, time_historical_cutoff=time_historical_cutoff, get_descriptions=False,
+        )
+        offers = response['response'].get('trade_offers_received', []) + response['response'].get(
+            'trade_offers_sent', [],
+        )
+        return self.add_offers(offers)
+
+    def add_trades(self, trades: Iterable[dict]) -> int:
+        trade_rows = []
+        asset_rows = []
+        for trade in trades:
+            trade_rows.append(
+                (
+                    trade['tradeid'],
+                    trade.get('steamid_other'),
+                    trade['time_init'],
+                    trade.get('status'),
+                    json.dumps(trade),
+                ),
+            )
+            for direction in ('received', 'given'):
+                asset_rows.extend(
+                    (trade['tradeid'], direction, *self._get_asset_columns(asset))
+                    for asset in self._get_assets(trade.get(f'assets_{direction}', []))
+                )
+
+        with self._lock:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO trades (tradeid, steamid_other, time_init, status, data) '
+                'VALUES (?, ?, ?, ?, ?)',
+                trade_rows,
+            )
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO trade_assets '
+                '(tradeid, direction, assetid, new_assetid, appid, contextid, amount, market_hash_name) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                asset_rows,
+            )
+            self._connection.commit()
+        return len(trade_rows)
+
+    def add_offers(self, offers: Iterable[dict]) -> int:
+        offer_rows = [
+            (
+                offer['tradeofferid'],
+                offer.get('tradeid'),
+                account_id_to_steam_id(offer['accountid_other']) if 'accountid_other' in offer else None,
+                int(offer.get('is_our_offer', False)),
+                offer['trade_offer_state'],
+                offer.get('time_created'),
+                offer.get('time_updated'),
+                json.dumps(offer),
+            )
+            for offer in offers
+        ]
+        with self._lock:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO offers (tradeofferid, tradeid, steamid_other, is_our_offer, trade_offer_state, '
+                'time_created, time_updated, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                offer_rows,
+            )
+            self._connection.commit()
+        return len(offer_rows)
+
+    def get_trade(self, tradeid: str) -> dict | None:
+        rows = self._query('SELECT data FROM trades WHERE tradeid = ?', (tradeid,))
+        return json.loads(rows[0]['data']) if rows else None
+
+    def get_trades(
+        self, partner_steam_id: str | None = None, since: int | None = None, until: int | None = None,
+    ) -> list[dict]:
+        where, params = self._build_filters(
+            ('steamid_other = ?', partner_steam_id), ('time_init >= ?', since), ('time_init < ?', until),
+        )
+        rows = self._query(f'SELECT data FROM trades{where} ORDER BY time_init DESC', params)
+        return [json.loads(row['data']) for row in rows]
+
+    def get_trades_with_asset(self, assetid: str) -> list[dict]:
+        rows = self._query(
+            'SELECT DISTINCT trades.data, trades.time_init FROM trades '
+            'JOIN trade_assets ON trade_assets.tradeid = trades.tradeid '
+            'WHERE trade_assets.assetid = ? OR trade_assets.new_assetid = ? ORDER BY trades.time_init DESC',
+            (assetid, assetid),
+        )
+        return [json.loads(row['data']) for row in rows]
+
+    def get_received_assets(
+        self, since: int | None = None, until: int | None = None, partner_steam_id: str | None = None,
+    ) -> list[dict]:
+        return self._get_assets_by_direction('received', since, until, partner_steam_id)
+
+    def get_given_assets(
+        self, since: int | None = None, until: int | None = None, partner_steam_id: str | None = None,
+    ) -> list[dict]:
+        return self._get_assets_by_direction('given', since, until, partner_steam_id)
+
+    def get_offer(self, tradeofferid: str) -> dict | None:
+        rows = self._query('SELECT data FROM offers WHERE tradeofferid = ?', (tradeofferid,))
+        return json.loads(rows[0]['data']) if rows else None
+
+    def get_offers(
+        self, partner_steam_id: str | None = None, state: int | None = None, since: int | None = None,
+    ) -> list[dict]:
+        where, params = self._build_filters(
+            ('steamid_other = ?', partner_steam_id), ('trade_offer_state = ?', state), ('time_updated >= ?', since),
+        )
+        rows = self._query(f'SELECT data FROM offers{where} ORDER BY time_updated DESC', params)
+        return [json.loads(row['data']) for row in rows]
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def _get_assets_by_direction(
+        self, direction: str, since: int | None, until: int | None, partner_steam_id: str | None,
+    ) -> list[dict]:
+        where, params = self._build_filters(
+            ('trade_assets.direction = ?', direction),
+            ('trades.steamid_other = ?', partner_steam_id),
+            ('trades.time_init >= ?', since),
+            ('trades.time_init < ?', until),
+        )
+        rows = self._query(
+            'SELECT trade_assets.*, trades.steamid_other, trades.time_init FROM trade_assets '
+            f'JOIN trades ON trades.tradeid = trade_assets.tradeid{where} ORDER BY trades.time_init DESC',
+            params,
+        )
+        return [dict(row) for row in rows]
+
+    def _get_latest_time(self, query: str, params: tuple = ()) -> int | None:
+        rows = self._query(query, params)
+        return rows[0][0] if rows else None
+
+    def _query(self, query: str, params: tuple) -> list[sqlite3.Row]:
+        with self._lock:
+            return self._connection.execute(query, params).fetchall()
+
+    @staticmethod
+    def _build_filters(*filters: tuple[str, object]) -> tuple[str, tuple]:
+        conditions = [(condition, value) for condition, value in filters if value is not None]
+        if not conditions:
+            return '', ()
+        where = ' WHERE ' + ' AND '.join(condition for condition, _ in conditions)
+        return where, tuple(value for _, value in conditions)
+
+    @staticmethod
+    def _get_assets(assets: dict | list) -> Iterable[dict]:
+        # Trades from iter_trade_history are merged with descriptions into dicts keyed by asset id
+        return assets.values() if isinstance(assets, dict) else assets
+
+    @staticmethod
+    def _get_asset_columns(asset: dict) -> tuple:
+        return (
+            asset.get('assetid') or asset['id'],
+            asset.get('new_assetid'),
+            asset.get('appid'),
+            asset.get('contextid'),
+            asset.get('amount'),
+            asset.get('market_hash_name'),
+        )
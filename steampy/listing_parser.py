@@ -0,0 +1,131 @@
+"""Regex based parser of market listings pages.
+
+It produces the same dicts as the BeautifulSoup parser in `steampy.utils`, but only scans the markup of listing rows
+instead of building a tree of the whole page, which is several times faster for the `/market` page
+and `mylistings/render` results.
+"""
+
+from __future__ import annotations
+
+import html as html_lib
+import re
+
+_ATTRIBUTE_REGEX = re.compile(r'''([\w:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)')''')
+_TAG_REGEX = re.compile(r'<[^>]*>')
+_WHITESPACE_TEXT_REGEX = re.compile(r'>([ \t\n\r\f]+)<')
+_SECTION_REGEX = re.compile(r'<div\b[^>]*\sclass="(?:[^"]*\s)?market_home_listing_table(?:\s[^"]*)?"[^>]*>')
+_SELL_LISTING_REGEX = re.compile(r'<div\b[^>]*\sid="mylisting_\d+"[^>]*>')
+_BUY_ORDER_REGEX = re.compile(r'<div\b[^>]*\sid="mybuyorder_\d+"[^>]*>')
+_TITLED_SPAN_REGEX = re.compile(r'<span\b[^>]*\stitle=[^>]*>')
+_LISTED_DATE_REGEX = re.compile(r'<div\b[^>]*\sclass="(?:[^"]*\s)?market_listing_listed_date(?:\s[^"]*)?"[^>]*>')
+_PRICE_REGEX = re.compile(r'<span\b[^>]*\sclass="market_listing_price"[^>]*>')
+_GAME_NAME_REGEX = re.compile(r'<span\b[^>]*\sclass="market_listing_game_name"[^>]*>')
+_LINK_REGEX = re.compile(r'<a\b[^>]*>')
+_ITEM_IMAGE_REGEX = re.compile(r'<img\b[^>]*\sclass="market_listing_item_img"[^>]*>')
+_ELEMENT_TAG_REGEXES = {}
+
+
+def get_market_listings_from_html(html: str) -> dict:
+    my_listings_start = re.search(r'<div\b[^>]*\sid="myListings"[^>]*>', html)
+    if my_listings_start is None:
+        raise IndexError('myListings element not found')
+
+    my_listings = _get_element(html, my_listings_start, 'div')
+    sell_listings_dict = {}
+    buy_orders_dict = {}
+
+    for node in _find_elements(my_listings, _SECTION_REGEX, 'div'):
+        node_text = _get_text(node)
+        if 'My sell listings' in node_text:
+            sell_listings_dict = get_sell_listings_from_node(node)
+        elif 'My listings awaiting confirmation' in node_text:
+            sell_listings_awaiting_conf = get_sell_listings_from_node(node)
+            for listing in sell_listings_awaiting_conf.values():
+                listing['need_confirmation'] = True
+            sell_listings_dict.update(sell_listings_awaiting_conf)
+        elif 'My buy orders' in node_text:
+            buy_orders_dict = get_buy_orders_from_node(node)
+
+    return {'buy_orders': buy_orders_dict, 'sell_listings': sell_listings_dict}
+
+
+def get_sell_listings_from_node(node: str) -> dict:
+    sell_listings_dict = {}
+
+    for listing_raw in _find_elements(node, _SELL_LISTING_REGEX, 'div'):
+        spans = _find_elements(listing_raw, _TITLED_SPAN_REGEX, 'span', limit=2)
+        listing = {
+            'listing_id': _get_attributes(listing_raw)['id'].replace('mylisting_', ''),
+            'buyer_pay': _get_text(spans[0]).strip(),
+            'you_receive': _get_text(spans[1]).strip()[1:-1],
+            'created_on': _get_text(_find_elements(listing_raw, _LISTED_DATE_REGEX, 'div', limit=1)[0]).strip(),
+            'need_confirmation': False,
+        }
+        sell_listings_dict[listing['listing_id']] = listing
+
+    return sell_listings_dict
+
+
+def get_market_sell_listings_from_api(html: str) -> dict:
+    sell_listings_dict = get_sell_listings_from_node(html)
+    return {'sell_listings': sell_listings_dict}
+
+
+def get_buy_orders_from_node(node: str) -> dict:
+    buy_orders_dict = {}
+
+    for order_raw in _find_elements(node, _BUY_ORDER_REGEX, 'div'):
+        qnt_price_raw = _get_text(_find_elements(order_raw, _PRICE_REGEX, 'span', limit=1)[0]).split('@')
+        image = _get_attributes(_ITEM_IMAGE_REGEX.search(order_raw).group())
+        order = {
+            'order_id': _get_attributes(order_raw)['id'].replace('mybuyorder_', ''),
+            'quantity': int(qnt_price_raw[0].strip()),
+            'price': qnt_price_raw[1].strip(),
+            'item_name': _get_text(_find_elements(order_raw, _LINK_REGEX, 'a', limit=1)[0]),
+            'icon_url': image['src'].rsplit('/', 2)[-2],
+            'game_name': _get_text(_find_elements(order_raw, _GAME_NAME_REGEX, 'span', limit=1)[0]),
+        }
+        buy_orders_dict[order['order_id']] = order
+
+    return buy_orders_dict
+
+
+def _find_elements(html: str, start_regex: re.Pattern, tag: str, limit: int | None = None) -> list[str]:
+    elements = []
+    position = 0
+    while limit is None or len(elements) < limit:
+        start = start_regex.search(html, position)
+        if start is None:
+            break
+        element = _get_element(html, start, tag)
+        elements.append(element)
+        position = start.start() + len(element)
+    return elements
+
+
+def _get_element(html: str, start: re.Match, tag: str) -> str:
+    # Follows nested tags of the same name to find the matching closing tag
+    tag_regex = _ELEMENT_TAG_REGEXES.get(tag)
+    if tag_regex is None:
+        tag_regex = _ELEMENT_TAG_REGEXES[tag] = re.compile(rf'<(/?){tag}\b[^>]*>', re.IGNORECASE)
+
+    depth = 1
+    for match in tag_regex.finditer(html, start.end()):
+        depth += -1 if match.group(1) else 1
+        if depth == 0:
+            return html[start.start():match.end()]
+    return html[start.start():]
+
+
+def _get_attributes(element: str) -> dict:
+    start_tag = element[:element.index('>')]
+    return {
+        match.group(1): html_lib.unescape(match.group(2) if match.group(2) is not None else match.group(3))
+        for match in _ATTRIBUTE_REGEX.finditer(start_tag)
+    }
+
+
+def _get_text(element: str) -> str:
+    # Like BeautifulSoup, text made only of whitespace is collapsed to a newline or a space
+    element = _WHITESPACE_TEXT_REGEX.sub(lambda match: '>\n<' if '\n' in match.group(1) else '> <', element)
+    return html_lib.unescape(_TAG_REGEX.sub('', element))
@@ -1,9 +1,15 @@
+from __future__ import annotations
+
 import json
+import threading
 import urllib.parse
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from decimal import Decimal
 from http import HTTPStatus
+from typing import TYPE_CHECKING
 
-from requests import Session
+import requests
 
 from steampy.confirmation import ConfirmationExecutor
 from steampy.exceptions import ApiException, TooManyRequests
@@ -14,18 +20,36 @@ from steampy.utils import (
     get_market_sell_listings_from_api,
     login_required,
     merge_items_with_descriptions_from_listing,
+    run_bulk,
     text_between,
 )
 
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from requests import Session
+
+    from steampy.cache import ResponseCache
+
 
 class SteamMarket:
-    def __init__(self, session: Session) -> None:
+    LISTINGS_PAGE_SIZE = 100
+
+    def __init__(self, session: Session, cache: ResponseCache | None = None) -> None:
         self._session = session
+        self._cache = cache
         self._steam_guard = None
         self._session_id = None
+        self._confirmation_executor = None
         self.was_login_executed = False
+        self.last_listings_request_count = 0
+        self._listing_trackers: weakref.WeakSet[MarketListingTracker] = weakref.WeakSet()
+        self._prices_in_flight: dict[tuple, Future] = {}
+        self._prices_in_flight_lock = threading.Lock()
 
     def _set_login_executed(self, steamguard: dict, session_id: str) -> None:
+        if steamguard != self._steam_guard:
+            self._confirmation_executor = None
         self._steam_guard = steamguard
         self._session_id = session_id
         self.was_login_executed = True
@@ -40,78 +64,188 @@ class SteamMarket:
             'appid': game.app_id,
             'market_hash_name': item_hash_name,
         }
+        cache_key = (game.app_id, item_hash_name, currency.value, country)
+        if self._cache is not None and (cached_response := self._cache.get('priceoverview', cache_key)):
+            return cached_response
 
         response = self._session.get(url, params=params)
         if response.status_code == HTTPStatus.TOO_MANY_REQUESTS:
             raise TooManyRequests('You can fetch maximum 20 prices in 60s period')
 
-        return response.json()
+        response_dict = response.json()
+        if self._cache is not None and response_dict.get('success'):
+            self._cache.set('priceoverview', cache_key, response_dict)
+        return response_dict
+
+    def fetch_prices(
+        self,
+        item_hash_names: Iterable[str],
+        game: GameOptions,
+        currency: Currency = Currency.USD,
+        country: str = 'PL',
+        max_workers: int = 4,
+    ) -> Iterator[tuple[str, dict]]:
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        futures = {
+            executor.submit(self._fetch_price_coalesced, item_hash_name, game, currency, country): item_hash_name
+            for item_hash_name in dict.fromkeys(item_hash_names)
+        }
+        try:
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result()
+                except Exception as exception:
+                    yield futures[future], {'success': False, 'error': str(exception)}
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _fetch_price_coalesced(
+        self, item_hash_name: str, game: GameOptions, currency: Currency, country: str,
+    ) -> dict:
+        # Identical requests issued concurrently (e.g. by several threads) share one in-flight call
+        key = (game.app_id, item_hash_name, currency.value, country)
+        with self._prices_in_flight_lock:
+            future = self._prices_in_flight.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = self._prices_in_flight[key] = Future()
+
+        if is_owner:
+            try:
+                future.set_result(self.fetch_price(item_hash_name, game, currency, country))
+            except Exception as exception:
+                future.set_exception(exception)
+            finally:
+                with self._prices_in_flight_lock:
+                    del self._prices_in_flight[key]
+
+        return future.result()
 
     @login_required
     def fetch_price_history(self, item_hash_name: str, game: GameOptions) -> dict:
         url = f'{SteamUrl.COMMUNITY_URL}/market/pricehistory/'
         params = {'country': 'PL', 'appid': game.app_id, 'market_hash_name': item_hash_name}
+        cache_key = (game.app_id, item_hash_name, None, 'PL')
+        if self._cache is not None and (cached_response := self._cache.get('pricehistory', cache_key)):
+            return cached_response
 
         response = self._session.get(url, params=params)
         if response.status_code == HTTPStatus.TOO_MANY_REQUESTS:
             raise TooManyRequests('You can fetch maximum 20 prices in 60s period')
 
-        return response.json()
+        response_dict = response.json()
+        if self._cache is not None and response_dict.get('success'):
+            self._cache.set('pricehistory', cache_key, response_dict)
+        return response_dict
 
     @login_required
-    def get_my_market_listings(self) -> dict:
+    def get_my_market_listings(self, parser: str = 'bs4', max_workers: int = 4) -> dict:
+        listings = {'buy_orders': {}, 'sell_listings': {}}
+        for page in self.iter_my_market_listings(parser, max_workers):
+            listings['buy_orders'].update(page.get('buy_orders', {}))
+            listings['sell_listings'].update(page['sell_listings'])
+        return listings
+
+    @login_required
+    def iter_my_market_listings(self, parser: str = 'bs4', max_workers: int = 4) -> Iterator[dict]:
+        listings, n_showing, n_total = self._fetch_first_listings_page(parser)
+        yield listings
+        yield from self._iter_next_listings_pages(
+            n_showing, n_total, set(listings['sell_listings']), parser, max_workers,
+        )
+
+    def _fetch_first_listings_page(self, parser: str) -> tuple[dict, int, int]:
         response = self._session.get(f'{SteamUrl.COMMUNITY_URL}/market')
+        self.last_listings_request_count = 1
         if response.status_code != HTTPStatus.OK:
             raise ApiException(f'There was a problem getting the listings. HTTP code: {response.status_code}')
 
         assets_descriptions = json.loads(text_between(response.text, 'var g_rgAssets = ', ';\n'))
         listing_id_to_assets_address = get_listing_id_to_assets_address_from_html(response.text)
-        listings = get_market_listings_from_html(response.text)
+        listings = get_market_listings_from_html(response.text, parser)
         listings = merge_items_with_descriptions_from_listing(
             listings, listing_id_to_assets_address, assets_descriptions,
         )
 
-        if '<span id="tabContentsMyActiveMarketListings_end">' in response.text:
-            n_showing = int(text_between(response.text, '<span id="tabContentsMyActiveMarketListings_end">', '</span>'))
-            n_total = int(
-                text_between(response.text, '<span id="tabContentsMyActiveMarketListings_total">', '</span>').replace(
-                    ',', '',
-                ),
-            )
+        if '<span id="tabContentsMyActiveMarketListings_end">' not in response.text:
+            n_active = sum(not listing['need_confirmation'] for listing in listings['sell_listings'].values())
+            return listings, n_active, n_active
 
-            if n_showing < n_total < 1000:
-                url = f'{SteamUrl.COMMUNITY_URL}/market/mylistings/render/?query=&start={n_showing}&count={-1}'
-                response = self._session.get(url)
-                if response.status_code != HTTPStatus.OK:
-                    raise ApiException(f'There was a problem getting the listings. HTTP code: {response.status_code}')
-
-                jresp = response.json()
-                listing_id_to_assets_address = get_listing_id_to_assets_address_from_html(jresp.get('hovers'))
-                listings_2 = get_market_sell_listings_from_api(jresp.get('results_html'))
-                listings_2 = merge_items_with_descriptions_from_listing(
-                    listings_2, listing_id_to_assets_address, jresp.get('assets'),
-                )
-                listings['sell_listings'] = {**listings['sell_listings'], **listings_2['sell_listings']}
-            else:
-                for i in range(0, n_total, 100):
-                    url = f'{SteamUrl.COMMUNITY_URL}/market/mylistings/?query=&start={n_showing + i}&count={100}'
-                    response = self._session.get(url)
-                    if response.status_code != HTTPStatus.OK:
-                        raise ApiException(
-                            f'There was a problem getting the listings. HTTP code: {response.status_code}',
-                        )
-                    jresp = response.json()
-                    listing_id_to_assets_address = get_listing_id_to_assets_address_from_html(jresp.get('hovers'))
-                    listings_2 = get_market_sell_listings_from_api(jresp.get('results_html'))
-                    listings_2 = merge_items_with_descriptions_from_listing(
-                        listings_2, listing_id_to_assets_address, jresp.get('assets'),
-                    )
-                    listings['sell_listings'] = {**listings['sell_listings'], **listings_2['sell_listings']}
+        n_showing = int(text_between(response.text, '<span id="tabContentsMyActiveMarketListings_end">', '</span>'))
+        n_total = int(
+            text_between(response.text, '<span id="tabContentsMyActiveMarketListings_total">', '</span>').replace(
+                ',', '',
+            ),
+        )
+        return listings, n_showing, n_total
+
+    def _iter_next_listings_pages(
+        self, n_showing: int, n_total: int, seen_listing_ids: set[str], parser: str, max_workers: int,
+    ) -> Iterator[dict]:
+        if n_showing >= n_total:
+            return
+
+        if n_total < 1000:
+            url = f'{SteamUrl.COMMUNITY_URL}/market/mylistings/render/?query=&start={n_showing}&count={-1}'
+            page, _ = self._fetch_listings_page(url, parser)
+            self.last_listings_request_count += 1
+            yield self._drop_seen_listings(page, seen_listing_ids)
+            return
+
+        # Pages are downloaded concurrently, but yielded in order. Pages are planned up to the total count of the last
+        # response, so listings created in the meantime are fetched too and pages past the end are never requested
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            next_start = n_showing
+            reached_end = False
+            while next_start < n_total and not reached_end:
+                starts = range(next_start, n_total, self.LISTINGS_PAGE_SIZE)
+                futures = [
+                    executor.submit(self._fetch_listings_page, self._get_listings_page_url(start), parser)
+                    for start in starts
+                ]
+                next_start = starts[-1] + self.LISTINGS_PAGE_SIZE
+                for future in futures:
+                    page, total_count = future.result()
+                    self.last_listings_request_count += 1
+                    if total_count is not None:
+                        n_total = total_count
+                    reached_end = reached_end or not page['sell_listings']
+                    yield self._drop_seen_listings(page, seen_listing_ids)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @classmethod
+    def _get_listings_page_url(cls, start: int) -> str:
+        return f'{SteamUrl.COMMUNITY_URL}/market/mylistings/?query=&start={start}&count={cls.LISTINGS_PAGE_SIZE}'
+
+    @staticmethod
+    def _drop_seen_listings(page: dict, seen_listing_ids: set[str]) -> dict:
+        # Listings move between pages when other listings are sold or removed in the meantime
+        page['sell_listings'] = {
+            listing_id: listing for listing_id, listing in page['sell_listings'].items()
+            if listing_id not in seen_listing_ids
+        }
+        seen_listing_ids.update(page['sell_listings'])
+        return page
 
-        return listings
+    def _fetch_listings_page(self, url: str, parser: str) -> tuple[dict, int | None]:
+        response = self._session.get(url)
+        if response.status_code != HTTPStatus.OK:
+            raise ApiException(f'There was a problem getting the listings. HTTP code: {response.status_code}')
+
+        jresp = response.json()
+        listing_id_to_assets_address = get_listing_id_to_assets_address_from_html(jresp.get('hovers'))
+        listings = get_market_sell_listings_from_api(jresp.get('results_html'), parser)
+        listings = merge_items_with_descriptions_from_listing(
+            listings, listing_id_to_assets_address, jresp.get('assets'),
+        )
+        return listings, jresp.get('total_count')
 
     @login_required
-    def create_sell_order(self, assetid: str, game: GameOptions, money_to_receive: str) -> dict:
+    def create_sell_order(
+        self, assetid: str, game: GameOptions, money_to_receive: str, confirm_listing: bool = True,
+    ) -> dict:
         data = {
             'assetid': assetid,
             'sessionid': self._session_id,
@@ -123,12 +257,55 @@ class SteamMarket:
         headers = {'Referer': f'{SteamUrl.COMMUNITY_URL}/profiles/{self._steam_guard["steamid"]}/inventory'}
 
         response = self._session.post(f'{SteamUrl.COMMUNITY_URL}/market/sellitem/', data, headers=headers).json()
-        has_pending_confirmation = 'pending confirmation' in response.get('message', '')
-        if response.get('needs_mobile_confirmation') or (not response.get('success') and has_pending_confirmation):
+        if confirm_listing and self._needs_confirmation(response):
             return self._confirm_sell_listing(assetid)
 
         return response
 
+    @login_required
+    def create_sell_orders(
+        self, items: Iterable[tuple[str, GameOptions, str]], max_workers: int = 4, confirm_listings: bool = True,
+    ) -> dict[str, dict]:
+        items = {assetid: (assetid, game, money_to_receive) for assetid, game, money_to_receive in items}
+        results = run_bulk(
+            lambda assetid, game, money_to_receive: self.create_sell_order(
+                assetid, game, money_to_receive, confirm_listing=False,
+            ),
+            items,
+            max_workers,
+        )
+        for result in results.values():
+            result['needs_confirmation'] = self._needs_confirmation(result)
+            result['confirmed'] = False
+
+        pending_asset_ids = [assetid for assetid, result in results.items() if result['needs_confirmation']]
+        if confirm_listings and pending_asset_ids:
+            try:
+                confirmed = self._get_confirmation_executor().confirm_sell_listings(pending_asset_ids)
+            except Exception as exception:
+                confirmed = {}
+                for assetid in pending_asset_ids:
+                    results[assetid]['confirmation_error'] = str(exception)
+            for assetid in pending_asset_ids:
+                results[assetid]['confirmed'] = confirmed.get(assetid, False)
+
+        return results
+
+    @staticmethod
+    def _needs_confirmation(response: dict) -> bool:
+        if response.get('needs_mobile_confirmation'):
+            return True
+        return not response.get('success') and 'pending confirmation' in response.get('message', '')
+
+    @staticmethod
+    def _check_response_status(response: requests.Response, message: str) -> None:
+        if response.status_code == HTTPStatus.TOO_MANY_REQUESTS:
+            raise TooManyRequests('Too many requests, try again later.')
+        if response.status_code != HTTPStatus.OK:
+            # The HTTP error is kept as the cause, so bulk operations can tell server errors from permanent failures
+            error = requests.HTTPError(f'HTTP code: {response.status_code}', response=response)
+            raise ApiException(f'{message} HTTP code: {response.status_code}') from error
+
     @login_required
     def create_buy_order(
         self,
@@ -201,22 +378,112 @@ class SteamMarket:
         url = f'{SteamUrl.COMMUNITY_URL}/market/removelisting/{sell_listing_id}'
 
         response = self._session.post(url, data=data, headers=headers)
-        if response.status_code != HTTPStatus.OK:
-            raise ApiException(f'There was a problem removing the listing. HTTP code: {response.status_code}')
+        self._check_response_status(response, 'There was a problem removing the listing.')
+        for tracker in list(self._listing_trackers):
+            tracker._on_sell_order_cancelled(str(sell_listing_id))
 
     @login_required
     def cancel_buy_order(self, buy_order_id) -> dict:
         data = {'sessionid': self._session_id, 'buy_orderid': buy_order_id}
         headers = {'Referer': f'{SteamUrl.COMMUNITY_URL}/market'}
-        response = self._session.post(f'{SteamUrl.COMMUNITY_URL}/market/cancelbuyorder/', data, headers=headers).json()
+        response = self._session.post(f'{SteamUrl.COMMUNITY_URL}/market/cancelbuyorder/', data, headers=headers)
+        self._check_response_status(response, 'There was a problem canceling the order.')
+        response = response.json()
 
         if (success := response.get('success')) != 1:
             raise ApiException(f'There was a problem canceling the order. success: {success}')
 
         return response
 
+    @login_required
+    def cancel_sell_orders(
+        self, sell_listing_ids: Iterable[str], max_workers: int = 4, max_retries: int = 2, retry_delay: float = 1.0,
+    ) -> dict[str, dict]:
+        calls = {str(sell_listing_id): (sell_listing_id,) for sell_listing_id in sell_listing_ids}
+        return run_bulk(self.cancel_sell_order, calls, max_workers, max_retries, retry_delay)
+
+    @login_required
+    def cancel_buy_orders(
+        self, buy_order_ids: Iterable[str], max_workers: int = 4, max_retries: int = 2, retry_delay: float = 1.0,
+    ) -> dict[str, dict]:
+        calls = {str(buy_order_id): (buy_order_id,) for buy_order_id in buy_order_ids}
+        return run_bulk(self.cancel_buy_order, calls, max_workers, max_retries, retry_delay)
+
     def _confirm_sell_listing(self, asset_id: str) -> dict:
-        con_executor = ConfirmationExecutor(
-            self._steam_guard['identity_secret'], self._steam_guard['steamid'], self._session,
-        )
-        return con_executor.confirm_sell_listing(asset_id)
+        return self._get_confirmation_executor().confirm_sell_listing(asset_id)
+
+    def _get_confirmation_executor(self) -> ConfirmationExecutor:
+        # One executor per account keeps its confirmation index between calls
+        if self._confirmation_executor is None:
+            self._confirmation_executor = ConfirmationExecutor(
+                self._steam_guard['identity_secret'], self._steam_guard['steamid'], self._session,
+            )
+        return self._confirmation_executor
+
+
+class MarketListingTracker:
+    """Keeps the last snapshot of own market listings and reports how they change.
+
+    Steam shows the newest listings on the first page of `/market`, so a new listing always changes the first page
+    and a listing gone from further pages always changes the total count. `poll` downloads the first page only
+    and downloads the other pages when the first page listings or the total count differ from the snapshot,
+    which makes polling an unchanged account cost a single request.
+
+    Steam does not tell whether a listing disappeared because it was sold or removed. A listing is reported
+    as `removed` when it was removed with `cancel_sell_order` of the tracked market or was still waiting
+    for confirmation, otherwise it is reported as `sold`, so listings removed outside of this market
+    (e.g. in a browser) are reported as sold.
+    """
+
+    def __init__(self, market: SteamMarket, parser: str = 'bs4', max_workers: int = 4) -> None:
+        self.market = market
+        self.parser = parser
+        self.max_workers = max_workers
+        self.listings: dict[str, dict] | None = None
+        self.buy_orders: dict[str, dict] | None = None
+        self._fingerprint = None
+        self._removed_listing_ids: set[str] = set()
+        self._removed_listing_ids_lock = threading.Lock()
+        market._listing_trackers.add(self)
+
+    def poll(self) -> list[dict]:
+        first_page, n_showing, n_total = self.market._fetch_first_listings_page(self.parser)
+        self.buy_orders = first_page['buy_orders']
+        fingerprint = (n_total, tuple(
+            (listing_id, listing['need_confirmation']) for listing_id, listing in first_page['sell_listings'].items()
+        ))
+        if fingerprint == self._fingerprint:
+            return []
+
+        listings = dict(first_page['sell_listings'])
+        for page in self.market._iter_next_listings_pages(
+            n_showing, n_total, set(listings), self.parser, self.max_workers,
+        ):
+            listings.update(page['sell_listings'])
+
+        events = [] if self.listings is None else self._get_events(self.listings, listings)
+        self.listings = listings
+        self._fingerprint = fingerprint
+        return events
+
+    def _get_events(self, previous_listings: dict[str, dict], listings: dict[str, dict]) -> list[dict]:
+        events = [
+            {'type': 'added', 'listing_id': listing_id, 'listing': listing}
+            for listing_id, listing in listings.items() if listing_id not in previous_listings
+        ]
+        with self._removed_listing_ids_lock:
+            for listing_id, listing in previous_listings.items():
+                if listing_id in listings:
+                    continue
+                was_removed = listing_id in self._removed_listing_ids or listing['need_confirmation']
+                event_type = 'removed' if was_removed else 'sold'
+                events.append({'type': event_type, 'listing_id': listing_id, 'listing': listing})
+            # Only ids of listings still in the snapshot can matter for the next poll
+            self._removed_listing_ids &= set(listings)
+        return events
+
+    def _on_sell_order_cancelled(self, listing_id: str) -> None:
+        # Called by the tracked market, ids are only kept for listings of the snapshot so the set stays bounded
+        with self._removed_listing_ids_lock:
+            if self.listings is not None and listing_id in self.listings:
+                self._removed_listing_ids.add(listing_id)
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Iterator
+
+    from steampy.async_client import AsyncSteamClient
+    from steampy.client import SteamClient
+
+RECEIVED_CHANGE_COUNTERS = ('new_received_count', 'updated_received_count')
+SENT_CHANGE_COUNTERS = ('newly_accepted_sent_count', 'updated_sent_count')
+
+
+class OfferPoller:
+    """Returns only trade offers that are new or changed since the previous poll.
+
+    The first poll downloads all active offers. Later polls ask `GetTradeOffersSummary` whether anything changed
+    since the previous poll and return without downloading offers when nothing did. Otherwise only offers updated
+    after the previous download, minus `overlap` seconds for clock skew, are requested with `time_historical_cutoff`,
+    so accepted, declined and cancelled offers are reported as well. Every `full_fetch_interval` seconds offers
+    updated since the previous download are downloaded even if the summary reports no changes.
+    """
+
+    def __init__(
+        self,
+        client: SteamClient,
+        get_sent_offers: bool = True,
+        get_received_offers: bool = True,
+        merge: bool = True,
+        overlap: int = 30,
+        full_fetch_interval: float = 600,
+    ) -> None:
+        self.client = client
+        self.get_sent_offers = get_sent_offers
+        self.get_received_offers = get_received_offers
+        self.merge = merge
+        self.overlap = overlap
+        self.full_fetch_interval = full_fetch_interval
+        self.last_poll_time: int | None = None
+        self.skipped_polls = 0
+        self._last_fetch_time: int | None = None
+        self._seen_offers: dict[str, tuple[int, int]] = {}
+
+    def poll(self) -> list[dict]:
+        poll_time = int(time.time())
+        if not self._should_fetch(poll_time):
+            summary = self.client.get_trade_offers_summary(time_last_visit=self.last_poll_time)
+            if not self._has_changes(summary):
+                return self._skip_poll(poll_time)
+
+        response = self.client.get_trade_offers(**self._get_trade_offers_kwargs())
+        return self._collect_changes(response, poll_time)
+
+    def iter_offers(self, interval: float = 60) -> Iterator[dict]:
+        while True:
+            yield from self.poll()
+            time.sleep(interval)
+
+    def reset(self) -> None:
+        self.last_poll_time = None
+        self._last_fetch_time = None
+        self._seen_offers.clear()
+
+    def _should_fetch(self, poll_time: int) -> bool:
+        return self._last_fetch_time is None or poll_time - self._last_fetch_time >= self.full_fetch_interval
+
+    def _has_changes(self, summary: dict) -> bool:
+        counters = (RECEIVED_CHANGE_COUNTERS if self.get_received_offers else ()) + (
+            SENT_CHANGE_COUNTERS if self.get_sent_offers else ()
+        )
+        summary = summary.get('response', {})
+        return any(summary.get(counter) for counter in counters)
+
+    def _skip_poll(self, poll_time: int) -> list[dict]:
+        self.last_poll_time = poll_time
+        self.skipped_polls += 1
+        return []
+
+    def _get_trade_offers_kwargs(self) -> dict:
+        kwargs = {
+            'merge': self.merge,
+            'get_sent_offers': self.get_sent_offers,
+            'get_received_offers': self.get_received_offers,
+        }
+        if self._last_fetch_time is not None:
+            # Skipped polls do not move the cutoff, so a full fetch also sees changes the summary did not report
+            kwargs['time_historical_cutoff'] = self._last_fetch_time - self.overlap
+        return kwargs
+
+    def _collect_changes(self, response: dict, poll_time: int) -> list[dict]:
+        offers = response['response'].get('trade_offers_received', []) + response['response'].get(
+            'trade_offers_sent', [],
+        )
+        changed_offers = []
+        seen_offers = {}
+        for offer in offers:
+            version = (offer['trade_offer_state'], offer.get('time_updated', 0))
+            if self._seen_offers.get(offer['tradeofferid']) != version:
+                changed_offers.append(offer)
+            seen_offers[offer['tradeofferid']] = version
+
+        # Active offers are always returned, finished ones only until they are older than the cutoff,
+        # so remembering the offers of the last response is enough to recognize them again
+        self._seen_offers = seen_offers
+        self.last_poll_time = poll_time
+        self._last_fetch_time = poll_time
+        return changed_offers
+
+
+class AsyncOfferPoller(OfferPoller):
+    def __init__(
+        self,
+        client: AsyncSteamClient,
+        get_sent_offers: bool = True,
+        get_received_offers: bool = True,
+        merge: bool = True,
+        overlap: int = 30,
+        full_fetch_interval: float = 600,
+    ) -> None:
+        super().__init__(client, get_sent_offers, get_received_offers, merge, overlap, full_fetch_interval)
+
+    async def poll(self) -> list[dict]:
+        poll_time = int(time.time())
+        if not self._should_fetch(poll_time):
+            summary = await self.client.get_trade_offers_summary(time_last_visit=self.last_poll_time)
+            if not self._has_changes(summary):
+                return self._skip_poll(poll_time)
+
+        response = await self.client.get_trade_offers(**self._get_trade_offers_kwargs())
+        return self._collect_changes(response, poll_time)
+
+    async def iter_offers(self, interval: float = 60) -> AsyncIterator[dict]:
+        while True:
+            for offer in await self.poll():
+                yield offer
+            await asyncio.sleep(interval)
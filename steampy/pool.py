@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, TypeVar
+
+from steampy.client import SteamClient
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+    from steampy.cache import ResponseCache
+    from steampy.rate_limit import RateLimiter
+    from steampy.session_store import SessionStore
+
+T = TypeVar('T')
+
+
+class PooledClient:
+    def __init__(self, client: SteamClient, max_concurrency: int) -> None:
+        self.client = client
+        self.semaphore = threading.BoundedSemaphore(max_concurrency)
+        self.login_lock = threading.Lock()
+        self.checked_at = 0.0
+
+
+class SteamClientPool:
+    """Owns many `SteamClient` instances and hands them out to worker threads.
+
+    Every account is a dict with `api_key`, `username`, `password` and `steam_guard` keys and optional `proxies`.
+    Clients are logged in lazily on first use, each account serves at most `max_concurrency_per_account`
+    callers at once, and sessions are verified every `session_check_interval` seconds and logged in again
+    when they are dead. A pool lives in a single process, so split accounts between processes to avoid
+    logging into the same account twice.
+    """
+
+    def __init__(
+        self,
+        accounts: Iterable[dict],
+        max_concurrency_per_account: int = 1,
+        session_check_interval: float = 300,
+        rate_limiter: RateLimiter | None = None,
+        cache: ResponseCache | None = None,
+        session_store: SessionStore | None = None,
+    ) -> None:
+        self.session_check_interval = session_check_interval
+        self._clients: dict[str, PooledClient] = {}
+        for account in accounts:
+            client = SteamClient(
+                account['api_key'],
+                account['username'],
+                account['password'],
+                account['steam_guard'],
+                proxies=account.get('proxies'),
+                rate_limiter=rate_limiter,
+                cache=cache,
+                session_store=session_store,
+            )
+            self._clients[account['username']] = PooledClient(client, max_concurrency_per_account)
+
+        if not self._clients:
+            raise ValueError('At least one account is required')
+
+        self._usernames = list(self._clients)
+        self._next_index = 0
+        self._round_robin_lock = threading.Lock()
+
+    @property
+    def usernames(self) -> list[str]:
+        return list(self._usernames)
+
+    def get_client(self, username: str) -> SteamClient:
+        return self._clients[username].client
+
+    @contextmanager
+    def acquire(self, username: str | None = None) -> Iterator[SteamClient]:
+        pooled_client = self._clients[username] if username is not None else self._acquire_next()
+        if username is not None:
+            pooled_client.semaphore.acquire()
+
+        try:
+            self._ensure_logged_in(pooled_client)
+            yield pooled_client.client
+        except Exception:
+            pooled_client.checked_at = 0.0  # verify the session before the next use
+            raise
+        finally:
+            pooled_client.semaphore.release()
+
+    def run(self, func: Callable[[SteamClient], T], username: str | None = None) -> T:
+        with self.acquire(username) as client:
+            return func(client)
+
+    def run_on_all(self, func: Callable[[SteamClient], T], max_workers: int | None = None) -> dict[str, T]:
+        with ThreadPoolExecutor(max_workers=max_workers or len(self._usernames)) as executor:
+            futures = {username: executor.submit(self.run, func, username) for username in self._usernames}
+        return {username: future.result() for username, future in futures.items()}
+
+    def _acquire_next(self) -> PooledClient:
+        with self._round_robin_lock:
+            start = self._next_index
+            self._next_index = (self._next_index + 1) % len(self._usernames)
+
+        # Prefer the first free account in round robin order, wait for the starting one if all are busy
+        for offset in range(len(self._usernames)):
+            pooled_client = self._clients[self._usernames[(start + offset) % len(self._usernames)]]
+            if pooled_client.semaphore.acquire(blocking=False):
+                return pooled_client
+
+        pooled_client = self._clients[self._usernames[start]]
+        pooled_client.semaphore.acquire()
+        return pooled_client
+
+    def _ensure_logged_in(self, pooled_client: PooledClient) -> None:
+        with pooled_client.login_lock:
+            client = pooled_client.client
+            now = time.monotonic()
+            if client.was_login_executed and now - pooled_client.checked_at < self.session_check_interval:
+                return
+
+            if client.was_login_executed and not client.is_session_alive():
+                client.was_login_executed = False
+            if not client.was_login_executed:
+                client.login()
+            pooled_client.checked_at = time.monotonic()
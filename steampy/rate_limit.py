@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import asyncio
+import enum
+import threading
+import time
+from http import HTTPStatus
+from urllib.parse import urlparse
+
+import requests
+
+from steampy.models import SteamUrl
+
+
+class EndpointFamily(enum.Enum):
+    MARKET = 'market'
+    INVENTORY = 'inventory'
+    WEB_API = 'web_api'
+    MOBILECONF = 'mobileconf'
+
+
+# (requests, period in seconds) - conservative values observed for a single IP
+DEFAULT_BUDGETS = {
+    EndpointFamily.MARKET: (20, 60),
+    EndpointFamily.INVENTORY: (10, 60),
+    EndpointFamily.WEB_API: (100, 100),
+    EndpointFamily.MOBILECONF: (10, 10),
+}
+
+
+class TokenBucket:
+    def __init__(self, capacity: int, period: float) -> None:
+        self.capacity = capacity
+        self.rate = capacity / period
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def _reserve(self) -> float:
+        # Tokens may go below zero, which reserves a slot in the future and keeps waiting callers in order
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self) -> None:
+        if wait := self._reserve():
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        if wait := self._reserve():
+            await asyncio.sleep(wait)
+
+    def penalize(self, delay: float) -> None:
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, 0) - delay * self.rate
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        budgets: dict[EndpointFamily, tuple[int, float]] | None = None,
+        backoff: float = 10.0,
+        max_retries: int = 3,
+    ) -> None:
+        budgets = {**DEFAULT_BUDGETS, **(budgets or {})}
+        self._buckets = {family: TokenBucket(*budget) for family, budget in budgets.items()}
+        self.backoff = backoff
+        self.max_retries = max_retries
+
+    @staticmethod
+    def classify(url: str) -> EndpointFamily | None:
+        parsed_url = urlparse(url)
+        if parsed_url.netloc == urlparse(SteamUrl.API_URL).netloc:
+            return EndpointFamily.WEB_API
+        if parsed_url.netloc != urlparse(SteamUrl.COMMUNITY_URL).netloc:
+            return None
+        if parsed_url.path.startswith('/market'):
+            return EndpointFamily.MARKET
+        if parsed_url.path.startswith('/mobileconf'):
+            return EndpointFamily.MOBILECONF
+        if parsed_url.path.startswith('/inventory'):
+            return EndpointFamily.INVENTORY
+        return None
+
+    def get_bucket(self, url: str) -> TokenBucket | None:
+        family = self.classify(url)
+        return self._buckets.get(family) if family is not None else None
+
+    def acquire(self, url: str) -> None:
+        if bucket := self.get_bucket(url):
+            bucket.acquire()
+
+    async def acquire_async(self, url: str) -> None:
+        if bucket := self.get_bucket(url):
+            await bucket.acquire_async()
+
+    def penalize(self, url: str, attempt: int) -> float:
+        delay = self.backoff * 2**attempt
+        if bucket := self.get_bucket(url):
+            bucket.penalize(delay)
+        return delay
+
+
+class RateLimitedSession(requests.Session):
+    def __init__(self, rate_limiter: RateLimiter) -> None:
+        super().__init__()
+        self.rate_limiter = rate_limiter
+
+    def request(self, method: str, url: str, *args, **kwargs) -> requests.Response:
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire(url)
+            response = super().request(method, url, *args, **kwargs)
+            if (
+                response.status_code != HTTPStatus.TOO_MANY_REQUESTS
+                or attempt >= self.rate_limiter.max_retries
+                or self.rate_limiter.get_bucket(url) is None
+            ):
+                return response
+            self.rate_limiter.penalize(url, attempt)
+            attempt += 1
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+
+class SessionStore(ABC):
+    @abstractmethod
+    def load(self, username: str) -> dict | None:
+        pass
+
+    @abstractmethod
+    def save(self, username: str, session_data: dict) -> None:
+        pass
+
+    @abstractmethod
+    def delete(self, username: str) -> None:
+        pass
+
+
+class FileSessionStore(SessionStore):
+    def __init__(self, directory: str) -> None:
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+
+    def _get_path(self, username: str) -> Path:
+        if not username or username in {'.', '..'} or any(sep in username for sep in ('/', '\\')):
+            raise ValueError(f'Invalid username for a session file: {username!r}')
+        return self._directory / f'{username}.json'
+
+    def load(self, username: str) -> dict | None:
+        path = self._get_path(username)
+        if not path.is_file():
+            return None
+        with path.open(encoding='utf-8') as f:
+            return json.load(f)
+
+    def save(self, username: str, session_data: dict) -> None:
+        path = self._get_path(username)
+        temporary_path = path.with_suffix('.tmp')
+        # Sessions hold the refresh token, so only the owner may read them
+        temporary_path.unlink(missing_ok=True)
+        file_descriptor = os.open(temporary_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with open(file_descriptor, 'w', encoding='utf-8') as f:
+            json.dump(session_data, f)
+        temporary_path.replace(path)
+
+    def delete(self, username: str) -> None:
+        self._get_path(username).unlink(missing_ok=True)
+
+
+class SqliteSessionStore(SessionStore):
+    def __init__(self, path: str) -> None:
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS sessions (username TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL)',
+        )
+        self._connection.commit()
+
+    def load(self, username: str) -> dict | None:
+        with self._lock:
+            row = self._connection.execute('SELECT data FROM sessions WHERE username = ?', (username,)).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def save(self, username: str, session_data: dict) -> None:
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO sessions (username, data, updated_at) VALUES (?, ?, ?)',
+                (username, json.dumps(session_data), time.time()),
+            )
+            self._connection.commit()
+
+    def delete(self, username: str) -> None:
+        with self._lock:
+            self._connection.execute('DELETE FROM sessions WHERE username = ?', (username,))
+            self._connection.commit()
+
+    def close(self) -> None:
+        self._connection.close()
@@ -1,21 +1,30 @@
 from __future__ import annotations
 
+import base64
 import copy
+import json
 import math
 import re
 import struct
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from decimal import Decimal
+from http import HTTPStatus
 from pathlib import Path
 from typing import TYPE_CHECKING
 from urllib.parse import parse_qs, urlparse
 
 import requests
 from bs4 import BeautifulSoup, Tag
+from requests.cookies import RequestsCookieJar
 from requests.structures import CaseInsensitiveDict
 
-from steampy.exceptions import LoginRequired, ProxyConnectionError
+from steampy import listing_parser
+from steampy.exceptions import LoginRequired, ProxyConnectionError, TooManyRequests
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
     from steampy.models import GameOptions
 
 
@@ -55,6 +64,11 @@ def steam_id_to_account_id(steam_id: str) -> str:
     return str(struct.unpack('>L', int(steam_id).to_bytes(8, byteorder='big')[4:])[0])
 
 
+def decode_jwt_payload(token: str) -> dict:
+    payload = token.split('.')[1]
+    return json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+
+
 def calculate_gross_price(price_net: Decimal, publisher_fee: Decimal, steam_fee: Decimal = Decimal('0.05')) -> Decimal:
     """Calculate the price including the publisher's fee and the Steam fee.
 
@@ -163,7 +177,10 @@ def merge_items(items: list[dict], descriptions: dict, **kwargs) -> dict:
     return merged_items
 
 
-def get_market_listings_from_html(html: str) -> dict:
+def get_market_listings_from_html(html: str, parser: str = 'bs4') -> dict:
+    if _use_regex_parser(parser):
+        return listing_parser.get_market_listings_from_html(html)
+
     document = BeautifulSoup(html, 'html.parser')
     nodes = document.select('div[id=myListings]')[0].findAll('div', {'class': 'market_home_listing_table'})
     sell_listings_dict = {}
@@ -201,7 +218,10 @@ def get_sell_listings_from_node(node: Tag) -> dict:
     return sell_listings_dict
 
 
-def get_market_sell_listings_from_api(html: str) -> dict:
+def get_market_sell_listings_from_api(html: str, parser: str = 'bs4') -> dict:
+    if _use_regex_parser(parser):
+        return listing_parser.get_market_sell_listings_from_api(html)
+
     document = BeautifulSoup(html, 'html.parser')
     sell_listings_dict = get_sell_listings_from_node(document)
     return {'sell_listings': sell_listings_dict}
@@ -226,6 +246,12 @@ def get_buy_orders_from_node(node: Tag) -> dict:
     return buy_orders_dict
 
 
+def _use_regex_parser(parser: str) -> bool:
+    if parser not in {'bs4', 'regex'}:
+        raise ValueError(f'Unknown listings parser: {parser}, use "bs4" or "regex"')
+    return parser == 'regex'
+
+
 def get_listing_id_to_assets_address_from_html(html: str) -> dict:
     listing_id_to_assets_address = {}
     regex = r"CreateItemHoverFromContainer\( [\w]+, 'mylisting_([\d]+)_[\w]+', ([\d]+), '([\d]+)', '([\d]+)', [\d]+ \);"
@@ -251,6 +277,31 @@ def load_credentials():
         return [Credentials(line.split()[0], line.split()[1], line.split()[2]) for line in f]
 
 
+class VersionedCookieJar(RequestsCookieJar):
+    # Every change of the jar bumps the version, so values derived from cookies can be cached cheaply
+    version = 0
+
+    def set_cookie(self, cookie, *args, **kwargs):
+        self.version += 1
+        return super().set_cookie(cookie, *args, **kwargs)
+
+    def clear(self, domain=None, path=None, name=None):
+        self.version += 1
+        return super().clear(domain, path, name)
+
+
+class SessionState:
+    def __init__(self) -> None:
+        self.steam_id: int | None = None
+        self.session_id: str | None = None
+        self.cookies_version: int | None = None
+
+    def invalidate(self) -> None:
+        self.steam_id = None
+        self.session_id = None
+        self.cookies_version = None
+
+
 class Credentials:
     def __init__(self, login: str, password: str, api_key: str) -> None:
         self.login = login
@@ -268,3 +319,41 @@ def ping_proxy(proxies: dict) -> bool:
 
 def create_cookie(name: str, cookie: str, domain: str) -> dict:
     return {'name': name, 'value': cookie, 'domain': domain}
+
+
+def run_bulk(
+    func: Callable[..., dict | None],
+    calls: dict,
+    max_workers: int,
+    max_retries: int = 0,
+    retry_delay: float = 1.0,
+) -> dict:
+    # Requests run on a bounded thread pool over the shared session, so a configured rate limiter still applies
+    def call_with_retries(*args) -> dict:
+        for attempt in range(max_retries + 1):
+            try:
+                return func(*args) or {'success': True}
+            except Exception as exception:
+                if attempt == max_retries or not is_transient_error(exception):
+                    return {'success': False, 'error': str(exception), 'attempts': attempt + 1}
+                time.sleep(retry_delay * 2**attempt)
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(call_with_retries, *args): key for key, args in calls.items()}
+        for future in as_completed(futures):
+            try:
+                results[futures[future]] = future.result()
+            except Exception as exception:
+                results[futures[future]] = {'success': False, 'error': str(exception)}
+    return {key: results[key] for key in calls}
+
+
+def is_transient_error(exception: Exception) -> bool:
+    # Only connection problems, rate limits and server errors are worth retrying
+    if isinstance(exception.__cause__, requests.HTTPError):
+        exception = exception.__cause__
+    if isinstance(exception, requests.HTTPError) and exception.response is not None:
+        status_code = exception.response.status_code
+        return status_code == HTTPStatus.TOO_MANY_REQUESTS or status_code >= HTTPStatus.INTERNAL_SERVER_ERROR
+    return isinstance(exception, (requests.ConnectionError, requests.Timeout, TooManyRequests))
@@ -0,0 +1,145 @@
+import json
+import unittest
+from importlib.util import find_spec
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock, Mock, patch
+
+import requests
+
+from steampy.async_client import AsyncSteamClient
+from steampy.cache import MemoryCache
+from steampy.exceptions import LoginRequired, TooManyRequests
+from steampy.models import Currency, GameOptions, TradeOfferState
+from steampy.rate_limit import EndpointFamily, RateLimiter
+from steampy.utils import account_id_to_steam_id
+
+
+def create_response(json_data: dict | None = None, status: int = 200, text: str = '') -> Mock:
+    response = Mock(status=status)
+    response.json = AsyncMock(return_value=json_data)
+    response.text = AsyncMock(return_value=text)
+    return response
+
+
+@unittest.skipIf(find_spec('aiohttp') is None, 'Requires aiohttp')
+class TestAsyncSteamClient(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.client = AsyncSteamClient('API_KEY')
+
+    async def asyncTearDown(self) -> None:
+        await self.client.close()
+
+    async def test_login_required(self) -> None:
+        with self.assertRaises(LoginRequired):
+            await self.client.get_my_inventory(GameOptions.CS)
+        with self.assertRaises(LoginRequired):
+            await self.client.market.create_sell_order('1', GameOptions.CS, '10')
+
+    async def test_session_id_without_login(self) -> None:
+        assert self.client._get_session_id() is None
+
+    async def test_login_moves_cookies_to_aiohttp_session(self) -> None:
+        login_session = requests.Session()
+        login_session.cookies.set('sessionid', 'session-id', domain='steamcommunity.com')
+        steam_login_secure = '76561198318883215%7C%7Caccess-token'
+        login_session.cookies.set('steamLoginSecure', steam_login_secure, domain='steamcommunity.com')
+        steam_guard = json.dumps({'steamid': '76561198318883215', 'shared_secret': 'c2VjcmV0'})
+        with patch.object(self.client, '_login_with_requests', return_value=login_session):
+            await self.client.login('username', 'password', steam_guard)
+
+        assert self.client.was_login_executed
+        assert self.client._get_session_id() == 'session-id'
+        assert self.client._access_token == 'access-token'
+        assert self.client.market._session_id == 'session-id'
+        assert self.client.market.was_login_executed
+
+    async def test_get_trade_offers(self) -> None:
+        active_offer = {'tradeofferid': '1', 'trade_offer_state': TradeOfferState.Active}
+        declined_offer = {'tradeofferid': '2', 'trade_offer_state': TradeOfferState.Declined, 'time_updated': 50}
+        response = create_response(
+            {'response': {'trade_offers_received': [active_offer, declined_offer], 'trade_offers_sent': []}},
+        )
+        with patch.object(self.client, '_request', AsyncMock(return_value=response)) as request:
+            offers = await self.client.get_trade_offers(get_sent_offers=False, get_descriptions=False)
+
+        assert offers['response']['trade_offers_received'] == [active_offer]
+        method, url = request.call_args.args
+        assert (method, url) == ('GET', 'https://api.steampowered.com/IEconService/GetTradeOffers/v1')
+        params = request.call_args.kwargs['params']
+        assert params['key'] == 'API_KEY'
+        assert (params['get_sent_offers'], params['get_received_offers'], params['get_descriptions']) == (0, 1, 0)
+
+    async def test_fetch_price_is_cached(self) -> None:
+        self.client.market._cache = MemoryCache()
+        response = create_response({'success': True, 'lowest_price': '$1.00'})
+        with patch.object(self.client.market, '_request', AsyncMock(return_value=response)) as request:
+            for _ in range(2):
+                price = await self.client.market.fetch_price('AK-47', GameOptions.CS, Currency.EURO, 'DE')
+
+        assert price == {'success': True, 'lowest_price': '$1.00'}
+        request.assert_awaited_once()
+        assert request.call_args.kwargs['params'] == {
+            'country': 'DE', 'currency': Currency.EURO.value, 'appid': '730', 'market_hash_name': 'AK-47',
+        }
+
+    async def test_fetch_price_too_many_requests(self) -> None:
+        with (
+            patch.object(self.client.market, '_request', AsyncMock(return_value=create_response(status=429))),
+            self.assertRaises(TooManyRequests),
+        ):
+            await self.client.market.fetch_price('AK-47', GameOptions.CS)
+
+    async def test_create_sell_order_confirms_listing(self) -> None:
+        market = self.client.market
+        market._set_login_executed({'steamid': '76561198318883215'}, 'session-id')
+        response = create_response({'success': True, 'needs_mobile_confirmation': True})
+        with (
+            patch.object(market, '_request', AsyncMock(return_value=response)) as request,
+            patch.object(market, '_confirm_sell_listing', AsyncMock(return_value={'success': True})) as confirm,
+        ):
+            assert await market.create_sell_order('123', GameOptions.CS, '1000') == {'success': True}
+
+        method, url = request.call_args.args
+        assert (method, url) == ('POST', 'https://steamcommunity.com/market/sellitem/')
+        data = request.call_args.kwargs['data']
+        assert (data['assetid'], data['sessionid'], data['price']) == ('123', 'session-id', '1000')
+        assert (data['appid'], data['contextid']) == ('730', '2')
+        confirm.assert_awaited_once_with('123')
+
+    async def test_accept_trade_offer_dict_skips_lookups(self) -> None:
+        self.client.was_login_executed = True
+        offer = {'tradeofferid': '1', 'trade_offer_state': TradeOfferState.Active, 'accountid_other': 358617487}
+        with (
+            patch.object(self.client, '_request', AsyncMock(return_value=create_response({'tradeid': '5'}))) as request,
+            patch.object(self.client, '_get_session_id', return_value='session-id'),
+        ):
+            assert await self.client.accept_trade_offer(offer) == {'tradeid': '5'}
+
+        request.assert_awaited_once()
+        method, url = request.call_args.args
+        assert (method, url) == ('POST', 'https://steamcommunity.com/tradeoffer/1/accept')
+        data = request.call_args.kwargs['data']
+        assert (data['partner'], data['sessionid']) == (account_id_to_steam_id('358617487'), 'session-id')
+
+    async def test_request_retries_too_many_requests(self) -> None:
+        client = AsyncSteamClient(
+            'API_KEY', rate_limiter=RateLimiter({EndpointFamily.MARKET: (1000, 1)}, backoff=0, max_retries=2),
+        )
+        responses = [create_response(status=429), create_response(status=429), create_response(status=429)]
+        with patch.object(client, '_send_request', AsyncMock(side_effect=responses)) as send_request:
+            response = await client._request('GET', 'https://steamcommunity.com/market/priceoverview/')
+            assert response.status == 429
+            assert send_request.await_count == 3
+
+            send_request.side_effect = [create_response(status=429), create_response()]
+            send_request.reset_mock()
+            response = await client._request('GET', 'https://steamcommunity.com/market/priceoverview/')
+            assert response.status == 200
+            assert send_request.await_count == 2
+
+            send_request.side_effect = [create_response(status=429)]
+            send_request.reset_mock()
+            response = await client._request('GET', 'https://steamcommunity.com/profiles/76561198318883215')
+            assert response.status == 429
+            send_request.assert_awaited_once()
+        await client.close()
@@ -0,0 +1,55 @@
+import time
+from unittest import TestCase
+
+from steampy.cache import MemoryCache, SqliteCache
+
+
+class TestCache(TestCase):
+    def test_memory_cache_hit_and_miss(self) -> None:
+        cache = MemoryCache()
+        key = ('730', 'AK-47 | Redline (Field-Tested)', 1, 'PL')
+        assert cache.get('priceoverview', key) is None
+        cache.set('priceoverview', key, {'success': True, 'lowest_price': '$1.00'})
+        assert cache.get('priceoverview', key) == {'success': True, 'lowest_price': '$1.00'}
+        assert cache.get('pricehistory', key) is None
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    def test_memory_cache_returns_copies(self) -> None:
+        cache = MemoryCache()
+        cache.set('priceoverview', ('a',), {'success': True, 'prices': [1]})
+        cache.get('priceoverview', ('a',))['prices'].append(2)
+        assert cache.get('priceoverview', ('a',)) == {'success': True, 'prices': [1]}
+
+    def test_memory_cache_lru_eviction(self) -> None:
+        cache = MemoryCache(max_size=2)
+        cache.set('priceoverview', ('a',), {'success': True})
+        cache.set('priceoverview', ('b',), {'success': True})
+        cache.get('priceoverview', ('a',))
+        cache.set('priceoverview', ('c',), {'success': True})
+        assert len(cache) == 2
+        assert cache.get('priceoverview', ('b',)) is None
+        assert cache.get('priceoverview', ('a',)) is not None
+
+    def test_memory_cache_ttl(self) -> None:
+        cache = MemoryCache(ttls={'priceoverview': 0.01})
+        cache.set('priceoverview', ('a',), {'success': True})
+        time.sleep(0.02)
+        assert cache.get('priceoverview', ('a',)) is None
+
+    def test_endpoint_without_ttl_is_not_cached(self) -> None:
+        cache = MemoryCache()
+        cache.set('unknown', ('a',), {'success': True})
+        assert len(cache) == 0
+
+    def test_sqlite_cache(self) -> None:
+        cache = SqliteCache(':memory:', max_size=2)
+        cache.set('priceoverview', ('a',), {'success': True, 'volume': '10'})
+        cache.set('priceoverview', ('b',), {'success': True})
+        cache.get('priceoverview', ('a',))
+        cache.set('priceoverview', ('c',), {'success': True})
+        assert len(cache) == 2
+        assert cache.get('priceoverview', ('a',)) == {'success': True, 'volume': '10'}
+        assert cache.get('priceoverview', ('b',)) is None
+        cache.clear()
+        assert len(cache) == 0
+        cache.close()
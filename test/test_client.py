@@ -1,11 +1,14 @@
+import base64
+import json
 import unittest
 from decimal import Decimal
 from pathlib import Path
 from unittest import TestCase
+from unittest.mock import Mock, patch
 
 from steampy.client import SteamClient
-from steampy.exceptions import LoginRequired
-from steampy.models import Asset, GameOptions
+from steampy.exceptions import LoginRequired, SevenDaysHoldException
+from steampy.models import Asset, GameOptions, TradeOfferState
 from steampy.utils import account_id_to_steam_id, load_credentials
 
 
@@ -31,6 +34,13 @@ class TestSteamClient(TestCase):
         client.login(self.credentials.login, self.credentials.password, self.steam_guard_file)
         assert client.is_session_alive()
 
+    def test_refresh_access_token(self) -> None:
+        client = SteamClient(self.credentials.api_key)
+        client.login(self.credentials.login, self.credentials.password, self.steam_guard_file)
+        access_token = client.refresh_access_token()
+        assert access_token == client._get_access_token()
+        assert client.get_trade_offers(use_webtoken=True) is not None
+
     def test_logout(self) -> None:
         client = SteamClient(self.credentials.api_key)
         client.login(self.credentials.login, self.credentials.password, self.steam_guard_file)
@@ -77,6 +87,15 @@ class TestSteamClient(TestCase):
         inventory = client.get_partner_inventory(partner_id, game)
         assert inventory is not None
 
+    def test_iter_inventory(self) -> None:
+        client = SteamClient(self.credentials.api_key)
+        client.login(self.credentials.login, self.credentials.password, self.steam_guard_file)
+        steam_id = client.steam_guard['steamid']
+        game = GameOptions.CS
+        pages = list(client.iter_inventory(steam_id, game, page_size=100))
+        inventory = client.get_full_inventory(steam_id, game, page_size=100)
+        assert len(inventory) == sum(len(page) for page in pages)
+
     def test_get_trade_offers_summary(self) -> None:
         client = SteamClient(self.credentials.api_key)
         summary = client.get_trade_offers_summary()
@@ -170,3 +189,329 @@ class TestSteamClient(TestCase):
             assert isinstance(wallet_balance, Decimal)
             wallet_balance = client.get_wallet_balance(convert_to_decimal=False)
             assert isinstance(wallet_balance, str)
+
+
+class TestSessionAliveCheck(TestCase):
+    def test_is_session_alive_is_cached(self) -> None:
+        client = SteamClient('API_KEY', session_check_interval=60)
+        client.was_login_executed = True
+        response = Mock()
+        response.json.return_value = {'logged_in': True, 'steamid': '76561198318883215'}
+        with patch.object(client._session, 'get', return_value=response) as get:
+            assert client.is_session_alive()
+            assert client.is_session_alive()
+        get.assert_called_once_with('https://steamcommunity.com/chat/clientjstoken')
+
+    def test_expired_access_token_without_refresh_token(self) -> None:
+        client = SteamClient('API_KEY')
+        client.was_login_executed = True
+        payload = base64.urlsafe_b64encode(json.dumps({'exp': 1}).encode()).decode().rstrip('=')
+        client._access_token = f'header.{payload}.signature'
+        with patch.object(client._session, 'get') as get:
+            assert not client.is_session_alive()
+        get.assert_not_called()
+
+    def test_expired_access_token_is_refreshed(self) -> None:
+        client = SteamClient('API_KEY')
+        client.steam_guard = {'steamid': '76561198318883215'}
+        client._refresh_token = 'refresh-token'
+        payload = base64.urlsafe_b64encode(json.dumps({'exp': 1}).encode()).decode().rstrip('=')
+        client._access_token = f'header.{payload}.signature'
+        token_response = Mock(**{'json.return_value': {'response': {'access_token': 'new-token'}}})
+        offer_response = Mock(**{'json.return_value': {'response': {'offer': {'tradeofferid': '1'}}}})
+        with patch.object(client, 'api_call', side_effect=[token_response, offer_response]) as api_call:
+            client.get_trade_offer('1', merge=False, use_webtoken=True)
+
+        refresh_call, offer_call = api_call.call_args_list
+        assert refresh_call.args[:3] == ('POST', 'IAuthenticationService', 'GenerateAccessTokenForApp')
+        assert refresh_call.args[4] == {'refresh_token': 'refresh-token', 'steamid': '76561198318883215'}
+        assert offer_call.args[4]['access_token'] == 'new-token'
+        assert client._access_token == 'new-token'
+        assert client._session.cookies.get('steamLoginSecure', domain='steamcommunity.com') == (
+            '76561198318883215%7C%7Cnew-token'
+        )
+
+
+class TestInventoryPagination(TestCase):
+    @staticmethod
+    def create_inventory_page(asset_ids: list[str], more_items: bool) -> dict:
+        page = {
+            'success': 1,
+            'assets': [
+                {'assetid': asset_id, 'classid': asset_id, 'instanceid': '0', 'amount': '1'} for asset_id in asset_ids
+            ],
+            'descriptions': [
+                {'classid': asset_id, 'instanceid': '0', 'market_hash_name': f'Item {asset_id}'} for asset_id in asset_ids
+            ],
+        }
+        if more_items:
+            page.update(more_items=1, last_assetid=asset_ids[-1])
+        return page
+
+    def test_iter_inventory_follows_last_assetid(self) -> None:
+        client = SteamClient('API_KEY')
+        client.was_login_executed = True
+        pages = [
+            self.create_inventory_page(['1', '2'], more_items=True),
+            self.create_inventory_page(['3', '4'], more_items=True),
+            self.create_inventory_page(['5'], more_items=False),
+        ]
+        responses = [Mock(status_code=200, **{'json.return_value': page}) for page in pages]
+        with patch.object(client._session, 'get', side_effect=responses) as get:
+            inventory_pages = list(client.iter_inventory('76561198000000001', GameOptions.CS, page_size=2))
+
+        assert [list(page) for page in inventory_pages] == [['1', '2'], ['3', '4'], ['5']]
+        assert inventory_pages[2]['5']['market_hash_name'] == 'Item 5'
+        assert [call.kwargs['params'].get('start_assetid') for call in get.call_args_list] == [None, '2', '4']
+        assert all(call.kwargs['params']['count'] == 2 for call in get.call_args_list)
+        assert get.call_args.args[0] == 'https://steamcommunity.com/inventory/76561198000000001/730/2'
+
+
+class TestSessionState(TestCase):
+    def test_session_id_is_cached_until_cookies_change(self) -> None:
+        client = SteamClient('API_KEY')
+        client._session.cookies.set('sessionid', 'first', domain='steamcommunity.com', path='/')
+        with patch.object(client._session.cookies, 'get_dict', wraps=client._session.cookies.get_dict) as get_dict:
+            assert client._get_session_id() == 'first'
+            assert client._get_session_id() == 'first'
+            assert get_dict.call_count == 1
+        client._session.cookies.set('sessionid', 'second', domain='steamcommunity.com', path='/')
+        assert client._get_session_id() == 'second'
+
+    def test_steam_id_is_cached(self) -> None:
+        client = SteamClient('API_KEY')
+        client.was_login_executed = True
+        response = Mock(text='g_steamID = "76561198318883215";')
+        with patch.object(client._session, 'get', return_value=response) as get:
+            assert client.get_steam_id() == 76561198318883215
+            assert client.get_steam_id() == 76561198318883215
+        get.assert_called_once()
+
+
+class TestTradeOffersDelta(TestCase):
+    def test_offers_updated_after_cutoff_are_kept(self) -> None:
+        client = SteamClient('API_KEY')
+        response = Mock()
+        response.json.return_value = {
+            'response': {
+                'trade_offers_received': [
+                    {'tradeofferid': '1', 'trade_offer_state': TradeOfferState.Active, 'time_updated': 10},
+                    {'tradeofferid': '2', 'trade_offer_state': TradeOfferState.Accepted, 'time_updated': 1050},
+                    {'tradeofferid': '3', 'trade_offer_state': TradeOfferState.Declined, 'time_updated': 10},
+                ],
+            },
+        }
+        with patch.object(client, 'api_call', return_value=response) as api_call:
+            offers = client.get_trade_offers(merge=False, time_historical_cutoff=1000, get_descriptions=False)
+
+        params = api_call.call_args.args[4]
+        assert params['time_historical_cutoff'] == 1000
+        assert params['get_descriptions'] == 0
+        assert [offer['tradeofferid'] for offer in offers['response']['trade_offers_received']] == ['1', '2']
+        assert offers['response']['trade_offers_sent'] == []
+
+
+class TestAcceptTradeOffers(TestCase):
+    def test_accept_trade_offers(self) -> None:
+        client = SteamClient('API_KEY')
+        client.was_login_executed = True
+        offers = {
+            'response': {
+                'trade_offers_received': [
+                    {'tradeofferid': '1', 'trade_offer_state': TradeOfferState.Active, 'accountid_other': 358617487},
+                    {'tradeofferid': '2', 'trade_offer_state': TradeOfferState.Active, 'accountid_other': 358617487},
+                    {'tradeofferid': '5', 'trade_offer_state': TradeOfferState.Active, 'accountid_other': 358617487},
+                ],
+            },
+        }
+        accepted_offer = {'tradeofferid': '3', 'trade_offer_state': TradeOfferState.Accepted, 'accountid_other': 1}
+
+        def post(url: str, data: dict, headers: dict) -> Mock:
+            assert data['partner'] == account_id_to_steam_id('358617487')
+            response = Mock()
+            response.json.return_value = {
+                '1': {'needs_mobile_confirmation': True},
+                '2': {'tradeid': '20'},
+                '5': {'strError': 'There was an error accepting this trade offer. (16)'},
+            }[data['tradeofferid']]
+            return response
+
+        executor = Mock()
+        executor.confirm_trade_offers.return_value = {'1': True}
+        with (
+            patch.object(client, 'get_trade_offers', return_value=offers) as get_trade_offers,
+            patch.object(client._session, 'post', side_effect=post) as session_post,
+            patch.object(client._session, 'get') as session_get,
+            patch.object(client, 'get_confirmation_executor', return_value=executor),
+        ):
+            results = client.accept_trade_offers(['1', '2', '4', accepted_offer, '5'])
+
+        assert list(results) == ['1', '2', '4', '3', '5']
+        assert results['1']['success']
+        assert results['1']['confirmed']
+        assert results['2']['success']
+        assert not results['2']['needs_confirmation']
+        assert not results['5']['success']
+        assert results['5']['error'] == 'There was an error accepting this trade offer. (16)'
+        assert 'Accepted' in results['3']['error']
+        assert not results['4']['success']
+        get_trade_offers.assert_called_once()
+        assert session_post.call_count == 3
+        session_get.assert_not_called()
+        executor.confirm_trade_offers.assert_called_once_with(['1'])
+
+    def test_accept_trade_offer_dict_skips_lookups(self) -> None:
+        client = SteamClient('API_KEY')
+        client.was_login_executed = True
+        offer = {'tradeofferid': '1', 'trade_offer_state': TradeOfferState.Active, 'accountid_other': 358617487}
+        response = Mock()
+        response.json.return_value = {'tradeid': '5'}
+        with (
+            patch.object(client, 'get_trade_offer') as get_trade_offer,
+            patch.object(client._session, 'post', return_value=response) as session_post,
+            patch.object(client._session, 'get') as session_get,
+        ):
+            assert client.accept_trade_offer(offer) == {'tradeid': '5'}
+
+        get_trade_offer.assert_not_called()
+        session_get.assert_not_called()
+        assert session_post.call_args.kwargs['data']['partner'] == account_id_to_steam_id('358617487')
+
+    def test_accept_trade_offer_checks_trade_hold_on_demand(self) -> None:
+        client = SteamClient('API_KEY')
+        client.was_login_executed = True
+        offer = {'tradeofferid': '1', 'trade_offer_state': TradeOfferState.Active, 'accountid_other': 358617487}
+        page = Mock(text='You have logged in from a new device. In order to protect the items')
+        with (
+            patch.object(client, 'get_trade_offer', return_value={'response': {'offer': offer}}) as get_trade_offer,
+            patch.object(client._session, 'get', return_value=page),
+            self.assertRaises(SevenDaysHoldException),
+        ):
+            client.accept_trade_offer('1', check_trade_hold=True)
+
+        get_trade_offer.assert_called_once_with('1', merge=False, use_webtoken=True)
+
+
+class TestSendOffers(TestCase):
+    def test_send_offers(self) -> None:
+        client = SteamClient('API_KEY')
+        client.was_login_executed = True
+        url_without_escrow = 'https://steamcommunity.com/tradeoffer/new/?partner=1&token=a'
+        url_with_escrow = 'https://steamcommunity.com/tradeoffer/new/?partner=2&token=b'
+        escrow_page = 'var g_daysMyEscrow = 0;\nvar g_daysTheirEscrow = {};\n'
+
+        def get(url: str, headers: dict) -> Mock:
+            return Mock(text=escrow_page.format(15 if url == url_with_escrow else 0))
+
+        replies = iter(
+            [
+                {'tradeofferid': '10', 'needs_mobile_confirmation': True},
+                {'tradeofferid': '11', 'needs_mobile_confirmation': True},
+                {'strError': 'There was an error sending your trade offer. (15)'},
+            ],
+        )
+
+        def post(url: str, data: dict, headers: dict) -> Mock:
+            response = Mock()
+            response.json.return_value = next(replies)
+            return response
+
+        executor = Mock()
+        executor.confirm_trade_offers.return_value = {'10': True, '11': True}
+        offers = [
+            ([], [], url_without_escrow, 'first'),
+            ([], [], url_with_escrow),
+            ([], [], 'https://steamcommunity.com/tradeoffer/new/?token=a&partner=1'),
+            ([], [], url_without_escrow),
+        ]
+        with (
+            patch.object(client._session, 'get', side_effect=get) as session_get,
+            patch.object(client._session, 'post', side_effect=post),
+            patch.object(client, 'get_confirmation_executor', return_value=executor),
+        ):
+            results = client.send_offers(offers, max_workers=1, max_escrow_duration=0)
+            assert client.get_escrow_duration(url_with_escrow, use_cache=True) == 15
+
+        assert [result.get('tradeofferid') for result in results] == ['10', None, '11', None]
+        assert [result['success'] for result in results] == [True, False, True, False]
+        assert results[3]['error'] == 'There was an error sending your trade offer. (15)'
+        assert results[0]['confirmed']
+        assert results[2]['confirmed']
+        assert results[1]['escrow_duration'] == 15
+        assert session_get.call_count == 2
+        executor.confirm_trade_offers.assert_called_once_with(['10', '11'])
+
+    def test_escrow_duration_without_partner_is_not_cached(self) -> None:
+        client = SteamClient('API_KEY')
+        client.was_login_executed = True
+        page = Mock(text='var g_daysMyEscrow = 0;\nvar g_daysTheirEscrow = 15;\n')
+        with patch.object(client._session, 'get', return_value=page) as session_get:
+            assert client.get_escrow_duration('https://steamcommunity.com/tradeoffer/1', use_cache=True) == 15
+            assert client.get_escrow_duration('https://steamcommunity.com/tradeoffer/2', use_cache=True) == 15
+
+        assert session_get.call_count == 2
+
+
+class TestTradeHistory(TestCase):
+    @staticmethod
+    def create_history_page(trade_times: list[int], more: bool) -> dict:
+        trades = [
+            {
+                'tradeid': str(time_init),
+                'time_init': time_init,
+                'assets_received': [
+                    {
+                        'assetid': str(time_init),
+                        'contextid': '2',
+                        'amount': '1',
+                        'classid': '1',
+                        'instanceid': '0',
+                        'new_assetid': f'{time_init}1',
+                    },
+                ],
+            }
+            for time_init in trade_times
+        ]
+        descriptions = [{'classid': '1', 'instanceid': '0', 'market_hash_name': 'Item'}]
+        return {'response': {'trades': trades, 'descriptions': descriptions, 'more': more}}
+
+    def test_iter_trade_history_walks_cursor(self) -> None:
+        client = SteamClient('API_KEY')
+        pages = [self.create_history_page([50, 40], True), self.create_history_page([30, 20], True)]
+        with patch.object(client, 'get_trade_history', side_effect=pages) as get_trade_history:
+            trades = list(client.iter_trade_history(since=25, page_size=2))
+
+        assert [trade['tradeid'] for trade in trades] == ['50', '40', '30']
+        assert trades[0]['assets_received']['50']['market_hash_name'] == 'Item'
+        assert trades[0]['assets_received']['50']['new_assetid'] == '501'
+        assert get_trade_history.call_args_list[0].args == (2, None, None)
+        assert get_trade_history.call_args_list[1].args == (2, 40, '40')
+        assert not get_trade_history.call_args.kwargs['navigating_back']
+
+    def test_iter_trade_history_keeps_assets_without_description(self) -> None:
+        client = SteamClient('API_KEY')
+        page = self.create_history_page([50, 40], False)
+        deleted_asset = {'assetid': '7', 'contextid': '2', 'amount': '1', 'classid': '2', 'instanceid': '0'}
+        page['response']['trades'][0]['assets_received'].append(deleted_asset)
+        with patch.object(client, 'get_trade_history', return_value=page):
+            trades = list(client.iter_trade_history())
+
+        assert [trade['tradeid'] for trade in trades] == ['50', '40']
+        assert trades[0]['assets_received']['50']['market_hash_name'] == 'Item'
+        assert trades[0]['assets_received']['7'] == {**deleted_asset, 'id': '7'}
+
+    def test_get_trade_history_sends_flags_as_integers(self) -> None:
+        client = SteamClient('API_KEY')
+        with patch.object(client, 'api_call') as api_call:
+            client.get_trade_history(10, navigating_back=False, include_total=False)
+
+        params = api_call.call_args.args[4]
+        assert params['navigating_back'] == 0
+        assert params['include_total'] == 0
+        assert (params['get_descriptions'], params['include_failed']) == (1, 1)
+
+    def test_iter_trade_history_stops_without_more(self) -> None:
+        client = SteamClient('API_KEY')
+        with patch.object(client, 'get_trade_history', return_value=self.create_history_page([10], False)) as get:
+            assert [trade['tradeid'] for trade in client.iter_trade_history()] == ['10']
+        get.assert_called_once()
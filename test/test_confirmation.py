@@ -0,0 +1,275 @@
+import asyncio
+import json
+import threading
+from base64 import b64encode
+from unittest import TestCase
+from unittest.mock import AsyncMock, Mock, patch
+
+from steampy.confirmation import (
+    AsyncConfirmationExecutor,
+    Confirmation,
+    ConfirmationExecutor,
+    ConfirmationType,
+    ConfirmationWatcher,
+)
+
+
+def create_response(json_data: dict) -> Mock:
+    response = Mock(status_code=200, text='')
+    response.json.return_value = json_data
+    return response
+
+
+class TestConfirmationExecutor(TestCase):
+    confirmations_json = {
+        'success': True,
+        'conf': [
+            {'id': '1', 'nonce': 'n1', 'type': ConfirmationType.TRADE, 'creator_id': '1001'},
+            {'id': '2', 'nonce': 'n2', 'type': ConfirmationType.MARKET_LISTING, 'creator_id': '2002'},
+            {'id': '3', 'nonce': 'n3', 'type': ConfirmationType.TRADE, 'creator_id': '1003'},
+        ],
+    }
+
+    def setUp(self) -> None:
+        self.session = Mock()
+        self.executor = ConfirmationExecutor(b64encode(b'identity_secret').decode(), '76561198318883215', self.session)
+        self.executor._get_confirmations = Mock(return_value=self.executor._parse_confirmations(self.confirmations_json))
+        self.session.post.return_value = create_response({'success': True})
+
+    def test_parse_confirmations(self) -> None:
+        confirmation = self.executor._parse_confirmations(self.confirmations_json)[1]
+        assert (confirmation.data_confid, confirmation.nonce) == ('2', 'n2')
+        assert confirmation.type == ConfirmationType.MARKET_LISTING
+        assert confirmation.creator_id == '2002'
+
+    def test_confirm_trade_offers_without_details_pages(self) -> None:
+        result = self.executor.confirm_trade_offers(['1001', '1003', '9999'])
+        assert result == {'1001': True, '1003': True, '9999': False}
+        self.session.get.assert_not_called()
+        self.session.post.assert_called_once()
+        url = self.session.post.call_args.args[0]
+        data = self.session.post.call_args.kwargs['data']
+        assert url == 'https://steamcommunity.com/mobileconf/multiajaxop'
+        assert data['op'] == 'allow'
+        assert data['cid[]'] == ['1', '3']
+        assert data['ck[]'] == ['n1', 'n3']
+
+    def test_confirm_sell_listings_reads_only_listing_details(self) -> None:
+        self.executor._fetch_confirmation_details_page = Mock(return_value='details')
+        self.executor._get_confirmation_sell_listing_id = Mock(return_value='555')
+        result = self.executor.confirm_sell_listings(['555'])
+        assert result == {'555': True}
+        self.executor._fetch_confirmation_details_page.assert_called_once()
+        assert self.executor._fetch_confirmation_details_page.call_args.args[0].data_confid == '2'
+
+    def test_confirm_all_with_filter(self) -> None:
+        confirmed = self.executor.confirm_all(lambda confirmation: confirmation.type == ConfirmationType.TRADE)
+        assert [confirmation.data_confid for confirmation in confirmed] == ['1', '3']
+
+    def test_nothing_to_confirm(self) -> None:
+        assert self.executor.confirm_all(lambda confirmation: False) == []
+        assert self.executor.confirm_trade_offers(['9999']) == {'9999': False}
+        self.session.post.assert_not_called()
+
+    def test_select_trade_offer_confirmation_uses_creator_id(self) -> None:
+        confirmations = [Confirmation('1', 'n1', ConfirmationType.TRADE, '1001')]
+        assert self.executor._select_trade_offer_confirmation(confirmations, '1001') is confirmations[0]
+        self.session.get.assert_not_called()
+
+
+class TestAsyncConfirmationExecutor(TestCase):
+    def setUp(self) -> None:
+        self.executor = AsyncConfirmationExecutor(
+            b64encode(b'identity_secret').decode(), '76561198318883215', AsyncMock(side_effect=self.request),
+        )
+        self.executor._fetch_confirmation_details_page = AsyncMock(return_value='details')
+        self.executor._get_confirmation_sell_listing_id = Mock(return_value='555')
+        self.sent_data = []
+
+    async def request(self, method: str, url: str, **kwargs) -> Mock:
+        response = Mock(status=200)
+        if url.endswith('/getlist'):
+            response.text = AsyncMock(return_value=json.dumps(TestConfirmationExecutor.confirmations_json))
+        else:
+            self.sent_data.append(kwargs['data'])
+            response.json = AsyncMock(return_value={'success': True})
+        return response
+
+    def test_confirm_trade_offers(self) -> None:
+        result = asyncio.run(self.executor.confirm_trade_offers(['1001', '1003', '9999']))
+        assert result == {'1001': True, '1003': True, '9999': False}
+        self.executor._fetch_confirmation_details_page.assert_not_called()
+        (data,) = self.sent_data
+        assert ('op', 'allow') in data
+        assert [value for key, value in data if key == 'cid[]'] == ['1', '3']
+        assert [value for key, value in data if key == 'ck[]'] == ['n1', 'n3']
+
+    def test_confirm_sell_listings_reads_only_listing_details(self) -> None:
+        assert asyncio.run(self.executor.confirm_sell_listings(['555'])) == {'555': True}
+        self.executor._fetch_confirmation_details_page.assert_called_once()
+        assert self.executor._fetch_confirmation_details_page.call_args.args[0].data_confid == '2'
+
+    def test_confirm_all_with_filter(self) -> None:
+        confirmed = asyncio.run(
+            self.executor.confirm_all(lambda confirmation: confirmation.type == ConfirmationType.TRADE),
+        )
+        assert [confirmation.data_confid for confirmation in confirmed] == ['1', '3']
+        assert len(self.sent_data) == 1
+
+    def test_nothing_to_confirm(self) -> None:
+        assert asyncio.run(self.executor.confirm_all(lambda confirmation: False)) == []
+        assert asyncio.run(self.executor.confirm_trade_offers(['9999'])) == {'9999': False}
+        assert self.sent_data == []
+
+
+class TestConfirmationIndex(TestCase):
+    def setUp(self) -> None:
+        self.session = Mock()
+        self.executor = ConfirmationExecutor(b64encode(b'identity_secret').decode(), '76561198318883215', self.session)
+        self.executor._fetch_confirmations_page = Mock(side_effect=self.create_confirmations_page)
+        self.executor._fetch_confirmation_details_page = Mock(return_value='details')
+        self.executor._get_confirmation_sell_listing_id = Mock(side_effect=lambda page: '555')
+        self.session.get.return_value = create_response({'success': True})
+        self.session.post.return_value = create_response({'success': True})
+        self.pending = [
+            {'id': '1', 'nonce': 'n1', 'type': ConfirmationType.TRADE, 'creator_id': '1001'},
+            {'id': '2', 'nonce': 'n2', 'type': ConfirmationType.MARKET_LISTING, 'creator_id': '2002'},
+        ]
+
+    def create_confirmations_page(self) -> Mock:
+        return Mock(status_code=200, text=json.dumps({'success': True, 'conf': self.pending}))
+
+    def test_repeated_lookups_use_index(self) -> None:
+        assert self.executor.confirm_sell_listings(['555']) == {'555': True}
+        self.pending = [self.pending[0]]
+        self.executor.send_trade_allow_request('1001')
+        self.executor._fetch_confirmations_page.assert_called_once()
+        self.executor._fetch_confirmation_details_page.assert_called_once()
+
+    def test_missing_id_refreshes_index(self) -> None:
+        self.executor.confirm_trade_offers(['1001'])
+        self.pending = [{'id': '3', 'nonce': 'n3', 'type': ConfirmationType.TRADE, 'creator_id': '1003'}]
+        assert self.executor.confirm_trade_offers(['1003']) == {'1003': True}
+        assert self.executor._fetch_confirmations_page.call_count == 2
+
+    def test_refresh_keeps_resolved_asset_ids(self) -> None:
+        assert self.executor.confirm_sell_listings(['556']) == {'556': False}
+        self.executor.index_ttl = 0
+        assert self.executor.confirm_sell_listings(['555']) == {'555': True}
+        assert self.executor._fetch_confirmations_page.call_count == 2
+        self.executor._fetch_confirmation_details_page.assert_called_once()
+
+    def test_expired_index_is_refreshed(self) -> None:
+        self.executor.index_ttl = 0
+        self.executor.confirm_trade_offers(['1001'])
+        self.executor.confirm_trade_offers(['1001'])
+        assert self.executor._fetch_confirmations_page.call_count == 2
+
+    def test_clear_index(self) -> None:
+        self.executor.confirm_trade_offers(['9999'])
+        self.executor.clear_index()
+        self.executor.confirm_trade_offers(['9999'])
+        assert self.executor._fetch_confirmations_page.call_count == 2
+
+
+class TestConfirmationWatcher(TestCase):
+    def setUp(self) -> None:
+        self.executor = Mock()
+        self.executor._get_confirmations.return_value = ConfirmationExecutor._parse_confirmations({
+            'conf': [
+                {'id': '1', 'nonce': 'n1', 'type': ConfirmationType.TRADE, 'creator_id': '1001'},
+                {'id': '2', 'nonce': 'n2', 'type': ConfirmationType.MARKET_LISTING, 'creator_id': '2002'},
+                {'id': '3', 'nonce': 'n3', 'type': ConfirmationType.MARKET_LISTING, 'creator_id': '2003'},
+            ],
+        })
+        self.executor._get_trade_offer_id.side_effect = lambda confirmation: (
+            confirmation.creator_id if confirmation.type == ConfirmationType.TRADE else None
+        )
+        self.executor._get_sell_listing_asset_id.side_effect = lambda confirmation: (
+            f'asset{confirmation.data_confid}' if confirmation.type == ConfirmationType.MARKET_LISTING else None
+        )
+
+    def sent_confids(self) -> list[list[str]]:
+        return [
+            [confirmation.data_confid for confirmation in call.args[0]]
+            for call in self.executor._send_confirmations.call_args_list
+        ]
+
+    def test_confirms_expected_objects(self) -> None:
+        watcher = ConfirmationWatcher(self.executor)
+        watcher.expect_trade_offer('1001')
+        watcher.expect_sell_listing('asset3')
+        watcher.expect_sell_listing('asset9')
+        assert [confirmation.data_confid for confirmation in watcher.poll_once()] == ['1', '3']
+        assert self.sent_confids() == [['1', '3']]
+        assert watcher.pending_count == 1
+
+    def test_policy_and_batches(self) -> None:
+        watcher = ConfirmationWatcher(
+            self.executor, lambda confirmation: confirmation.type == ConfirmationType.MARKET_LISTING, batch_size=1,
+        )
+        watcher.poll_once()
+        assert self.sent_confids() == [['2'], ['3']]
+        self.executor._get_sell_listing_asset_id.assert_not_called()
+
+    def test_nothing_to_confirm(self) -> None:
+        assert ConfirmationWatcher(self.executor).poll_once() == []
+        self.executor._send_confirmations.assert_not_called()
+
+    def test_thread_reports_errors_and_stops(self) -> None:
+        polled = threading.Event()
+        errors = []
+
+        def fail(refresh: bool) -> None:
+            polled.set()
+            raise ConnectionError
+
+        self.executor._get_confirmations.side_effect = fail
+        with ConfirmationWatcher(self.executor, interval=0.01, on_error=errors.append) as watcher:
+            assert polled.wait(1)
+        assert watcher._thread is None
+        assert isinstance(errors[0], ConnectionError)
+
+    def test_run_async(self) -> None:
+        watcher = ConfirmationWatcher(self.executor, lambda confirmation: True, interval=0.01)
+
+        async def run() -> None:
+            task = asyncio.create_task(watcher.run_async())
+            while not self.executor._send_confirmations.called:
+                await asyncio.sleep(0.01)
+            task.cancel()
+
+        asyncio.run(asyncio.wait_for(run(), 1))
+        assert self.sent_confids()[0] == ['1', '2', '3']
+
+    def test_expectations_expire(self) -> None:
+        watcher = ConfirmationWatcher(self.executor, expectation_ttl=60)
+        with patch('steampy.confirmation.time.monotonic', return_value=1000):
+            watcher.expect_trade_offer('9999')
+            watcher.expect_sell_listing('asset9')
+            assert watcher.pending_count == 2
+        with patch('steampy.confirmation.time.monotonic', return_value=1060):
+            assert watcher.pending_count == 0
+            watcher.poll_once()
+        self.executor._get_trade_offer_id.assert_not_called()
+
+    def test_async_executor(self) -> None:
+        executor = Mock(spec=AsyncConfirmationExecutor)
+        executor._get_confirmations = AsyncMock(return_value=self.executor._get_confirmations.return_value)
+        executor._get_trade_offer_id = AsyncMock(side_effect=self.executor._get_trade_offer_id.side_effect)
+        get_asset_id = self.executor._get_sell_listing_asset_id.side_effect
+        executor._get_sell_listing_asset_id = AsyncMock(side_effect=get_asset_id)
+        executor._send_confirmations = AsyncMock(return_value={'success': True})
+        watcher = ConfirmationWatcher(executor)
+        watcher.expect_trade_offer('1001')
+        watcher.expect_sell_listing('asset2')
+
+        with self.assertRaises(TypeError):
+            watcher.poll_once()
+        with self.assertRaises(TypeError):
+            watcher.start()
+        confirmations = asyncio.run(watcher.poll_once_async())
+
+        assert [confirmation.data_confid for confirmation in confirmations] == ['1', '2']
+        executor._send_confirmations.assert_awaited_once()
+        assert watcher.pending_count == 0
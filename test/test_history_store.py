@@ -0,0 +1,118 @@
+from collections.abc import Iterator
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from steampy.exceptions import TooManyRequests
+from steampy.history_store import TradeHistoryStore
+from steampy.models import TradeOfferState
+from steampy.utils import account_id_to_steam_id
+
+
+def create_trade(tradeid: str, time_init: int, partner: str = '76561198000000001', status: int = 3) -> dict:
+    asset = {
+        'id': f'{tradeid}0',
+        'new_assetid': f'{tradeid}1',
+        'appid': 730,
+        'contextid': '2',
+        'amount': '1',
+        'market_hash_name': f'Item {tradeid}',
+    }
+    return {
+        'tradeid': tradeid,
+        'steamid_other': partner,
+        'time_init': time_init,
+        'status': status,
+        'assets_received': {asset['id']: asset},
+        'assets_given': [],
+    }
+
+
+def create_offer(offer_id: str, state: TradeOfferState, time_updated: int) -> dict:
+    return {
+        'tradeofferid': offer_id,
+        'accountid_other': 358617487,
+        'is_our_offer': False,
+        'trade_offer_state': state,
+        'time_created': 10,
+        'time_updated': time_updated,
+    }
+
+
+class TestTradeHistoryStore(TestCase):
+    def test_sync_trade_history_is_incremental(self) -> None:
+        store = TradeHistoryStore(':memory:', overlap=10)
+        client = MagicMock()
+        client.iter_trade_history.side_effect = [
+            iter([create_trade('2', 200), create_trade('1', 100)]),
+            iter([create_trade('3', 300), create_trade('2', 200, status=12)]),
+        ]
+
+        assert store.sync_trade_history(client) == 2
+        assert store.sync_trade_history(client) == 2
+
+        assert [call.kwargs['since'] for call in client.iter_trade_history.call_args_list] == [None, 190]
+        assert [trade['tradeid'] for trade in store.get_trades()] == ['3', '2', '1']
+        assert store.get_trade('2')['status'] == 12
+
+    def test_failed_sync_is_repeated_from_the_same_point(self) -> None:
+        store = TradeHistoryStore(':memory:')
+        client = MagicMock()
+
+        def fail_after_two_trades() -> Iterator[dict]:
+            yield create_trade('100', 100)
+            yield create_trade('90', 90)
+            raise TooManyRequests('Too many requests, try again later.')
+
+        client.iter_trade_history.side_effect = [
+            iter([create_trade('50', 50)]),
+            fail_after_two_trades(),
+            iter([create_trade('100', 100), create_trade('90', 90), create_trade('80', 80), create_trade('70', 70)]),
+        ]
+
+        store.sync_trade_history(client)
+        with self.assertRaises(TooManyRequests):
+            store.sync_trade_history(client, batch_size=1)
+        store.sync_trade_history(client, batch_size=1)
+
+        assert [call.kwargs['since'] for call in client.iter_trade_history.call_args_list] == [None, 50, 50]
+        assert [trade['tradeid'] for trade in store.get_trades()] == ['100', '90', '80', '70', '50']
+
+    def test_queries(self) -> None:
+        store = TradeHistoryStore(':memory:')
+        store.add_trades(
+            [
+                create_trade('1', 100),
+                create_trade('2', 200, partner='76561198000000002'),
+                create_trade('3', 300),
+            ],
+        )
+
+        assert [trade['tradeid'] for trade in store.get_trades(since=150)] == ['3', '2']
+        assert [trade['tradeid'] for trade in store.get_trades(partner_steam_id='76561198000000001', until=300)] == [
+            '1',
+        ]
+        assert [trade['tradeid'] for trade in store.get_trades_with_asset('21')] == ['2']
+        assert [asset['market_hash_name'] for asset in store.get_received_assets(since=100, until=250)] == [
+            'Item 2',
+            'Item 1',
+        ]
+        assert store.get_given_assets() == []
+        assert store.get_trade('4') is None
+
+    def test_sync_trade_offers(self) -> None:
+        store = TradeHistoryStore(':memory:')
+        client = MagicMock()
+        client.get_trade_offers.side_effect = [
+            {'response': {'trade_offers_received': [create_offer('1', TradeOfferState.Active, 100)]}},
+            {'response': {'trade_offers_sent': [create_offer('1', TradeOfferState.Accepted, 150)]}},
+        ]
+
+        store.sync_trade_offers(client)
+        store.sync_trade_offers(client)
+
+        cutoffs = [call.kwargs['time_historical_cutoff'] for call in client.get_trade_offers.call_args_list]
+        assert cutoffs == [None, 100]
+        assert store.get_offer('1')['trade_offer_state'] == TradeOfferState.Accepted
+        partner = account_id_to_steam_id('358617487')
+        assert [offer['tradeofferid'] for offer in store.get_offers(partner_steam_id=partner, state=3)] == ['1']
+        assert store.get_offers(state=TradeOfferState.Active) == []
@@ -1,9 +1,18 @@
+import threading
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
 from pathlib import Path
 from unittest import TestCase
+from unittest.mock import Mock
+from urllib.parse import parse_qs, urlparse
+
+import requests
 
 from steampy.client import SteamClient
 from steampy.exceptions import TooManyRequests
+from steampy.market import MarketListingTracker, SteamMarket
 from steampy.models import Currency, GameOptions
 from steampy.utils import load_credentials
 
@@ -84,3 +93,232 @@ class TestMarket(TestCase):
         assert buy_order_id is not None
         response = client.market.cancel_buy_order(buy_order_id)
         assert response['success']
+
+
+class FakePriceSession:
+    def __init__(self) -> None:
+        self.requested_names = []
+        self._lock = threading.Lock()
+
+    def get(self, url: str, params: dict) -> Mock:
+        with self._lock:
+            self.requested_names.append(params['market_hash_name'])
+        time.sleep(0.05)
+        response = Mock(status_code=HTTPStatus.OK)
+        response.json.return_value = {'success': True, 'lowest_price': f'{params["market_hash_name"]} price'}
+        return response
+
+
+class FakeListingsSession:
+    market_page = (Path(__file__).resolve().parent / 'fixtures' / 'market_page.html').read_text(encoding='utf-8')
+
+    def __init__(self, total: int, total_count: int | None = None, overlap: int = 0) -> None:
+        self.total = total
+        self.total_count = total_count or total
+        self.overlap = overlap
+        self.requested_urls = []
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Mock:
+        with self._lock:
+            self.requested_urls.append(url)
+        if url.endswith('/market'):
+            return Mock(status_code=HTTPStatus.OK, text=self.market_page.replace('1,234', f'{self.total:,}'))
+
+        query = parse_qs(urlparse(url).query)
+        start, count = int(query['start'][0]), int(query['count'][0])
+        end = self.total_count if count == -1 else min(start + count, self.total_count)
+        listing_ids = [str(5_000_000 + i) for i in range(max(start - self.overlap, 0), end)]
+        response = Mock(status_code=HTTPStatus.OK)
+        response.json.return_value = {
+            'total_count': self.total_count,
+            'results_html': ''.join(
+                f'<div id="mylisting_{listing_id}"><span title="buyer pays">$1.15</span>'
+                f'<span title="you receive">($1.00)</span><div class="market_listing_listed_date">1 Jan</div></div>'
+                for listing_id in listing_ids
+            ),
+            'hovers': ''.join(
+                f"CreateItemHoverFromContainer( g_rgAssets, 'mylisting_{listing_id}_name', 730, '2', "
+                f"'{listing_id}', 0 );"
+                for listing_id in listing_ids
+            ),
+            'assets': {'730': {'2': {listing_id: {'id': listing_id} for listing_id in listing_ids}}},
+        }
+        return response
+
+
+class TestFetchPrices(TestCase):
+    def test_fetch_prices_deduplicates_names(self) -> None:
+        session = FakePriceSession()
+        market = SteamMarket(session)
+        names = ['AK-47 | Redline (Field-Tested)', 'AWP | Asiimov (Field-Tested)', 'AK-47 | Redline (Field-Tested)']
+        prices = dict(market.fetch_prices(names, GameOptions.CS))
+        assert sorted(session.requested_names) == sorted(set(names))
+        assert prices['AWP | Asiimov (Field-Tested)']['lowest_price'] == 'AWP | Asiimov (Field-Tested) price'
+
+    def test_fetch_prices_coalesces_concurrent_requests(self) -> None:
+        session = FakePriceSession()
+        market = SteamMarket(session)
+        names = ['AK-47 | Redline (Field-Tested)', 'AWP | Asiimov (Field-Tested)']
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            results = list(executor.map(lambda _: dict(market.fetch_prices(names, GameOptions.CS)), range(3)))
+        assert sorted(session.requested_names) == sorted(names)
+        assert all(result == results[0] for result in results)
+
+
+class TestBulkOperations(TestCase):
+    def setUp(self) -> None:
+        self.session = Mock()
+        self.market = SteamMarket(self.session)
+        self.market._set_login_executed({'steamid': '76561198318883215', 'identity_secret': ''}, 'session_id')
+        self.market._confirmation_executor = Mock()
+
+    def test_create_sell_orders_confirms_in_one_batch(self) -> None:
+        def post(url: str, data: dict, headers: dict) -> Mock:
+            if data['assetid'] == '3':
+                raise ConnectionError('connection reset')
+            response = Mock()
+            response.json.return_value = {'success': True, 'needs_mobile_confirmation': data['assetid'] != '2'}
+            return response
+
+        self.session.post.side_effect = post
+        self.market._confirmation_executor.confirm_sell_listings.return_value = {'1': True}
+        items = [(asset_id, GameOptions.CS, '100') for asset_id in ('1', '2', '3')]
+        results = self.market.create_sell_orders(items)
+        assert list(results) == ['1', '2', '3']
+        assert results['1']['confirmed']
+        assert results['2']['success']
+        assert not results['2']['needs_confirmation']
+        assert not results['2']['confirmed']
+        assert results['3']['error'] == 'connection reset'
+        self.market._confirmation_executor.confirm_sell_listings.assert_called_once_with(['1'])
+
+    def test_cancel_sell_orders_retries_transient_errors(self) -> None:
+        attempts = {}
+
+        def post(url: str, data: dict, headers: dict) -> Mock:
+            listing_id = url.rsplit('/', 1)[1]
+            attempts[listing_id] = attempts.get(listing_id, 0) + 1
+            if listing_id == '2' and attempts[listing_id] == 1:
+                raise requests.ConnectionError('connection reset')
+            return Mock(status_code=HTTPStatus.BAD_GATEWAY if listing_id == '3' else HTTPStatus.OK)
+
+        self.session.post.side_effect = post
+        results = self.market.cancel_sell_orders(['1', '2', '3'], retry_delay=0)
+        assert results['1'] == results['2'] == {'success': True}
+        assert not results['3']['success']
+        assert results['3']['attempts'] == 3
+        assert attempts == {'1': 1, '2': 2, '3': 3}
+
+    def test_permanent_errors_are_not_retried(self) -> None:
+        def post(url: str, data: dict, headers: dict) -> Mock:
+            response = Mock(status_code=HTTPStatus.OK)
+            response.json.return_value = {'success': 0 if data['buy_orderid'] == '10' else 1}
+            if data['buy_orderid'] == '12':
+                response.status_code = HTTPStatus.TOO_MANY_REQUESTS
+            return response
+
+        self.session.post.side_effect = post
+        results = self.market.cancel_buy_orders(['10', '11', '12'], max_workers=1, retry_delay=0)
+        assert results['10']['attempts'] == 1
+        assert results['11'] == {'success': 1}
+        assert results['12']['attempts'] == 3
+        assert self.session.post.call_count == 5
+
+    def test_cancel_buy_orders(self) -> None:
+        response = Mock(status_code=HTTPStatus.OK)
+        response.json.return_value = {'success': 1}
+        self.session.post.return_value = response
+        results = self.market.cancel_buy_orders(['10', '11'], max_workers=2)
+        assert results == {'10': {'success': 1}, '11': {'success': 1}}
+        assert sorted(call.args[1]['buy_orderid'] for call in self.session.post.call_args_list) == ['10', '11']
+
+
+class TestMyMarketListings(TestCase):
+    def create_market(self, session: FakeListingsSession) -> SteamMarket:
+        market = SteamMarket(session)
+        market._set_login_executed({'steamid': '76561198318883215'}, 'session_id')
+        return market
+
+    def test_get_my_market_listings_merges_pages(self) -> None:
+        session = FakeListingsSession(1234)
+        market = self.create_market(session)
+        listings = market.get_my_market_listings(parser='regex')
+        assert len(listings['buy_orders']) == 4
+        assert len(listings['sell_listings']) == 12 + 1224
+        assert listings['sell_listings']['5001233']['description'] == {'id': '5001233'}
+        assert session.requested_urls[1] == 'https://steamcommunity.com/market/mylistings/?query=&start=10&count=100'
+        assert market.last_listings_request_count == len(session.requested_urls) == 14
+
+    def test_iter_my_market_listings_yields_pages_in_order(self) -> None:
+        pages = list(self.create_market(FakeListingsSession(1234)).iter_my_market_listings(max_workers=8))
+        assert len(pages[0]['buy_orders']) == 4
+        first_listing_ids = [next(iter(page['sell_listings'])) for page in pages[1:]]
+        assert first_listing_ids == [str(5_000_010 + i * 100) for i in range(13)]
+
+    def test_no_page_past_the_end(self) -> None:
+        session = FakeListingsSession(1005)
+        market = self.create_market(session)
+        assert len(market.get_my_market_listings()['sell_listings']) == 12 + 995
+        assert session.requested_urls[-1].endswith('start=910&count=100')
+        assert market.last_listings_request_count == 11
+
+    def test_listings_moved_between_pages_are_deduplicated(self) -> None:
+        pages = list(self.create_market(FakeListingsSession(1234, overlap=5)).iter_my_market_listings())
+        listing_ids = [listing_id for page in pages[1:] for listing_id in page['sell_listings']]
+        assert len(listing_ids) == len(set(listing_ids)) == 1229
+
+    def test_pages_follow_total_count(self) -> None:
+        session = FakeListingsSession(1005, total_count=1105)
+        market = self.create_market(session)
+        assert len(market.get_my_market_listings()['sell_listings']) == 12 + 1095
+        assert market.last_listings_request_count == 12
+
+    def test_remaining_listings_in_one_request(self) -> None:
+        session = FakeListingsSession(500)
+        market = self.create_market(session)
+        assert len(market.get_my_market_listings()['sell_listings']) == 12 + 490
+        assert session.requested_urls[-1].endswith('/render/?query=&start=10&count=-1')
+        assert market.last_listings_request_count == 2
+
+
+class TestMarketListingTracker(TestCase):
+    def setUp(self) -> None:
+        self.session = FakeListingsSession(1234)
+        self.market = SteamMarket(self.session)
+        self.market._set_login_executed({'steamid': '76561198318883215'}, 'session_id')
+        self.tracker = MarketListingTracker(self.market, parser='regex')
+
+    def test_unchanged_listings_cost_one_request(self) -> None:
+        assert self.tracker.poll() == []
+        assert len(self.tracker.listings) == 12 + 1224
+        assert self.tracker.poll() == []
+        assert self.market.last_listings_request_count == 1
+
+    def test_events(self) -> None:
+        self.tracker.poll()
+        self.session.total = self.session.total_count = 1232
+        self.session.market_page = self.session.market_page.replace('4000000000000000000', '4000000000000000001')
+        self.session.post = Mock(return_value=Mock(status_code=HTTPStatus.OK))
+        self.market.cancel_sell_order('5001232')
+        events = {event['listing_id']: event['type'] for event in self.tracker.poll()}
+        assert events == {
+            '4000000000000000001': 'added',
+            '4000000000000000000': 'sold',
+            '5001232': 'removed',
+            '5001233': 'sold',
+        }
+        assert self.market.last_listings_request_count == 14
+        assert self.tracker._removed_listing_ids == set()
+
+    def test_cancelled_ids_are_only_kept_for_tracked_listings(self) -> None:
+        self.session.post = Mock(return_value=Mock(status_code=HTTPStatus.OK))
+        self.market.cancel_sell_order('5001232')
+        self.tracker.poll()
+        self.market.cancel_sell_order('5001232')
+        self.market.cancel_sell_order('999')
+        assert self.tracker._removed_listing_ids == {'5001232'}
+
+        del self.tracker
+        self.market.cancel_sell_order('5001232')
+        assert len(self.market._listing_trackers) == 0
@@ -0,0 +1,143 @@
+import asyncio
+from unittest import TestCase
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from steampy.models import TradeOfferState
+from steampy.offer_poller import AsyncOfferPoller, OfferPoller
+
+
+def create_offer(offer_id: str, state: TradeOfferState = TradeOfferState.Active, time_updated: int = 100) -> dict:
+    return {'tradeofferid': offer_id, 'trade_offer_state': state, 'time_updated': time_updated}
+
+
+def create_offers_response(received: list[dict], sent: list[dict] = ()) -> dict:
+    return {'response': {'trade_offers_received': list(received), 'trade_offers_sent': list(sent)}}
+
+
+def create_summary(**counters) -> dict:
+    return {'response': {'pending_received_count': 1, **counters}}
+
+
+class TestOfferPoller(TestCase):
+    def test_first_poll_returns_active_offers(self) -> None:
+        client = MagicMock()
+        client.get_trade_offers.return_value = create_offers_response([create_offer('1')], [create_offer('2')])
+        poller = OfferPoller(client)
+
+        with patch('steampy.offer_poller.time.time', return_value=1000):
+            offers = poller.poll()
+
+        assert [offer['tradeofferid'] for offer in offers] == ['1', '2']
+        assert 'time_historical_cutoff' not in client.get_trade_offers.call_args.kwargs
+        client.get_trade_offers_summary.assert_not_called()
+        assert poller.last_poll_time == 1000
+
+    def test_poll_is_skipped_when_summary_reports_no_changes(self) -> None:
+        client = MagicMock()
+        client.get_trade_offers.return_value = create_offers_response([create_offer('1')])
+        client.get_trade_offers_summary.return_value = create_summary(new_received_count=0, updated_sent_count=0)
+        poller = OfferPoller(client)
+
+        with patch('steampy.offer_poller.time.time', side_effect=[1000, 1060, 1120]):
+            poller.poll()
+            assert poller.poll() == []
+            assert poller.poll() == []
+
+        assert client.get_trade_offers.call_count == 1
+        assert [call.kwargs['time_last_visit'] for call in client.get_trade_offers_summary.call_args_list] == [
+            1000,
+            1060,
+        ]
+        assert poller.skipped_polls == 2
+
+    def test_poll_returns_only_new_and_changed_offers(self) -> None:
+        client = MagicMock()
+        client.get_trade_offers.side_effect = [
+            create_offers_response([create_offer('1'), create_offer('2')]),
+            create_offers_response(
+                [
+                    create_offer('1'),
+                    create_offer('2', TradeOfferState.Accepted, 1050),
+                    create_offer('3', time_updated=1040),
+                ],
+            ),
+        ]
+        client.get_trade_offers_summary.return_value = create_summary(new_received_count=1, updated_received_count=1)
+        poller = OfferPoller(client, overlap=30)
+
+        with patch('steampy.offer_poller.time.time', side_effect=[1000, 1060]):
+            poller.poll()
+            offers = poller.poll()
+
+        assert [(offer['tradeofferid'], offer['trade_offer_state']) for offer in offers] == [
+            ('2', TradeOfferState.Accepted),
+            ('3', TradeOfferState.Active),
+        ]
+        assert client.get_trade_offers.call_args.kwargs['time_historical_cutoff'] == 970
+
+    def test_offers_are_fetched_after_full_fetch_interval(self) -> None:
+        client = MagicMock()
+        client.get_trade_offers.return_value = create_offers_response([create_offer('1')])
+        client.get_trade_offers_summary.return_value = create_summary()
+        poller = OfferPoller(client, full_fetch_interval=600)
+
+        with patch('steampy.offer_poller.time.time', side_effect=[1000, 1300, 1600]):
+            poller.poll()
+            poller.poll()
+            assert poller.poll() == []
+
+        assert client.get_trade_offers.call_count == 2
+        assert client.get_trade_offers_summary.call_count == 1
+
+    def test_full_fetch_cutoff_covers_skipped_polls(self) -> None:
+        client = MagicMock()
+        client.get_trade_offers.side_effect = [
+            create_offers_response([create_offer('1')]),
+            create_offers_response([create_offer('1'), create_offer('2', TradeOfferState.Declined, 1250)]),
+        ]
+        client.get_trade_offers_summary.return_value = create_summary()
+        poller = OfferPoller(client, overlap=30, full_fetch_interval=600)
+
+        with patch('steampy.offer_poller.time.time', side_effect=[1000, 1200, 1400, 1600]):
+            poller.poll()
+            assert poller.poll() == []
+            assert poller.poll() == []
+            offers = poller.poll()
+
+        assert client.get_trade_offers.call_args.kwargs['time_historical_cutoff'] == 970
+        assert [offer['tradeofferid'] for offer in offers] == ['2']
+
+    def test_sent_counters_are_ignored_without_sent_offers(self) -> None:
+        client = MagicMock()
+        client.get_trade_offers.return_value = create_offers_response([])
+        client.get_trade_offers_summary.return_value = create_summary(newly_accepted_sent_count=1)
+        poller = OfferPoller(client, get_sent_offers=False)
+
+        with patch('steampy.offer_poller.time.time', side_effect=[1000, 1060]):
+            poller.poll()
+            poller.poll()
+
+        assert client.get_trade_offers.call_count == 1
+
+    def test_async_poll(self) -> None:
+        client = MagicMock()
+        client.get_trade_offers = AsyncMock(
+            side_effect=[
+                create_offers_response([create_offer('1')]),
+                create_offers_response([create_offer('1', TradeOfferState.Declined, 1050)]),
+            ],
+        )
+        client.get_trade_offers_summary = AsyncMock(
+            side_effect=[create_summary(), create_summary(updated_received_count=1)],
+        )
+        poller = AsyncOfferPoller(client)
+
+        async def poll_three_times() -> list[list[dict]]:
+            return [await poller.poll() for _ in range(3)]
+
+        with patch('steampy.offer_poller.time.time', side_effect=[1000, 1060, 1120]):
+            first, second, third = asyncio.run(poll_three_times())
+
+        assert [offer['tradeofferid'] for offer in first] == ['1']
+        assert second == []
+        assert [offer['trade_offer_state'] for offer in third] == [TradeOfferState.Declined]
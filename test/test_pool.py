@@ -0,0 +1,73 @@
+import json
+import threading
+import time
+from unittest import TestCase
+from unittest.mock import patch
+
+from steampy.client import SteamClient
+from steampy.pool import SteamClientPool
+
+
+def create_accounts(count: int) -> list[dict]:
+    steam_guard = json.dumps({'steamid': '1', 'shared_secret': 'c2VjcmV0', 'identity_secret': 'c2VjcmV0'})
+    return [
+        {'api_key': 'API_KEY', 'username': f'account{i}', 'password': 'password', 'steam_guard': steam_guard}
+        for i in range(count)
+    ]
+
+
+def fake_login(client: SteamClient, *args, **kwargs) -> None:
+    time.sleep(0.01)
+    client.was_login_executed = True
+
+
+class TestSteamClientPool(TestCase):
+    def test_round_robin(self) -> None:
+        pool = SteamClientPool(create_accounts(3))
+        with patch.object(SteamClient, 'login', autospec=True, side_effect=fake_login):
+            usernames = [pool.run(lambda client: client.username) for _ in range(6)]
+        assert usernames == ['account0', 'account1', 'account2', 'account0', 'account1', 'account2']
+
+    def test_login_once_per_account(self) -> None:
+        pool = SteamClientPool(create_accounts(2), max_concurrency_per_account=4)
+        with patch.object(SteamClient, 'login', autospec=True, side_effect=fake_login) as login:
+            results = pool.run_on_all(lambda client: client.username)
+            threads = [threading.Thread(target=pool.run, args=(lambda client: None, 'account0')) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        assert results == {'account0': 'account0', 'account1': 'account1'}
+        assert login.call_count == 2
+
+    def test_concurrency_limit_per_account(self) -> None:
+        pool = SteamClientPool(create_accounts(1), max_concurrency_per_account=2)
+        running = []
+        max_running = []
+        lock = threading.Lock()
+
+        def work(client: SteamClient) -> None:
+            with lock:
+                running.append(client)
+                max_running.append(len(running))
+            time.sleep(0.02)
+            with lock:
+                running.remove(client)
+
+        with patch.object(SteamClient, 'login', autospec=True, side_effect=fake_login):
+            threads = [threading.Thread(target=pool.run, args=(work,)) for _ in range(6)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        assert max(max_running) == 2
+
+    def test_dead_session_is_recycled(self) -> None:
+        pool = SteamClientPool(create_accounts(1), session_check_interval=0)
+        with (
+            patch.object(SteamClient, 'login', autospec=True, side_effect=fake_login) as login,
+            patch.object(SteamClient, 'is_session_alive', return_value=False),
+        ):
+            pool.run(lambda client: None)
+            pool.run(lambda client: None)
+        assert login.call_count == 2
@@ -0,0 +1,36 @@
+from unittest import TestCase
+
+from steampy.rate_limit import EndpointFamily, RateLimiter, TokenBucket
+
+
+class TestRateLimit(TestCase):
+    def test_classify(self) -> None:
+        assert RateLimiter.classify('https://steamcommunity.com/market/priceoverview/') == EndpointFamily.MARKET
+        assert RateLimiter.classify('https://steamcommunity.com/market') == EndpointFamily.MARKET
+        assert RateLimiter.classify('https://steamcommunity.com/inventory/1/730/2') == EndpointFamily.INVENTORY
+        assert RateLimiter.classify('https://steamcommunity.com/mobileconf/getlist') == EndpointFamily.MOBILECONF
+        assert RateLimiter.classify('https://api.steampowered.com/IEconService/GetTradeOffers/v1') == (
+            EndpointFamily.WEB_API
+        )
+        assert RateLimiter.classify('https://steamcommunity.com/tradeoffer/1/accept') is None
+        assert RateLimiter.classify('https://store.steampowered.com/') is None
+
+    def test_token_bucket_allows_burst_then_waits(self) -> None:
+        bucket = TokenBucket(capacity=3, period=3)
+        assert [bucket._reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+        first_wait = bucket._reserve()
+        second_wait = bucket._reserve()
+        assert 0.9 < first_wait <= 1.0
+        assert 1.9 < second_wait <= 2.0
+
+    def test_token_bucket_penalize(self) -> None:
+        bucket = TokenBucket(capacity=10, period=10)
+        bucket.penalize(5)
+        assert 5.9 < bucket._reserve() <= 6.0
+
+    def test_rate_limiter_custom_budget(self) -> None:
+        rate_limiter = RateLimiter({EndpointFamily.MARKET: (1, 60)}, backoff=2)
+        url = 'https://steamcommunity.com/market/priceoverview/'
+        assert rate_limiter.get_bucket(url).capacity == 1
+        assert rate_limiter.get_bucket('https://steamcommunity.com/inventory/1/730/2').capacity == 10
+        assert rate_limiter.penalize(url, 2) == 8
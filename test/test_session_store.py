@@ -0,0 +1,65 @@
+import os
+import stat
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import TestCase
+
+from steampy.client import SteamClient
+from steampy.session_store import FileSessionStore, SqliteSessionStore
+
+
+class TestSessionStore(TestCase):
+    session_data = {
+        'cookies': [{'name': 'sessionid', 'value': 'abc', 'domain': 'steamcommunity.com', 'path': '/'}],
+        'refresh_token': 'REFRESH_TOKEN',
+        'access_token': 'ACCESS_TOKEN',
+    }
+
+    def test_file_session_store(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            store = FileSessionStore(directory)
+            assert store.load('account') is None
+            store.save('account', self.session_data)
+            assert store.load('account') == self.session_data
+            store.delete('account')
+            assert store.load('account') is None
+
+    @unittest.skipIf(sys.platform == 'win32', 'Requires POSIX file permissions')
+    def test_file_session_store_is_private(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            store = FileSessionStore(directory)
+            store.save('account', self.session_data)
+            store.save('account', self.session_data)
+            assert stat.S_IMODE(os.stat(Path(directory) / 'account.json').st_mode) == 0o600
+
+    def test_file_session_store_rejects_paths(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            store = FileSessionStore(directory)
+            for username in ('../account', 'nested/account', '..', ''):
+                with self.assertRaises(ValueError):
+                    store.save(username, self.session_data)
+
+    def test_sqlite_session_store(self) -> None:
+        store = SqliteSessionStore(':memory:')
+        assert store.load('account') is None
+        store.save('account', self.session_data)
+        assert store.load('account') == self.session_data
+        store.delete('account')
+        assert store.load('account') is None
+        store.close()
+
+    def test_export_and_import_session(self) -> None:
+        client = SteamClient('API_KEY')
+        client._session.cookies.set('sessionid', 'abc', domain='steamcommunity.com', path='/')
+        client._session.cookies.set('steamLoginSecure', '1%7C%7Ctoken', domain='store.steampowered.com', path='/')
+        client._refresh_token = 'REFRESH_TOKEN'
+
+        restored_client = SteamClient('API_KEY')
+        restored_client.import_session(client.export_session())
+        assert restored_client._get_session_id() == 'abc'
+        assert restored_client._session.cookies.get('steamLoginSecure', domain='store.steampowered.com') == (
+            '1%7C%7Ctoken'
+        )
+        assert restored_client._refresh_token == 'REFRESH_TOKEN'
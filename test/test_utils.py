@@ -1,4 +1,6 @@
+import json
 from decimal import Decimal
+from pathlib import Path
 from unittest import TestCase
 
 from steampy import utils
@@ -50,3 +52,44 @@ class TestUtils(TestCase):
         assert utils.calculate_net_price(Decimal('0.03'), publisher_fee, steam_fee) == Decimal('0.01')
         assert utils.calculate_net_price(Decimal('0.12'), publisher_fee, steam_fee) == Decimal('0.10')
         assert utils.calculate_net_price(Decimal(115), publisher_fee, steam_fee) == Decimal(100)
+
+    def test_decode_jwt_payload(self) -> None:
+        token = 'eyJ0eXAiOiJKV1QiLCJhbGciOiJFZERTQSJ9.eyJzdWIiOiI3NjU2MTE5ODMxODg4MzIxNSIsImV4cCI6MTcwMDAwMDAwMH0.c2ln'
+        assert utils.decode_jwt_payload(token) == {'sub': '76561198318883215', 'exp': 1700000000}
+
+
+class TestListingsParsers(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        fixtures_directory = Path(__file__).resolve().parent / 'fixtures'
+        cls.market_page = (fixtures_directory / 'market_page.html').read_text(encoding='utf-8')
+        cls.render_response = json.loads((fixtures_directory / 'mylistings_render.json').read_text(encoding='utf-8'))
+
+    def test_get_market_listings_from_html(self) -> None:
+        listings = utils.get_market_listings_from_html(self.market_page)
+        assert len(listings['sell_listings']) == 12
+        assert sum(listing['need_confirmation'] for listing in listings['sell_listings'].values()) == 2
+        assert listings['sell_listings']['4000000000000007919'] == {
+            'listing_id': '4000000000000007919',
+            'buyer_pay': '$227.41',
+            'you_receive': '$197.75',
+            'created_on': '3 May',
+            'need_confirmation': False,
+        }
+        buy_order = listings['buy_orders']['6000000031']
+        assert (buy_order['quantity'], buy_order['price']) == (28, '$68.54')
+        assert buy_order['item_name'] == 'Sticker | Team Spirit (Holo) | Paris 2023'
+        assert buy_order['game_name'] == 'Dota 2'
+        assert listings['buy_orders']['6000000062']['item_name'] == "Inscribed Pudge's Hook"
+
+    def test_regex_parser_returns_same_listings(self) -> None:
+        assert utils.get_market_listings_from_html(self.market_page, 'regex') == utils.get_market_listings_from_html(
+            self.market_page,
+        )
+        results_html = self.render_response['results_html']
+        listings = utils.get_market_sell_listings_from_api(results_html, 'regex')
+        assert listings == utils.get_market_sell_listings_from_api(results_html)
+        assert len(listings['sell_listings']) == 100
+
+    def test_unknown_parser(self) -> None:
+        self.assertRaises(ValueError, utils.get_market_listings_from_html, self.market_page, 'lxml')